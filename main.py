@@ -1,12 +1,8 @@
-from salary_calculator.serializers import EmployeeScheduleSerializer
+import sys
+
+from salary_calculator.lean import main
+
+DEMO_DATASET = "salary_calculator/test_data_files/demo_dataset.txt"
 
 if __name__ == "__main__":
-    with open("salary_calculator/test_data_files/demo_dataset.txt") as file:
-        for line in file:
-            line = line.replace("\n", "")
-            serializer = EmployeeScheduleSerializer(line)
-            schedule = serializer.serialize()
-            print("------------------------------------------------------>>>>")
-            print(schedule)
-            salary = schedule.calculate_salary()
-            print(f"The amount to pay {schedule.username} is: {salary} USD")
+    sys.exit(main(sys.argv[1:] or [DEMO_DATASET]))
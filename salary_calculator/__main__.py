@@ -0,0 +1,5 @@
+import sys
+
+from salary_calculator.lean import main
+
+sys.exit(main())
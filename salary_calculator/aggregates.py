@@ -0,0 +1,171 @@
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from salary_calculator.classes import BandKey, EmployeeSchedule
+from salary_calculator.parallel import (DEFAULT_CHUNK_SIZE, chunk_lines,
+                                        map_in_order)
+from salary_calculator.pipeline import SalaryRecord, serialize_lines
+from salary_calculator.rates import RateTable
+from salary_calculator.utils import get_abbrev_by_calendar_day
+
+BandTotals = Dict[BandKey, "BandTotal"]
+
+
+@dataclass
+class BandTotal:
+    minutes: int = 0
+    amount: Decimal = Decimal(0)
+
+    def add(self, minutes: int, amount: Decimal) -> None:
+        self.minutes += minutes
+        self.amount += amount
+
+
+def merge_band_totals(target: BandTotals, source: BandTotals) -> None:
+    for key, total in source.items():
+        target_total = target.get(key)
+        if target_total is None:
+            target[key] = BandTotal(total.minutes, total.amount)
+        else:
+            target_total.add(total.minutes, total.amount)
+
+
+def format_band_totals(band_totals: BandTotals) -> List[Dict]:
+    return [
+        {
+            "weekday": get_abbrev_by_calendar_day(weekday),
+            "band": band,
+            "minutes": total.minutes,
+            "amount": str(total.amount.quantize(Decimal("0.01"))),
+        }
+        for (weekday, band), total in sorted(band_totals.items())
+    ]
+
+
+@dataclass
+class CostReport:
+    """
+    Paid minutes and amounts per week day and rate band, over every priced schedule and,
+    when per_employee is set, for every employee. Reports of separate shards are merged
+    by adding them up, and amounts are only rounded when formatted.
+
+    Salaries are rounded one by one, so the total amount of the bands can be cents away from
+    the sum of the salaries paid, which salaries adds up on its own.
+    """
+
+    per_employee: bool = True
+    schedules: int = 0
+    salaries: Decimal = Decimal(0)
+    bands: BandTotals = field(default_factory=dict)
+    employees: Dict[Optional[str], BandTotals] = field(default_factory=dict)
+
+    def add_schedule(
+        self, schedule: EmployeeSchedule, rate_table: Optional[RateTable] = None
+    ) -> Decimal:
+        """Price a schedule, accounting every band it was paid in, and return its salary."""
+        salary = Decimal(0)
+        bands = self.bands
+        if self.per_employee:
+            employee_bands = self.employees.setdefault(schedule.username, {})
+        for employee_slot in schedule.working_days_spans:
+            weekday = employee_slot.weekday
+            for band, minutes, amount in schedule.price_span_by_band(employee_slot, rate_table):
+                key = weekday, band
+                total = bands.get(key)
+                if total is None:
+                    total = bands[key] = BandTotal()
+                total.add(minutes, amount)
+                if self.per_employee:
+                    employee_total = employee_bands.get(key)
+                    if employee_total is None:
+                        employee_total = employee_bands[key] = BandTotal()
+                    employee_total.add(minutes, amount)
+                salary += amount
+        salary = salary.quantize(Decimal("0.01"))
+        self.schedules += 1
+        self.salaries += salary
+        return salary
+
+    def merge(self, other: "CostReport") -> "CostReport":
+        self.schedules += other.schedules
+        self.salaries += other.salaries
+        merge_band_totals(self.bands, other.bands)
+        for username, band_totals in other.employees.items():
+            merge_band_totals(self.employees.setdefault(username, {}), band_totals)
+        return self
+
+    @property
+    def total_minutes(self) -> int:
+        return sum(total.minutes for total in self.bands.values())
+
+    @property
+    def total_amount(self) -> Decimal:
+        return sum((total.amount for total in self.bands.values()), Decimal(0))
+
+    def as_dict(self) -> Dict:
+        report = {
+            "schedules": self.schedules,
+            "minutes": self.total_minutes,
+            "amount": str(self.total_amount.quantize(Decimal("0.01"))),
+            "salaries": str(self.salaries),
+            "bands": format_band_totals(self.bands),
+        }
+        if self.per_employee:
+            report["employees"] = {
+                username: format_band_totals(band_totals)
+                for username, band_totals in self.employees.items()
+            }
+        return report
+
+
+def price_schedules_with_report(
+    schedules: Iterable[EmployeeSchedule],
+    report: CostReport,
+    rate_table: Optional[RateTable] = None,
+) -> Iterator[SalaryRecord]:
+    for schedule in schedules:
+        yield schedule.username, report.add_schedule(schedule, rate_table)
+
+
+def calculate_salaries_with_report(
+    lines: Iterable[str],
+    report: CostReport,
+    first_line_number: int = 1,
+    rate_table: Optional[RateTable] = None,
+) -> Iterator[SalaryRecord]:
+    """Yield salary records while accounting them into report, in a single pass over lines."""
+    return price_schedules_with_report(
+        serialize_lines(lines, first_line_number), report, rate_table
+    )
+
+
+def price_chunk(
+    lines: List[str],
+    first_line_number: int = 1,
+    rate_table: Optional[RateTable] = None,
+    per_employee: bool = True,
+) -> Tuple[List[SalaryRecord], CostReport]:
+    report = CostReport(per_employee=per_employee)
+    records = list(calculate_salaries_with_report(lines, report, first_line_number, rate_table))
+    return records, report
+
+
+def calculate_salaries_with_report_parallel(
+    lines: Iterable[str],
+    report: CostReport,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    rate_table: Optional[RateTable] = None,
+) -> Iterator[SalaryRecord]:
+    """
+    Price chunks of lines in a process pool, every worker returning the records of its chunk
+    along with a partial report, which is merged into report as results come back in order.
+    """
+    chunks = (
+        (chunk, 1 + index * chunk_size, rate_table, report.per_employee)
+        for index, chunk in enumerate(chunk_lines(lines, chunk_size))
+    )
+    for records, partial_report in map_in_order(price_chunk, chunks, workers):
+        report.merge(partial_report)
+        yield from records
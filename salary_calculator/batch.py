@@ -0,0 +1,228 @@
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import IO, List, Optional, Tuple
+
+from salary_calculator.classes import EmployeeSchedule
+from salary_calculator.exceptions import StartGreaterThanEndError
+from salary_calculator.pipeline import SalaryRecord
+from salary_calculator.rates import RateTable
+from salary_calculator.serializers import FastEmployeeScheduleSerializer
+from salary_calculator.streams import OUTPUT_FORMATTERS, OUTPUT_HEADERS
+
+DEFAULT_CHECKPOINT_LINES = 10000
+
+
+class CheckpointError(ValueError):
+    pass
+
+
+@dataclass
+class Checkpoint:
+    """
+    Progress of a batch run: how far the input was read and how much of the output and
+    reject files belongs to it, plus what identifies the run so a stale checkpoint is refused.
+    """
+
+    input_path: str
+    input_size: int
+    input_mtime_ns: int
+    output_format: str
+    rate_table_hash: str
+    input_offset: int = 0
+    line_number: int = 0
+    output_offset: int = 0
+    reject_offset: int = 0
+    records: int = 0
+    rejected: int = 0
+
+    def save(self, path: str) -> None:
+        # Written next to the target and renamed over it, so a crash never leaves half a file.
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w", encoding="utf-8") as file:
+            json.dump(asdict(self), file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["Checkpoint"]:
+        try:
+            with open(path, encoding="utf-8") as file:
+                return cls(**json.load(file))
+        except FileNotFoundError:
+            return None
+        except (ValueError, TypeError) as exc:
+            raise CheckpointError(f"checkpoint file:{path} is corrupt") from exc
+
+    def matches(self, other: "Checkpoint") -> bool:
+        identity = ("input_path", "input_size", "input_mtime_ns", "output_format", "rate_table_hash")
+        return all(getattr(self, name) == getattr(other, name) for name in identity)
+
+
+@dataclass
+class BatchResult:
+    records: int = 0
+    rejected: int = 0
+    resumed_from_line: int = 0
+
+    def __str__(self) -> str:
+        resumed = f" resumed_from_line={self.resumed_from_line}" if self.resumed_from_line else ""
+        return f"records={self.records} rejected={self.rejected}{resumed}"
+
+
+def open_for_resume(path: str, offset: int, resuming: bool) -> IO[bytes]:
+    """
+    Open a file for writing, dropping whatever was written after offset by an interrupted run.
+    A missing file is created when nothing was written to it yet, as with a reject file the
+    interrupted run was not given.
+    """
+    if not resuming:
+        return open(path, "wb")
+    try:
+        file = open(path, "r+b")
+    except FileNotFoundError:
+        if offset:
+            raise CheckpointError(
+                f"file:{path} is missing what was written before the checkpoint, remove the "
+                "checkpoint to start over"
+            ) from None
+        return open(path, "wb")
+    file.truncate(offset)
+    file.seek(offset)
+    return file
+
+
+def price_line(
+    raw_line: bytes, line_number: int, rate_table: Optional[RateTable]
+) -> Tuple[Optional[SalaryRecord], Optional[str]]:
+    """Return the salary record of a line, or the reason why it was rejected."""
+    try:
+        schedule: EmployeeSchedule = FastEmployeeScheduleSerializer(raw_line, line_number).serialize()
+        return (schedule.username, schedule.calculate_salary(rate_table)), None
+    except (ValueError, StartGreaterThanEndError) as exc:
+        return None, str(exc) or exc.__class__.__name__
+
+
+def format_reject(line_number: int, raw_line: bytes, reason: str) -> str:
+    text = raw_line.decode("utf-8", errors="replace")
+    return json.dumps({"line": line_number, "reason": reason, "text": text}) + "\n"
+
+
+def run_batch(
+    input_path: str,
+    output_path: str,
+    output_format: str = "text",
+    reject_path: Optional[str] = None,
+    checkpoint_path: Optional[str] = None,
+    checkpoint_every: int = DEFAULT_CHECKPOINT_LINES,
+    rate_table: Optional[RateTable] = None,
+) -> BatchResult:
+    """
+    Price a schedule file without stopping at bad lines, which are written to reject_path as
+    JSON lines with their line number and reason (or only counted without a reject file).
+
+    Every checkpoint_every lines, output and rejects are flushed and a checkpoint holding the
+    input byte offset and the output and reject file positions is saved. When a matching
+    checkpoint exists, the run resumes from it: output written after it is truncated and the
+    input is read from the saved offset. The checkpoint is removed once the run completes.
+    """
+    if checkpoint_every < 1:
+        raise ValueError(f"checkpoint lines:{checkpoint_every} should be a positive number")
+    stat = os.stat(input_path)
+    table_hash = (rate_table or EmployeeSchedule.get_default_rate_table()).content_hash
+    checkpoint = Checkpoint(
+        os.path.abspath(input_path), stat.st_size, stat.st_mtime_ns, output_format, table_hash
+    )
+    saved = Checkpoint.load(checkpoint_path) if checkpoint_path else None
+    if saved is not None:
+        if not saved.matches(checkpoint):
+            raise CheckpointError(
+                f"checkpoint file:{checkpoint_path} belongs to another input, format or rate "
+                "table, remove it to start over"
+            )
+        checkpoint = saved
+    resuming = saved is not None
+    result = BatchResult(checkpoint.records, checkpoint.rejected, checkpoint.line_number)
+    formatter = OUTPUT_FORMATTERS[output_format]
+
+    input_file = open(input_path, "rb")
+    output_file = open_for_resume(output_path, checkpoint.output_offset, resuming)
+    reject_file = (
+        open_for_resume(reject_path, checkpoint.reject_offset, resuming) if reject_path else None
+    )
+    try:
+        input_file.seek(checkpoint.input_offset)
+        if not resuming and output_format in OUTPUT_HEADERS:
+            output_file.write(OUTPUT_HEADERS[output_format].encode("utf-8"))
+        records: List[SalaryRecord] = []
+        rejects: List[str] = []
+        offset, line_number = checkpoint.input_offset, checkpoint.line_number
+        pending_lines = 0
+        for raw_line in input_file:
+            offset += len(raw_line)
+            line_number += 1
+            line = raw_line.rstrip(b"\r\n")
+            if line:
+                record, reason = price_line(line, line_number, rate_table)
+                if record is not None:
+                    records.append(record)
+                else:
+                    rejects.append(format_reject(line_number, line, reason))
+            pending_lines += 1
+            if pending_lines >= checkpoint_every:
+                write_progress(output_file, reject_file, formatter, records, rejects, result)
+                save_checkpoint(
+                    checkpoint, checkpoint_path, offset, line_number, output_file, reject_file, result
+                )
+                pending_lines = 0
+        write_progress(output_file, reject_file, formatter, records, rejects, result)
+    finally:
+        input_file.close()
+        output_file.close()
+        if reject_file is not None:
+            reject_file.close()
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return result
+
+
+def write_progress(
+    output_file: IO[bytes],
+    reject_file: Optional[IO[bytes]],
+    formatter,
+    records: List[SalaryRecord],
+    rejects: List[str],
+    result: BatchResult,
+) -> None:
+    output_file.write("".join(formatter(records)).encode("utf-8"))
+    if reject_file is not None:
+        reject_file.write("".join(rejects).encode("utf-8"))
+    result.records += len(records)
+    result.rejected += len(rejects)
+    records.clear()
+    rejects.clear()
+
+
+def save_checkpoint(
+    checkpoint: Checkpoint,
+    checkpoint_path: Optional[str],
+    input_offset: int,
+    line_number: int,
+    output_file: IO[bytes],
+    reject_file: Optional[IO[bytes]],
+    result: BatchResult,
+) -> None:
+    if checkpoint_path is None:
+        return
+    for file in (output_file, reject_file):
+        if file is not None:
+            file.flush()
+            os.fsync(file.fileno())
+    checkpoint.input_offset = input_offset
+    checkpoint.line_number = line_number
+    checkpoint.output_offset = output_file.tell()
+    checkpoint.reject_offset = reject_file.tell() if reject_file is not None else 0
+    checkpoint.records = result.records
+    checkpoint.rejected = result.rejected
+    checkpoint.save(checkpoint_path)
@@ -0,0 +1,5 @@
+import sys
+
+from salary_calculator.benchmarks.runner import main
+
+sys.exit(main())
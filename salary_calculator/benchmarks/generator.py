@@ -0,0 +1,125 @@
+import argparse
+import random
+import sys
+from dataclasses import dataclass
+from typing import Iterator, List
+
+from salary_calculator.utils import get_weekday_abbrevs
+
+MINUTES_PER_DAY = 24 * 60
+
+STANDARD_SHIFTS = [
+    (9 * 60, 17 * 60),
+    (8 * 60, 16 * 60),
+    (14 * 60, 22 * 60),
+    (22 * 60, 0),
+    (6 * 60, 14 * 60),
+]
+
+BAD_LINE_TEMPLATES = [
+    "{username}MO10:00-12:00",
+    "{username}=XX10:00-12:00",
+    "{username}=MO12:00-10:00",
+    "{username}=MO10:00-25:00",
+    "{username}=MO10:00-12:00,",
+    "{username}=MO1000-1200",
+]
+
+
+@dataclass
+class DatasetSpec:
+    employees: int = 10000
+    spans_per_employee: int = 5
+    overlap_rate: float = 0.05
+    midnight_rate: float = 0.1
+    standard_shift_rate: float = 0.5
+    bad_line_rate: float = 0.0
+    seed: int = 0
+
+
+def format_minutes(minutes: int) -> str:
+    return "%02d:%02d" % divmod(minutes, 60)
+
+
+class DatasetGenerator:
+    """Seeded generator of schedule lines resembling time clock exports."""
+
+    def __init__(self, spec: DatasetSpec) -> None:
+        self.spec = spec
+        self.random = random.Random(spec.seed)
+        self.abbrevs = get_weekday_abbrevs()
+
+    def create_span(self) -> List:
+        if self.random.random() < self.spec.standard_shift_rate:
+            start, end = self.random.choice(STANDARD_SHIFTS)
+        else:
+            start = self.random.randrange(0, MINUTES_PER_DAY - 1)
+            end = self.random.randint(start + 1, MINUTES_PER_DAY - 1)
+        if self.random.random() < self.spec.midnight_rate:
+            end = 0
+        return [self.random.choice(self.abbrevs), start, end]
+
+    def create_overlapping_span(self, previous: List) -> List:
+        weekday, start, end = previous
+        normalized_end = end or MINUTES_PER_DAY - 1
+        overlap_start = self.random.randint(start, normalized_end)
+        overlap_end = self.random.randint(overlap_start, MINUTES_PER_DAY - 1)
+        return [weekday, overlap_start, overlap_end]
+
+    def create_line(self, index: int) -> str:
+        username = f"EMPLOYEE{index}"
+        if self.random.random() < self.spec.bad_line_rate:
+            return self.random.choice(BAD_LINE_TEMPLATES).format(username=username)
+        spans = []
+        for _ in range(max(1, self.spec.spans_per_employee)):
+            if spans and self.random.random() < self.spec.overlap_rate:
+                spans.append(self.create_overlapping_span(spans[-1]))
+            else:
+                spans.append(self.create_span())
+        tokens = [
+            f"{weekday}{format_minutes(start)}-{format_minutes(end)}"
+            for weekday, start, end in spans
+        ]
+        return f"{username}=" + ",".join(tokens)
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self.spec.employees):
+            yield self.create_line(index)
+
+
+def generate_lines(spec: DatasetSpec) -> Iterator[str]:
+    return iter(DatasetGenerator(spec))
+
+
+def main() -> None:
+    defaults = DatasetSpec()
+    parser = argparse.ArgumentParser(description="Write a synthetic schedule dataset.")
+    parser.add_argument("-o", "--output", default="-")
+    parser.add_argument("-n", "--employees", type=int, default=defaults.employees)
+    parser.add_argument("--spans", type=int, default=defaults.spans_per_employee)
+    parser.add_argument("--overlap-rate", type=float, default=defaults.overlap_rate)
+    parser.add_argument("--midnight-rate", type=float, default=defaults.midnight_rate)
+    parser.add_argument("--standard-shift-rate", type=float, default=defaults.standard_shift_rate)
+    parser.add_argument("--bad-line-rate", type=float, default=defaults.bad_line_rate)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    args = parser.parse_args()
+    spec = DatasetSpec(
+        employees=args.employees,
+        spans_per_employee=args.spans,
+        overlap_rate=args.overlap_rate,
+        midnight_rate=args.midnight_rate,
+        standard_shift_rate=args.standard_shift_rate,
+        bad_line_rate=args.bad_line_rate,
+        seed=args.seed,
+    )
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        for line in generate_lines(spec):
+            output.write(line + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
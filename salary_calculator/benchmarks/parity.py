@@ -0,0 +1,360 @@
+import argparse
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from salary_calculator import vectorized
+from salary_calculator.benchmarks.generator import (MINUTES_PER_DAY,
+                                                    format_minutes)
+from salary_calculator.cache import ShiftPayCache
+from salary_calculator.cents import calculate_salaries_cents
+from salary_calculator.classes import EmployeeSchedule
+from salary_calculator.dedup import calculate_salaries_deduplicated
+from salary_calculator.rates import RateTable, load_rate_table
+from salary_calculator.serializers import (EmployeeScheduleSerializer,
+                                           FastEmployeeScheduleSerializer)
+from salary_calculator.utils import (get_calendar_day_by_abbrev,
+                                     get_weekday_abbrevs)
+
+# A salary, or the exception an engine raised instead.
+Outcome = Union[Decimal, str]
+Engine = Callable[[List[str], Optional[RateTable]], List[Decimal]]
+
+DEFAULT_CHUNK_SIZE = 10000
+
+
+def price_reference(lines: List[str], rate_table: Optional[RateTable]) -> List[Decimal]:
+    """The original path: strptime parsing and TimeSpan.get_intersection against every slot."""
+    return [
+        EmployeeScheduleSerializer(line).serialize().calculate_salary_by_intersections(rate_table)
+        for line in lines
+    ]
+
+
+def price_compiled(lines: List[str], rate_table: Optional[RateTable]) -> List[Decimal]:
+    return [
+        FastEmployeeScheduleSerializer(line).serialize().calculate_salary(rate_table)
+        for line in lines
+    ]
+
+
+def price_compiled_time_spans(
+    lines: List[str], rate_table: Optional[RateTable]
+) -> List[Decimal]:
+    return [
+        FastEmployeeScheduleSerializer(line, compact=False)
+        .serialize()
+        .calculate_salary(rate_table)
+        for line in lines
+    ]
+
+
+def price_pay_cache(lines: List[str], rate_table: Optional[RateTable]) -> List[Decimal]:
+    pay_cache = ShiftPayCache(4096)
+    return [
+        FastEmployeeScheduleSerializer(line).serialize().calculate_salary(rate_table, pay_cache)
+        for line in lines
+    ]
+
+
+def price_ledger(lines: List[str], rate_table: Optional[RateTable]) -> List[Decimal]:
+    salaries = []
+    for line in lines:
+        schedule = FastEmployeeScheduleSerializer(line).serialize()
+        schedule.track_salary(rate_table)
+        salaries.append(schedule.get_tracked_salary())
+    return salaries
+
+
+def price_dedup(lines: List[str], rate_table: Optional[RateTable]) -> List[Decimal]:
+    return [salary for _, salary in calculate_salaries_deduplicated(lines, rate_table=rate_table)]
+
+
+def price_cents(lines: List[str], rate_table: Optional[RateTable]) -> List[Decimal]:
+    return [salary for _, salary in calculate_salaries_cents(lines, rate_table=rate_table)]
+
+
+def price_vectorized(lines: List[str], rate_table: Optional[RateTable]) -> List[Decimal]:
+    return [salary for _, salary in vectorized.price_chunk(lines, rate_table=rate_table)]
+
+
+ENGINES: Dict[str, Engine] = {
+    "compiled": price_compiled,
+    "compiled-time-spans": price_compiled_time_spans,
+    "pay-cache": price_pay_cache,
+    "ledger": price_ledger,
+    "dedup": price_dedup,
+    "cents": price_cents,
+}
+if vectorized.np is not None:
+    ENGINES["vectorized"] = price_vectorized
+
+
+def price_outcomes(
+    engine: Engine, lines: List[str], rate_table: Optional[RateTable]
+) -> List[Outcome]:
+    """Price lines in bulk, falling back to one line at a time to tell which lines raise."""
+    try:
+        return list(engine(lines, rate_table))
+    except Exception:
+        if len(lines) == 1:
+            exc = sys.exc_info()[1]
+            return [f"{exc.__class__.__name__}: {exc}"]
+    return [outcome for line in lines for outcome in price_outcomes(engine, [line], rate_table)]
+
+
+class ScheduleFuzzer:
+    """
+    Seeded generator of schedule lines biased towards the edge cases of the pricing rules:
+    times next to every slot bound of the rate table (09:00/09:01 style start and end bounded
+    intersections), 00:00 starts and ends (normalized to the end of the day), empty spans and
+    overlapping spans of a same week day.
+    """
+
+    def __init__(
+        self, rate_table: Optional[RateTable] = None, seed: int = 0, max_spans: int = 8
+    ) -> None:
+        self.random = random.Random(seed)
+        self.max_spans = max_spans
+        self.abbrevs = get_weekday_abbrevs()
+        table = rate_table or EmployeeSchedule.get_default_rate_table()
+        # Keyed by calendar week day, as rate tables number them.
+        self.edge_minutes: Dict[int, List[int]] = {}
+        for abbrev in self.abbrevs:
+            weekday = get_calendar_day_by_abbrev(abbrev)
+            minutes: Set[int] = {0, 1, MINUTES_PER_DAY - 1}
+            for slot in table.get_slots(weekday):
+                for bound in (slot.start, slot.end):
+                    minutes.update(
+                        minute
+                        for minute in (bound - 1, bound, bound + 1)
+                        if 0 <= minute < MINUTES_PER_DAY
+                    )
+            self.edge_minutes[weekday] = sorted(minutes)
+
+    def create_minute(self, weekday: int) -> int:
+        if self.random.random() < 0.5:
+            return self.random.choice(self.edge_minutes[weekday])
+        return self.random.randrange(MINUTES_PER_DAY)
+
+    def create_token(self) -> str:
+        abbrev = self.random.choice(self.abbrevs)
+        weekday = get_calendar_day_by_abbrev(abbrev)
+        start, end = sorted((self.create_minute(weekday), self.create_minute(weekday)))
+        if self.random.random() < 0.1:
+            end = 0
+        return f"{abbrev}{format_minutes(start)}-{format_minutes(end)}"
+
+    def create_line(self, index: int) -> str:
+        spans = self.random.randint(1, self.max_spans)
+        return f"FUZZ{index}=" + ",".join(self.create_token() for _ in range(spans))
+
+    def create_lines(self, first_index: int, count: int) -> List[str]:
+        return [self.create_line(index) for index in range(first_index, first_index + count)]
+
+
+def parse_token(token: str) -> Tuple[str, int, int]:
+    start, end = token[2:].split("-")
+    return (
+        token[:2],
+        int(start[:2]) * 60 + int(start[3:]),
+        int(end[:2]) * 60 + int(end[3:]),
+    )
+
+
+def format_token(weekday: str, start: int, end: int) -> str:
+    return f"{weekday}{format_minutes(start)}-{format_minutes(end)}"
+
+
+def get_simpler_tokens(token: str) -> List[str]:
+    """
+    Candidate replacements of a span token, closer to MO00:00-00:00. Starts only move down and
+    ends only up to the next hour or to 00:00 (the end of the day), so shrinking terminates.
+    """
+    weekday, start, end = parse_token(token)
+    candidates = [("MO", start, end)]
+    for simpler_start in (0, start // 60 * 60, start - 1):
+        candidates.append((weekday, simpler_start, end))
+    for simpler_end in (0, -(-end // 60) * 60 % MINUTES_PER_DAY):
+        candidates.append((weekday, start, simpler_end))
+    simpler_tokens = []
+    for candidate in candidates:
+        candidate_token = format_token(*candidate)
+        if candidate_token != token and is_valid_token(*candidate):
+            simpler_tokens.append(candidate_token)
+    return simpler_tokens
+
+
+def is_valid_token(weekday: str, start: int, end: int) -> bool:
+    if not (0 <= start < MINUTES_PER_DAY and 0 <= end < MINUTES_PER_DAY):
+        return False
+    return start <= end or end == 0
+
+
+def shrink_line(
+    line: str,
+    engine: Engine,
+    rate_table: Optional[RateTable] = None,
+    reference: Engine = price_reference,
+) -> str:
+    """
+    Reduce a line the engine misprices to a minimal one it still misprices: drop every span
+    that is not needed, then move weekdays and times towards MO and 00:00 while it fails.
+    """
+
+    def fails(tokens: Sequence[str]) -> bool:
+        candidate = "X=" + ",".join(tokens)
+        expected = price_outcomes(reference, [candidate], rate_table)[0]
+        if not isinstance(expected, Decimal):
+            return False
+        return price_outcomes(engine, [candidate], rate_table)[0] != expected
+
+    tokens = line[line.index("=") + 1 :].split(",")
+    if not fails(tokens):
+        return line
+    shrunk = True
+    while shrunk:
+        shrunk = False
+        for index in range(len(tokens)):
+            if len(tokens) > 1 and fails(tokens[:index] + tokens[index + 1 :]):
+                del tokens[index]
+                shrunk = True
+                break
+            for candidate in get_simpler_tokens(tokens[index]):
+                if fails(tokens[:index] + [candidate] + tokens[index + 1 :]):
+                    tokens[index] = candidate
+                    shrunk = True
+                    break
+            if shrunk:
+                break
+    return "X=" + ",".join(tokens)
+
+
+@dataclass
+class Mismatch:
+    line: str
+    expected: Outcome
+    actual: Outcome
+    shrunk_line: str = ""
+
+
+@dataclass
+class EngineResult:
+    seconds: float = 0.0
+    mismatches: int = 0
+    examples: List[Mismatch] = field(default_factory=list)
+
+
+@dataclass
+class ParityReport:
+    schedules: int = 0
+    spans: int = 0
+    reference_seconds: float = 0.0
+    engines: Dict[str, EngineResult] = field(default_factory=dict)
+
+    @property
+    def passed(self) -> bool:
+        return not any(result.mismatches for result in self.engines.values())
+
+    def format(self) -> str:
+        rows = [
+            f"{self.schedules:,} schedules, {self.spans:,} spans",
+            f"{'engine':<22}{'schedules/s':>14}{'spans/s':>14}{'speedup':>9}{'mismatches':>12}",
+        ]
+        timings = [("reference", self.reference_seconds, 0)] + [
+            (name, result.seconds, result.mismatches) for name, result in self.engines.items()
+        ]
+        for name, seconds, mismatches in timings:
+            seconds = max(seconds, 1e-9)
+            rows.append(
+                f"{name:<22}{self.schedules / seconds:>14,.0f}{self.spans / seconds:>14,.0f}"
+                f"{self.reference_seconds / seconds:>8.1f}x{mismatches:>12}"
+            )
+        for name, result in self.engines.items():
+            for mismatch in result.examples:
+                rows.append(
+                    f"{name}: expected {mismatch.expected} got {mismatch.actual} for "
+                    f"{mismatch.line}\n  shrunk to {mismatch.shrunk_line}"
+                )
+        return "\n".join(rows)
+
+
+def run_parity(
+    engines: Dict[str, Engine],
+    schedules: int,
+    rate_table: Optional[RateTable] = None,
+    seed: int = 0,
+    max_spans: int = 8,
+    max_examples: int = 3,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ParityReport:
+    """
+    Price fuzzed schedules with the reference implementation and every engine, chunk by
+    chunk, counting mismatching salaries (or exceptions) and shrinking the first max_examples
+    mismatches of every engine to minimal lines.
+    """
+    fuzzer = ScheduleFuzzer(rate_table, seed, max_spans)
+    report = ParityReport(engines={name: EngineResult() for name in engines})
+    for first_index in range(0, schedules, chunk_size):
+        lines = fuzzer.create_lines(first_index, min(chunk_size, schedules - first_index))
+        report.schedules += len(lines)
+        report.spans += sum(line.count(",") + 1 for line in lines)
+        started = time.perf_counter()
+        expected = price_reference(lines, rate_table)
+        report.reference_seconds += time.perf_counter() - started
+        for name, engine in engines.items():
+            result = report.engines[name]
+            started = time.perf_counter()
+            actual = price_outcomes(engine, lines, rate_table)
+            result.seconds += time.perf_counter() - started
+            for line, expected_salary, actual_salary in zip(lines, expected, actual):
+                if expected_salary == actual_salary:
+                    continue
+                result.mismatches += 1
+                if len(result.examples) < max_examples:
+                    shrunk_line = shrink_line(line, engine, rate_table)
+                    result.examples.append(
+                        Mismatch(line, expected_salary, actual_salary, shrunk_line)
+                    )
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Check pricing engines against the reference implementation on fuzzed "
+        "schedules."
+    )
+    parser.add_argument("-n", "--schedules", type=int, default=100000)
+    parser.add_argument("--max-spans", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rates", metavar="FILE", help="rate table file to price with")
+    parser.add_argument(
+        "--engines",
+        default=",".join(ENGINES),
+        help=f"comma separated engines to check (default: {','.join(ENGINES)})",
+    )
+    parser.add_argument("--max-examples", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    names = [name for name in args.engines.split(",") if name]
+    unknown = [name for name in names if name not in ENGINES]
+    if unknown:
+        parser.error(f"unknown engines: {', '.join(unknown)}")
+    rate_table = load_rate_table(args.rates) if args.rates else None
+    report = run_parity(
+        {name: ENGINES[name] for name in names},
+        args.schedules,
+        rate_table,
+        args.seed,
+        args.max_spans,
+        args.max_examples,
+    )
+    print(report.format())
+    return 0 if report.passed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+import argparse
+import time
+from typing import Callable, List
+
+from salary_calculator.benchmarks.generator import DatasetSpec, generate_lines
+from salary_calculator.parsing import parse_schedule_line
+from salary_calculator.serializers import (EmployeeScheduleSerializer,
+                                           FastEmployeeScheduleSerializer)
+
+
+def measure_lines_per_second(parse: Callable[[str], object], lines: List[str]) -> float:
+    started = time.perf_counter()
+    for line in lines:
+        parse(line)
+    return len(lines) / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare schedule line parse rates.")
+    parser.add_argument("--lines", type=int, default=20000)
+    parser.add_argument("--spans", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    spec = DatasetSpec(employees=args.lines, spans_per_employee=args.spans, seed=args.seed)
+    lines = list(generate_lines(spec))
+    encoded_lines = [line.encode() for line in lines]
+    results = {
+        "strptime serializer": measure_lines_per_second(
+            lambda line: EmployeeScheduleSerializer(line).serialize(), lines
+        ),
+        "fast serializer": measure_lines_per_second(
+            lambda line: FastEmployeeScheduleSerializer(line).serialize(), lines
+        ),
+        "minutes (str)": measure_lines_per_second(parse_schedule_line, lines),
+        "minutes (bytes)": measure_lines_per_second(parse_schedule_line, encoded_lines),
+    }
+    baseline = results["strptime serializer"]
+    for name, rate in results.items():
+        print(f"{name:<22}{rate:>12,.0f} lines/s{rate / baseline:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from typing import Callable, Dict, List, Optional
+
+from salary_calculator.batch import run_batch
+from salary_calculator.benchmarks.generator import DatasetSpec, generate_lines
+from salary_calculator.cache import ShiftPayCache
+from salary_calculator.exceptions import StartGreaterThanEndError
+from salary_calculator.pipeline import calculate_salaries
+from salary_calculator.serializers import (EmployeeScheduleSerializer,
+                                           FastEmployeeScheduleSerializer)
+from salary_calculator.streams import read_lines, write_records
+
+BenchmarkResult = Dict[str, float]
+
+REGRESSION_THRESHOLD = 0.10
+
+SHARED_ROTA_EMPLOYEES = 100
+
+
+def measure(run: Callable[[], int], repeat: int) -> BenchmarkResult:
+    """Run a benchmark repeat times, keeping the fastest run, and return its throughput."""
+    best_seconds, items = float("inf"), 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        items = run()
+        best_seconds = min(best_seconds, time.perf_counter() - started)
+    return {
+        "seconds": best_seconds,
+        "items": items,
+        "items_per_second": items / best_seconds if best_seconds else 0.0,
+    }
+
+
+def is_valid_line(line: str) -> bool:
+    try:
+        FastEmployeeScheduleSerializer(line).serialize()
+    except (ValueError, StartGreaterThanEndError):
+        return False
+    return True
+
+
+def run_benchmarks(spec: DatasetSpec, repeat: int = 3) -> Dict[str, BenchmarkResult]:
+    """
+    Measure every stage on the valid lines of a dataset. Datasets with bad lines also get an
+    end_to_end.rejects run pricing all of their lines in batch mode, writing bad lines to a
+    reject file instead of stopping at the first one.
+    """
+    all_lines = list(generate_lines(spec))
+    lines = [line for line in all_lines if is_valid_line(line)]
+    schedules = [FastEmployeeScheduleSerializer(line).serialize() for line in lines]
+    strptime_schedules = [EmployeeScheduleSerializer(line).serialize() for line in lines]
+    text = "\n".join(lines) + "\n"
+    # Teams of about SHARED_ROTA_EMPLOYEES employees working the very same rota.
+    rotas = [line.partition("=")[2] for line in lines[: max(1, len(lines) // SHARED_ROTA_EMPLOYEES)]]
+    shared_rota_schedules = [
+        FastEmployeeScheduleSerializer(f"EMPLOYEE{index}={rotas[index % len(rotas)]}").serialize()
+        for index in range(len(lines))
+    ]
+
+    def parse_strptime() -> int:
+        for line in lines:
+            EmployeeScheduleSerializer(line).serialize()
+        return len(lines)
+
+    def parse_fast() -> int:
+        for line in lines:
+            FastEmployeeScheduleSerializer(line).serialize()
+        return len(lines)
+
+    def price_compiled() -> int:
+        for schedule in schedules:
+            schedule.calculate_salary()
+        return len(schedules)
+
+    def price_pay_cache() -> int:
+        pay_cache = ShiftPayCache()
+        for schedule in schedules:
+            schedule.calculate_salary(pay_cache=pay_cache)
+        return len(schedules)
+
+    def price_shared_rotas() -> int:
+        for schedule in shared_rota_schedules:
+            schedule.calculate_salary()
+        return len(shared_rota_schedules)
+
+    def price_shared_rotas_pay_cache() -> int:
+        pay_cache = ShiftPayCache()
+        for schedule in shared_rota_schedules:
+            schedule.calculate_salary(pay_cache=pay_cache)
+        return len(shared_rota_schedules)
+
+    def price_intersections() -> int:
+        for schedule in strptime_schedules:
+            schedule.calculate_salary_by_intersections()
+        return len(strptime_schedules)
+
+    def format_schedules() -> int:
+        for schedule in schedules:
+            str(schedule)
+        return len(schedules)
+
+    def end_to_end() -> int:
+        output = io.StringIO()
+        return write_records(
+            calculate_salaries(read_lines(io.StringIO(text))), output, "csv"
+        )
+
+    benchmarks = {
+        "parse.strptime": parse_strptime,
+        "parse.fast": parse_fast,
+        "price.compiled": price_compiled,
+        "price.pay_cache": price_pay_cache,
+        "price.shared_rotas.compiled": price_shared_rotas,
+        "price.shared_rotas.pay_cache": price_shared_rotas_pay_cache,
+        "price.intersections": price_intersections,
+        "format.str": format_schedules,
+        "end_to_end.csv": end_to_end,
+    }
+    results = {name: measure(run, repeat) for name, run in benchmarks.items()}
+    if len(lines) < len(all_lines):
+        results["end_to_end.rejects"] = measure_batch_with_rejects(all_lines, repeat)
+    return results
+
+
+def measure_batch_with_rejects(lines: List[str], repeat: int) -> BenchmarkResult:
+    with tempfile.TemporaryDirectory() as directory:
+        input_path = os.path.join(directory, "schedules.txt")
+        with open(input_path, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+
+        def end_to_end_rejects() -> int:
+            result = run_batch(
+                input_path,
+                os.path.join(directory, "salaries.csv"),
+                "csv",
+                os.path.join(directory, "rejects.jsonl"),
+            )
+            return result.records + result.rejected
+
+        return measure(end_to_end_rejects, repeat)
+
+
+def create_report(spec: DatasetSpec, results: Dict[str, BenchmarkResult]) -> Dict:
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "dataset": asdict(spec),
+        "results": results,
+    }
+
+
+def find_regressions(
+    report: Dict, baseline: Dict, threshold: float = REGRESSION_THRESHOLD
+) -> List[str]:
+    """Return the benchmarks whose throughput dropped more than threshold against baseline."""
+    regressions = []
+    for name, result in report["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or not previous["items_per_second"]:
+            continue
+        change = result["items_per_second"] / previous["items_per_second"] - 1
+        if change < -threshold:
+            regressions.append(f"{name}: {change:+.1%} items per second")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    defaults = DatasetSpec(employees=20000)
+    parser = argparse.ArgumentParser(description="Benchmark every payroll stage.")
+    parser.add_argument("-n", "--employees", type=int, default=defaults.employees)
+    parser.add_argument("--spans", type=int, default=defaults.spans_per_employee)
+    parser.add_argument("--overlap-rate", type=float, default=defaults.overlap_rate)
+    parser.add_argument("--midnight-rate", type=float, default=defaults.midnight_rate)
+    parser.add_argument("--standard-shift-rate", type=float, default=defaults.standard_shift_rate)
+    parser.add_argument("--bad-line-rate", type=float, default=defaults.bad_line_rate)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("-o", "--output", help="file to write the JSON report to")
+    parser.add_argument("--compare", metavar="BASELINE", help="JSON report to compare against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    spec = DatasetSpec(
+        employees=args.employees,
+        spans_per_employee=args.spans,
+        overlap_rate=args.overlap_rate,
+        midnight_rate=args.midnight_rate,
+        standard_shift_rate=args.standard_shift_rate,
+        bad_line_rate=args.bad_line_rate,
+        seed=args.seed,
+    )
+    report = create_report(spec, run_benchmarks(spec, args.repeat))
+    for name, result in report["results"].items():
+        print(
+            f"{name:<30}{result['items_per_second']:>14,.0f} items/s{result['seconds']:>10.3f} s",
+            file=sys.stderr,
+        )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            regressions = find_regressions(report, json.load(file), args.threshold)
+        for regression in regressions:
+            print(f"regression: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
@@ -0,0 +1,126 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence
+
+# Modules a plain `python -m salary_calculator` run should never need to import.
+LEAN_FORBIDDEN_IMPORTS = (
+    "argparse",
+    "calendar",
+    "cProfile",
+    "dataclasses",
+    "datetime",
+    "decimal",
+    "enum",
+    "hashlib",
+    "re",
+    "salary_calculator.classes",
+    "salary_calculator.cli",
+    "salary_calculator.pipeline",
+    "salary_calculator.rates",
+    "salary_calculator.serializers",
+    "salary_calculator.utils",
+    "typing",
+)
+
+SAMPLE_LINE = "RENE=MO10:00-12:00,TU10:00-12:00,TH01:00-03:00,SA14:00-18:00,SU20:00-21:00\n"
+
+
+@dataclass
+class StartupResult:
+    seconds: float
+    imports: Dict[str, int]
+
+    @property
+    def import_microseconds(self) -> int:
+        return sum(self.imports.values())
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    """Return the self import time in microseconds of every module an -X importtime run imported."""
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        self_time, _, module = line[len("import time:") :].split("|")
+        if self_time.strip().isdigit():
+            imports[module.strip()] = int(self_time)
+    return imports
+
+
+def measure_startup(arguments: Sequence[str], repeat: int = 5) -> StartupResult:
+    """
+    Run `python -m salary_calculator ARGUMENTS` on a one line schedule file repeat times and
+    return the best wall time to the first salary, plus the modules imported along the way.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        input_path = os.path.join(directory, "schedule.txt")
+        with open(input_path, "w", encoding="utf-8") as file:
+            file.write(SAMPLE_LINE)
+        command = [sys.executable, "-m", "salary_calculator", input_path, *arguments]
+        best = float("inf")
+        for _ in range(repeat):
+            started = time.perf_counter()
+            subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+            best = min(best, time.perf_counter() - started)
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", *command[1:]],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
+    return StartupResult(best, parse_importtime(completed.stderr))
+
+
+def measure_interpreter_startup(repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "pass"], check=True)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def find_forbidden_imports(result: StartupResult) -> List[str]:
+    return [module for module in LEAN_FORBIDDEN_IMPORTS if module in result.imports]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure the time to the first salary of short lived runs."
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--max-overhead-ms",
+        type=float,
+        default=50.0,
+        help="fail when a lean run takes longer than this over a bare interpreter start up",
+    )
+    args = parser.parse_args(argv)
+
+    interpreter = measure_interpreter_startup(args.repeat)
+    lean = measure_startup([], args.repeat)
+    full = measure_startup(["--workers", "1"], args.repeat)
+    print(f"{'run':<14}{'first salary':>14}{'overhead':>12}{'imports':>10}{'import time':>14}")
+    for name, result in (("lean", lean), ("full cli", full)):
+        print(
+            f"{name:<14}{result.seconds * 1000:>12.1f}ms"
+            f"{(result.seconds - interpreter) * 1000:>10.1f}ms"
+            f"{len(result.imports):>10}{result.import_microseconds / 1000:>12.1f}ms"
+        )
+    failures = [f"lean run imports {module}" for module in find_forbidden_imports(lean)]
+    overhead_ms = (lean.seconds - interpreter) * 1000
+    if overhead_ms > args.max_overhead_ms:
+        failures.append(f"lean run overhead {overhead_ms:.1f}ms > {args.max_overhead_ms}ms")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
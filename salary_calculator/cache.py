@@ -0,0 +1,109 @@
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+Value = TypeVar("Value")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __str__(self) -> str:
+        return "hits=%d misses=%d evictions=%d hit_ratio=%.4f" % (
+            self.hits,
+            self.misses,
+            self.evictions,
+            self.hit_ratio,
+        )
+
+
+class LRUCache(Generic[Value]):
+    """
+    Mapping bounded to maxsize entries, evicting the least recently used one first.
+    Lookups update hit/miss/eviction counters, and every operation holds a lock,
+    so a cache can be shared across threads of the same process.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        if maxsize < 1:
+            raise ValueError(f"cache size:{maxsize} should be a positive number")
+        self.maxsize = maxsize
+        self.stats = CacheStats()
+        self.__entries: "OrderedDict[Hashable, Value]" = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self.__entries
+
+    def get(self, key: Hashable, default: Optional[Value] = None) -> Optional[Value]:
+        with self.__lock:
+            try:
+                self.__entries.move_to_end(key)
+            except KeyError:
+                self.stats.misses += 1
+                return default
+            self.stats.hits += 1
+            return self.__entries[key]
+
+    def put(self, key: Hashable, value: Value) -> None:
+        with self.__lock:
+            self.__entries[key] = value
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.maxsize:
+                self.__entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Value]) -> Value:
+        # The factory runs without holding the lock, two threads missing the same key
+        # may both create the value, and the last one is kept.
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+
+
+SpanPricer = Callable[[int, int, int], Decimal]
+
+
+class ShiftPayCache(LRUCache[Decimal]):
+    """
+    Memoized pay of single working day spans, keyed by (rate table content hash, weekday,
+    start minute, end minute). Values are the already per slot quantized amounts, so sharing
+    them between employees and threads gives the very same salaries. Schedules repeating a
+    whole rota are better served by dedup, which prices every distinct rota once.
+    """
+
+    def __init__(self, maxsize: int = 1 << 16) -> None:
+        super().__init__(maxsize)
+
+    def memoize(self, rate_table_key: str, price: SpanPricer) -> SpanPricer:
+        """Wrap a (weekday, start, end) pricer of the rate table rate_table_key names."""
+        get, put = self.get, self.put
+
+        def cached_price(weekday: int, start: int, end: int) -> Decimal:
+            key = (rate_table_key, weekday, start, end)
+            pay = get(key)
+            if pay is None:
+                pay = price(weekday, start, end)
+                put(key, pay)
+            return pay
+
+        return cached_price
@@ -0,0 +1,147 @@
+from decimal import Decimal
+from functools import partial
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from salary_calculator.cache import LRUCache
+from salary_calculator.classes import (EmployeeSchedule, IntersectionTypes,
+                                       MinuteSpan, WorkingDaySpan,
+                                       get_payment_slots)
+from salary_calculator.integer_days import IntegerDay, divide_half_even
+from salary_calculator.pipeline import SalaryRecord, serialize_lines
+from salary_calculator.rates import (DEFAULT_CACHE_SIZE, QUANTIZED_HOURS,
+                                     CompiledDay, RateTable,
+                                     get_compiled_rate_table)
+
+ROUNDING_MODES = ("legacy", "exact")
+
+# Hundredths of an hour for every amount of minutes, rounded the way the Decimal engine does it.
+HOUR_CENTS = [int(hours * 100) for hours in QUANTIZED_HOURS]
+
+
+def get_amount_decimals(amount: Decimal) -> int:
+    return max(0, -amount.normalize().as_tuple().exponent)
+
+
+def cents_to_salary(cents: int) -> Decimal:
+    return Decimal(cents).scaleb(-2)
+
+
+def build_integer_day(day: CompiledDay, scale: int, rounding: str) -> IntegerDay:
+    # Hours of every slot are rounded to hundredths in legacy mode, never in exact mode.
+    slot_units = HOUR_CENTS if rounding == "legacy" else range(len(HOUR_CENTS))
+    amounts = [int(amount * scale) for amount in day.amounts]
+    return IntegerDay(day.next_slot, day.prev_slot, day.starts, day.ends, amounts, slot_units)
+
+
+class CentsRateTable:
+    """
+    Rate table pricing schedules in integers only, converting to Decimal at the output.
+
+    With "legacy" rounding the hours of every slot are rounded to hundredths first, giving the
+    very same salaries as EmployeeSchedule.calculate_salary. With "exact" rounding minutes are
+    paid as they are and only the salary gets rounded, half to even, to cents.
+    """
+
+    def __init__(self, rate_table: RateTable, rounding: str = "legacy") -> None:
+        if rounding not in ROUNDING_MODES:
+            raise ValueError(f"rounding:{rounding} should be one of {ROUNDING_MODES}")
+        self.rate_table = rate_table
+        self.rounding = rounding
+        compiled = get_compiled_rate_table(rate_table)
+        self.decimals = max(
+            (
+                get_amount_decimals(amount)
+                for day in compiled.days.values()
+                for amount in day.amounts
+            ),
+            default=0,
+        )
+        scale = 10 ** self.decimals
+        self.__slot_units = HOUR_CENTS if rounding == "legacy" else range(len(HOUR_CENTS))
+        integer_days: Dict[int, IntegerDay] = {}
+        self.days: Dict[int, IntegerDay] = {}
+        for weekday, day in compiled.days.items():
+            if id(day) not in integer_days:
+                integer_days[id(day)] = build_integer_day(day, scale, rounding)
+            self.days[weekday] = integer_days[id(day)]
+        # Units per cent: 10 ** decimals times hundredths of an hour, or times 60 minutes / 100.
+        if rounding == "legacy":
+            self.__units_per_cent = (scale, 1)
+        else:
+            self.__units_per_cent = (60 * scale, 100)
+
+    def price_span_units(self, weekday: int, start: int, end: int) -> int:
+        return self.days[weekday].price(start, end)
+
+    def units_to_cents(self, units: int) -> int:
+        denominator, multiplier = self.__units_per_cent
+        return divide_half_even(units * multiplier, denominator)
+
+    def calculate_cents(self, schedule: EmployeeSchedule) -> int:
+        units = 0
+        days = self.days
+        for employee_slot in schedule.working_days_spans:
+            span = employee_slot.span
+            if span.__class__ is MinuteSpan:
+                units += days[employee_slot.weekday].price(span.start_minute, span.end_minute)
+                continue
+            start, end = span.start, span.end
+            if start.second or start.microsecond:
+                units += self.__price_by_intersections(employee_slot)
+                continue
+            units += days[employee_slot.weekday].price(
+                start.hour * 60 + start.minute, end.hour * 60 + end.minute
+            )
+        return self.units_to_cents(units)
+
+    def __price_by_intersections(self, employee_slot: WorkingDaySpan) -> int:
+        # Spans starting at a second other than 0 are measured by TimeSpan intersections.
+        units = 0
+        scale = 10 ** self.decimals
+        for payment_slot in get_payment_slots(self.rate_table)[employee_slot.weekday]:
+            case, minutes = payment_slot.span.get_intersection(employee_slot.span)
+            if case != IntersectionTypes.NO_INTERSECTION:
+                rate_units = int(payment_slot.hour_amount * scale)
+                units += rate_units * self.__slot_units[int(minutes)]
+        return units
+
+    def calculate_salary(self, schedule: EmployeeSchedule) -> Decimal:
+        return cents_to_salary(self.calculate_cents(schedule))
+
+
+cents_rate_tables: LRUCache[CentsRateTable] = LRUCache(DEFAULT_CACHE_SIZE)
+
+
+def get_cents_rate_table(
+    rate_table: Optional[RateTable] = None, rounding: str = "legacy"
+) -> CentsRateTable:
+    """Return the integer version of a table (the default one if None), built once per content."""
+    rate_table = rate_table or EmployeeSchedule.get_default_rate_table()
+    return cents_rate_tables.get_or_create(
+        (rate_table.content_hash, rounding), lambda: CentsRateTable(rate_table, rounding)
+    )
+
+
+def calculate_salaries_cents(
+    lines: Iterable[str],
+    first_line_number: int = 1,
+    rate_table: Optional[RateTable] = None,
+    rounding: str = "legacy",
+) -> Iterator[SalaryRecord]:
+    cents_rate_table = get_cents_rate_table(rate_table, rounding)
+    for schedule in serialize_lines(lines, first_line_number):
+        yield schedule.username, cents_rate_table.calculate_salary(schedule)
+
+
+def price_chunk(
+    lines: List[str],
+    first_line_number: int = 1,
+    rate_table: Optional[RateTable] = None,
+    rounding: str = "legacy",
+) -> List[SalaryRecord]:
+    return list(calculate_salaries_cents(lines, first_line_number, rate_table, rounding))
+
+
+def get_chunk_pricer(rounding: str) -> Callable[..., List[SalaryRecord]]:
+    """Return a picklable chunk pricer for calculate_salaries_parallel."""
+    return partial(price_chunk, rounding=rounding)
@@ -1,13 +1,23 @@
-import calendar
 from dataclasses import dataclass, field
 from datetime import time
 from decimal import Decimal
 from enum import Enum
-from typing import List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from salary_calculator.exceptions import StartGreaterThanEndError
-from salary_calculator.utils import (get_abbrev_by_calendar_day, normalize,
-                                     substract_time_values)
+from salary_calculator.cache import LRUCache, ShiftPayCache
+from salary_calculator.default_rates import (DEFAULT_HOUR_AMOUNTS,
+                                             DEFAULT_SLOT_BOUNDS)
+from salary_calculator.exceptions import (OverlappingSpansError,
+                                          StartGreaterThanEndError)
+from salary_calculator.instrumentation import instrumentation
+from salary_calculator.rates import (DEFAULT_CACHE_SIZE, CompiledRateTable,
+                                     RateTable, get_compiled_rate_table)
+from salary_calculator.utils import (get_abbrev_by_calendar_day,
+                                     minutes_to_time, normalize,
+                                     substract_time_values, time_to_minutes)
+
+LAST_MINUTE = 24 * 60 - 1
+NORMALIZED_MIDNIGHT = time(23, 59, 59)
 
 
 class IntersectionTypes(Enum):
@@ -18,6 +28,11 @@ class IntersectionTypes(Enum):
     END_BOUNDED = 5
 
 
+class SpanConflictTypes(Enum):
+    DUPLICATE = 1
+    OVERLAP = 2
+
+
 @dataclass
 class TimeSpan:
     start: time
@@ -32,6 +47,8 @@ class TimeSpan:
             )
         self.raw_end = end
         self.start, self.end = start, normalized_end
+        if instrumentation.enabled:
+            instrumentation.count("timespan.built")
 
     def __eq__(self, other):
         return (self.start, self.end) == (other.start, other.end)
@@ -103,8 +120,117 @@ class TimeSpan:
         return current_case, intersection_mins
 
 
+class MinuteSpan:
+    """
+    Compact TimeSpan storing minutes since midnight in slots instead of time values.
+
+    Ends at midnight are normalized the same way TimeSpan does it: end_minute holds 23:59
+    while raw_end_minute keeps 0, and comparisons treat such an end as 23:59:59.
+    The start, end and raw_end time attributes of TimeSpan are still available.
+    """
+
+    __slots__ = ("start_minute", "end_minute", "raw_end_minute")
+
+    def __init__(self, start_minute: int, end_minute: int) -> None:
+        normalized_end = end_minute or LAST_MINUTE
+        if start_minute > normalized_end:
+            raise StartGreaterThanEndError(
+                f"start time({minutes_to_time(start_minute)}) should be greather or equal to end time({minutes_to_time(end_minute)})"
+            )
+        self.start_minute = start_minute
+        self.end_minute = normalized_end
+        self.raw_end_minute = end_minute
+        if instrumentation.enabled:
+            instrumentation.count("minute_span.built")
+
+    @classmethod
+    def from_times(cls, start: time, end: time) -> "MinuteSpan":
+        if start.second or start.microsecond or end.second or end.microsecond:
+            raise ValueError(f"span {start}-{end} should be made of whole minutes")
+        return cls(time_to_minutes(start), time_to_minutes(end))
+
+    @property
+    def start(self) -> time:
+        return minutes_to_time(self.start_minute)
+
+    @property
+    def end(self) -> time:
+        if self.raw_end_minute == 0:
+            return NORMALIZED_MIDNIGHT
+        return minutes_to_time(self.end_minute)
+
+    @property
+    def raw_end(self) -> time:
+        return minutes_to_time(self.raw_end_minute)
+
+    def get_bounds_in_seconds(self) -> Tuple[int, int]:
+        end_second = self.end_minute * 60
+        if self.raw_end_minute == 0:
+            end_second += 59
+        return self.start_minute * 60, end_second
+
+    def __eq__(self, other):
+        if other.__class__ is MinuteSpan:
+            return self.get_bounds_in_seconds() == other.get_bounds_in_seconds()
+        return (self.start, self.end) == (other.start, other.end)
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    def __lt__(self, other):
+        if other.__class__ is MinuteSpan:
+            return self.get_bounds_in_seconds() < other.get_bounds_in_seconds()
+        return (self.start, self.end) < (other.start, other.end)
+
+    def __le__(self, other):
+        return self < other or self == other
+
+    def __gt__(self, other):
+        if other.__class__ is MinuteSpan:
+            return self.get_bounds_in_seconds() > other.get_bounds_in_seconds()
+        return (self.start, self.end) > (other.start, other.end)
+
+    def __ge__(self, other):
+        return self > other or self == other
+
+    def __hash__(self):
+        return hash(self.get_bounds_in_seconds())
+
+    def __str__(self):
+        return "%s-%s[%s]" % (
+            self.start.strftime("%H:%M"),
+            self.end.strftime("%H:%M"),
+            self.raw_end.strftime("%H:%M"),
+        )
+
+    def __repr__(self):
+        return self.__str__()
+
+    def get_simple_format(self) -> str:
+        return "%s-%s" % (self.start.strftime("%H:%M"), self.raw_end.strftime("%H:%M"))
+
+    def get_intersection(self, other) -> Tuple[IntersectionTypes, int]:
+        if other.__class__ is not MinuteSpan:
+            other = MinuteSpan.from_times(other.start, other.raw_end)
+        self_start, self_end = self.get_bounds_in_seconds()
+        other_start, other_end = other.get_bounds_in_seconds()
+        start_is_bounded = self_start <= other_start <= self_end
+        end_is_bounded = self_start <= other_end <= self_end
+
+        if start_is_bounded and end_is_bounded:
+            return IntersectionTypes.FITS_IN_CURRENT, (other_end - other_start) // 60
+        if other_start <= self_start <= other_end and other_start <= self_end <= other_end:
+            return IntersectionTypes.EXCEEDS_CURRENT, (self_end - self_start) // 60
+        if start_is_bounded:
+            return IntersectionTypes.START_BOUNDED, (self_end - other_start) // 60
+        if end_is_bounded:
+            return IntersectionTypes.END_BOUNDED, (other_end - self_start) // 60
+        return IntersectionTypes.NO_INTERSECTION, 0
+
+
 @dataclass
 class WorkingDaySpan:
+    __slots__ = ("weekday", "span")
     weekday: int
     span: TimeSpan
 
@@ -112,6 +238,13 @@ class WorkingDaySpan:
         self.span = TimeSpan(start, end)
         self.weekday = weekday
 
+    @classmethod
+    def from_minutes(cls, *, weekday: int, start: int, end: int) -> "WorkingDaySpan":
+        working_day_span = cls.__new__(cls)
+        working_day_span.span = MinuteSpan(start, end)
+        working_day_span.weekday = weekday
+        return working_day_span
+
     def __str__(self) -> str:
         abbrev_weekday = get_abbrev_by_calendar_day(self.weekday)
         formated_span = self.span.get_simple_format()
@@ -120,6 +253,7 @@ class WorkingDaySpan:
 
 @dataclass
 class PaymentTimeSlot:
+    __slots__ = ("span", "hour_amount")
     span: TimeSpan
     hour_amount: Decimal
 
@@ -127,11 +261,109 @@ class PaymentTimeSlot:
         self.span = TimeSpan(start, end)
         self.hour_amount = hour_amount
 
+    @classmethod
+    def from_minutes(cls, *, start: int, end: int, hour_amount: Decimal) -> "PaymentTimeSlot":
+        payment_slot = cls.__new__(cls)
+        payment_slot.span = MinuteSpan(start, end)
+        payment_slot.hour_amount = hour_amount
+        return payment_slot
+
+
+def get_span_bounds(span) -> Tuple[int, int]:
+    """Return the start and normalized end of a TimeSpan or MinuteSpan in seconds since midnight."""
+    if span.__class__ is MinuteSpan:
+        return span.get_bounds_in_seconds()
+    start, end = span.start, span.end
+    return (
+        start.hour * 3600 + start.minute * 60 + start.second,
+        end.hour * 3600 + end.minute * 60 + end.second,
+    )
+
+
+def merge_working_day_spans(first: WorkingDaySpan, last: WorkingDaySpan) -> WorkingDaySpan:
+    """Return a span from the start of first up to the (raw) end of last."""
+    if first is last:
+        return first
+    if first.span.__class__ is MinuteSpan and last.span.__class__ is MinuteSpan:
+        return WorkingDaySpan.from_minutes(
+            weekday=first.weekday,
+            start=first.span.start_minute,
+            end=last.span.raw_end_minute,
+        )
+    return WorkingDaySpan(
+        weekday=first.weekday, start=first.span.start, end=last.span.raw_end
+    )
+
+
+@dataclass
+class SpanConflict:
+    weekday: int
+    first: WorkingDaySpan
+    second: WorkingDaySpan
+    conflict_type: SpanConflictTypes
+
+    def __str__(self) -> str:
+        description = (
+            "is duplicated"
+            if self.conflict_type == SpanConflictTypes.DUPLICATE
+            else f"overlaps {self.second.span.get_simple_format()}"
+        )
+        return (
+            f"{get_abbrev_by_calendar_day(self.weekday)} "
+            f"{self.first.span.get_simple_format()} {description}"
+        )
+
+
+BandKey = Tuple[int, str]
+BandAmounts = List[Tuple[str, int, Decimal]]
+
+
+class SalaryLedger:
+    """
+    Running salary of a schedule broken down by week day and rate band.
+
+    Amounts are kept exact (hours are still rounded per slot, as in a full calculation)
+    and only the total is quantized, so adding and removing spans never drifts from
+    calculate_salary.
+    """
+
+    __slots__ = ("rate_table", "totals", "total", "spans")
+
+    def __init__(self, rate_table: Optional[RateTable] = None) -> None:
+        self.rate_table = rate_table
+        self.totals: Dict[BandKey, Decimal] = {}
+        self.total = Decimal(0)
+        self.spans = 0
+
+    def add(self, weekday: int, band_amounts: BandAmounts) -> None:
+        for band, _, amount in band_amounts:
+            key = weekday, band
+            self.totals[key] = self.totals.get(key, Decimal(0)) + amount
+            self.total += amount
+        self.spans += 1
+
+    def remove(self, weekday: int, band_amounts: BandAmounts) -> None:
+        for band, _, amount in band_amounts:
+            key = weekday, band
+            remaining = self.totals[key] - amount
+            if remaining:
+                self.totals[key] = remaining
+            else:
+                del self.totals[key]
+            self.total -= amount
+        self.spans -= 1
+
+    def get_salary(self) -> Decimal:
+        return self.total.quantize(Decimal("0.01"))
+
 
 @dataclass
 class EmployeeSchedule:
     username: Optional[str] = None
     working_days_spans: List[WorkingDaySpan] = field(default_factory=list)
+    salary_ledger: Optional[SalaryLedger] = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     """
     |                | M  | T  | W  | Th | F  | Sa | Su |
@@ -143,122 +375,321 @@ class EmployeeSchedule:
     """
 
     __weekday_time_payments = {
-        calendar.SUNDAY: [
-            PaymentTimeSlot(
-                start=time(0, 1, 0), end=time(9, 0, 0), hour_amount=Decimal(30.0)
-            ),
-            PaymentTimeSlot(
-                start=time(9, 1, 0), end=time(18, 0, 0), hour_amount=Decimal(20.0)
-            ),
-            PaymentTimeSlot(
-                start=time(18, 1, 0), end=time(0, 0, 0), hour_amount=Decimal(25.0)
-            ),
-        ],
-        calendar.MONDAY: [
-            PaymentTimeSlot(
-                start=time(0, 1, 0), end=time(9, 0, 0), hour_amount=Decimal(25.0)
-            ),
-            PaymentTimeSlot(
-                start=time(9, 1, 0), end=time(18, 0, 0), hour_amount=Decimal(15.0)
-            ),
-            PaymentTimeSlot(
-                start=time(18, 1, 0), end=time(0, 0, 0), hour_amount=Decimal(20.0)
-            ),
-        ],
-        calendar.TUESDAY: [
-            PaymentTimeSlot(
-                start=time(0, 1, 0), end=time(9, 0, 0), hour_amount=Decimal(25.0)
-            ),
-            PaymentTimeSlot(
-                start=time(9, 1, 0), end=time(18, 0, 0), hour_amount=Decimal(15.0)
-            ),
+        weekday: [
             PaymentTimeSlot(
-                start=time(18, 1, 0), end=time(0, 0, 0), hour_amount=Decimal(20.0)
-            ),
-        ],
-        calendar.WEDNESDAY: [
-            PaymentTimeSlot(
-                start=time(0, 1, 0), end=time(9, 0, 0), hour_amount=Decimal(25.0)
-            ),
-            PaymentTimeSlot(
-                start=time(9, 1, 0), end=time(18, 0, 0), hour_amount=Decimal(15.0)
-            ),
-            PaymentTimeSlot(
-                start=time(18, 1, 0), end=time(0, 0, 0), hour_amount=Decimal(20.0)
-            ),
-        ],
-        calendar.THURSDAY: [
-            PaymentTimeSlot(
-                start=time(0, 1, 0), end=time(9, 0, 0), hour_amount=Decimal(25.0)
-            ),
-            PaymentTimeSlot(
-                start=time(9, 1, 0), end=time(18, 0, 0), hour_amount=Decimal(15.0)
-            ),
-            PaymentTimeSlot(
-                start=time(18, 1, 0), end=time(0, 0, 0), hour_amount=Decimal(20.0)
-            ),
-        ],
-        calendar.FRIDAY: [
-            PaymentTimeSlot(
-                start=time(0, 1, 0), end=time(9, 0, 0), hour_amount=Decimal(25.0)
-            ),
-            PaymentTimeSlot(
-                start=time(9, 1, 0), end=time(18, 0, 0), hour_amount=Decimal(15.0)
-            ),
-            PaymentTimeSlot(
-                start=time(18, 1, 0), end=time(0, 0, 0), hour_amount=Decimal(20.0)
-            ),
-        ],
-        calendar.SATURDAY: [
-            PaymentTimeSlot(
-                start=time(0, 1, 0), end=time(9, 0, 0), hour_amount=Decimal(30.0)
-            ),
-            PaymentTimeSlot(
-                start=time(9, 1, 0), end=time(18, 0, 0), hour_amount=Decimal(20.0)
-            ),
-            PaymentTimeSlot(
-                start=time(18, 1, 0), end=time(0, 0, 0), hour_amount=Decimal(25.0)
-            ),
-        ],
+                start=minutes_to_time(start),
+                end=minutes_to_time(end),
+                hour_amount=Decimal(hour_amount),
+            )
+            for (start, end), hour_amount in zip(DEFAULT_SLOT_BOUNDS, hour_amounts)
+        ]
+        for weekday, hour_amounts in DEFAULT_HOUR_AMOUNTS.items()
     }
 
-    def __str__(self) -> str:
-        weekday_grouped_spans = {}
-        for span in self.working_days_spans:
-            if span.weekday not in weekday_grouped_spans:
-                weekday_grouped_spans[span.weekday] = []
-            sorted_list = list(
-                sorted(
-                    weekday_grouped_spans[span.weekday] + [span], key=lambda s: s.span
-                )
-            )
-            weekday_grouped_spans[span.weekday] = sorted_list
+    __default_rate_table = RateTable.from_payment_slots(
+        __weekday_time_payments, name="default"
+    )
+    __compiled_time_payments = get_compiled_rate_table(__default_rate_table)
+
+    @classmethod
+    def get_default_rate_table(cls) -> RateTable:
+        return cls.__default_rate_table
 
+    @classmethod
+    def get_compiled_time_payments(cls) -> CompiledRateTable:
+        return cls.__compiled_time_payments
+
+    def __str__(self) -> str:
+        weekday_index = self.get_weekday_index()
         formated_spans = "\t"
         formated_spans += "\n\t".join(
             [
                 (get_abbrev_by_calendar_day(weekday) + "\n\t\t")
-                + "\n\t\t".join(
-                    [s.span.get_simple_format() for s in weekday_grouped_spans[weekday]]
-                )
-                for weekday in weekday_grouped_spans.keys()
+                + "\n\t\t".join([s.span.get_simple_format() for s in spans])
+                for weekday, spans in weekday_index.items()
             ]
         )
         return f"{self.username}\n{formated_spans}"
 
-    def calculate_salary(self) -> Decimal:
+    def get_weekday_index(self) -> Dict[int, List[WorkingDaySpan]]:
+        """
+        Group spans by week day, in order of first appearance, each group sorted by start and
+        end. A single sort per week day, so O(n log n) overall.
+        """
+        weekday_index: Dict[int, List[WorkingDaySpan]] = {}
+        for employee_slot in self.working_days_spans:
+            weekday_index.setdefault(employee_slot.weekday, []).append(employee_slot)
+        for spans in weekday_index.values():
+            spans.sort(key=lambda employee_slot: get_span_bounds(employee_slot.span))
+        return weekday_index
+
+    def find_conflicts(self) -> List[SpanConflict]:
+        """
+        Sweep the spans of every week day in order, reporting spans repeating the previous one
+        and spans starting before the furthest end seen so far, which would be paid twice.
+        Spans only touching at a bound do not overlap, the same way intersections measure them.
+        """
+        conflicts = []
+        for weekday, spans in self.get_weekday_index().items():
+            previous_span = previous_bounds = reach_span = None
+            reach_end = -1
+            for employee_slot in spans:
+                bounds = get_span_bounds(employee_slot.span)
+                if bounds == previous_bounds:
+                    conflict_type, other_span = SpanConflictTypes.DUPLICATE, previous_span
+                elif bounds[0] < reach_end:
+                    conflict_type, other_span = SpanConflictTypes.OVERLAP, reach_span
+                else:
+                    conflict_type = None
+                if conflict_type is not None:
+                    conflicts.append(
+                        SpanConflict(weekday, other_span, employee_slot, conflict_type)
+                    )
+                if bounds[1] > reach_end:
+                    reach_span, reach_end = employee_slot, bounds[1]
+                previous_span, previous_bounds = employee_slot, bounds
+        return conflicts
+
+    def validate_spans(self, line_number: Optional[int] = None) -> None:
+        conflicts = self.find_conflicts()
+        if conflicts:
+            reason = f"{self.username}: {conflicts[0]}"
+            if len(conflicts) > 1:
+                reason += f" (and {len(conflicts) - 1} more conflicting spans)"
+            raise OverlappingSpansError(reason, line_number, conflicts)
+
+    def merge_overlapping_spans(self, merge_adjacent: bool = False) -> "EmployeeSchedule":
+        """
+        Return a schedule where overlapping and duplicated spans of every week day are merged,
+        and spans only touching at a bound too when merge_adjacent is set.
+        Merging touching spans may change the pay, since hours are rounded per span.
+        """
+        merged_spans = []
+        for spans in self.get_weekday_index().values():
+            first = last = None
+            reach_bounds = None
+            for employee_slot in spans:
+                bounds = get_span_bounds(employee_slot.span)
+                if first is not None and (
+                    bounds[0] < reach_bounds[1]
+                    or bounds == reach_bounds
+                    or (merge_adjacent and bounds[0] == reach_bounds[1])
+                ):
+                    if bounds[1] > reach_bounds[1]:
+                        last, reach_bounds = employee_slot, (reach_bounds[0], bounds[1])
+                    continue
+                if first is not None:
+                    merged_spans.append(merge_working_day_spans(first, last))
+                first = last = employee_slot
+                reach_bounds = bounds
+            if first is not None:
+                merged_spans.append(merge_working_day_spans(first, last))
+        return EmployeeSchedule(username=self.username, working_days_spans=merged_spans)
+
+    def calculate_salary(
+        self,
+        rate_table: Optional[RateTable] = None,
+        pay_cache: Optional[ShiftPayCache] = None,
+    ) -> Decimal:
+        """
+        Sum up the payment of every working day span using the compiled rate table.
+        Produces the very same amounts as calculate_salary_by_intersections, including the
+        per slot rounding of worked hours, without intersecting every pair of spans.
+        The default payment slots are used unless another rate_table is given, and the pay
+        of every span starting on a whole minute is memoized into pay_cache when one is given.
+        """
+        decimal_two_places = Decimal("0.01")
+        salary = Decimal(0)
+        if rate_table is None:
+            price = self.__compiled_time_payments.price
+        else:
+            price = get_compiled_rate_table(rate_table).price
+        if pay_cache is not None:
+            price = pay_cache.memoize((rate_table or self.__default_rate_table).content_hash, price)
+        for employee_slot in self.working_days_spans:
+            span = employee_slot.span
+            if span.__class__ is MinuteSpan:
+                salary += price(employee_slot.weekday, span.start_minute, span.end_minute)
+                continue
+            start, end = span.start, span.end
+            if start.second or start.microsecond:
+                salary += self.__calculate_span_by_intersections(employee_slot, rate_table)
+                continue
+            salary += price(
+                employee_slot.weekday,
+                start.hour * 60 + start.minute,
+                end.hour * 60 + end.minute,
+            )
+        if instrumentation.enabled:
+            instrumentation.count("price.compiled_spans", len(self.working_days_spans))
+            instrumentation.count("decimal.quantize_calls")
+        return salary.quantize(decimal_two_places)
+
+    def calculate_salary_by_intersections(
+        self, rate_table: Optional[RateTable] = None
+    ) -> Decimal:
         decimal_two_places = Decimal("0.01")
         salary = Decimal(0.0)
         for employee_slot in self.working_days_spans:
-            for payment_slot in self.__weekday_time_payments[employee_slot.weekday]:
-                (
-                    intersection_result,
-                    intersection_mins,
-                ) = payment_slot.span.get_intersection(employee_slot.span)
-                if intersection_result != IntersectionTypes.NO_INTERSECTION:
-                    intersection_hours = Decimal(intersection_mins / 60).quantize(
-                        decimal_two_places
-                    )
-                    slot_amount = payment_slot.hour_amount * intersection_hours
-                    salary += slot_amount
+            salary += self.__calculate_span_by_intersections(employee_slot, rate_table)
+        if instrumentation.enabled:
+            instrumentation.count("decimal.quantize_calls")
         return salary.quantize(decimal_two_places)
+
+    def track_salary(self, rate_table: Optional[RateTable] = None) -> SalaryLedger:
+        """
+        Start keeping a running salary, so add_span, remove_span and replace_span only price
+        the spans they touch. Spans should not be edited bypassing these methods afterwards.
+        """
+        self.salary_ledger = self.__build_ledger(rate_table)
+        return self.salary_ledger
+
+    def get_tracked_salary(self) -> Decimal:
+        """
+        Return the running salary kept since track_salary, which matches calculate_salary as
+        long as spans are only edited through add_span, remove_span and replace_span.
+        """
+        if self.salary_ledger is None:
+            raise ValueError(f"salary of {self.username} is not tracked, call track_salary first")
+        return self.salary_ledger.get_salary()
+
+    def get_salary_breakdown(self) -> Dict[BandKey, Decimal]:
+        """Return the unrounded pay of every (week day, rate band) pair of the current spans."""
+        rate_table = self.salary_ledger.rate_table if self.salary_ledger is not None else None
+        return self.__build_ledger(rate_table).totals
+
+    def __build_ledger(self, rate_table: Optional[RateTable]) -> SalaryLedger:
+        ledger = SalaryLedger(rate_table)
+        for employee_slot in self.working_days_spans:
+            ledger.add(employee_slot.weekday, self.price_span_by_band(employee_slot, rate_table))
+        return ledger
+
+    def add_span(self, employee_slot: WorkingDaySpan) -> None:
+        band_amounts = self.__price_tracked_span(employee_slot)
+        self.__get_own_spans().append(employee_slot)
+        if band_amounts is not None:
+            self.salary_ledger.add(employee_slot.weekday, band_amounts)
+
+    def remove_span(self, employee_slot: WorkingDaySpan) -> None:
+        """
+        Remove the first span equal to employee_slot. Linear in the number of spans, which are
+        kept in input order: the lookup compares spans one by one and the removal shifts the
+        following ones. Only the removed span gets priced again.
+        """
+        spans = self.__get_own_spans()
+        spans.remove(employee_slot)
+        band_amounts = self.__price_tracked_span(employee_slot)
+        if band_amounts is not None:
+            self.salary_ledger.remove(employee_slot.weekday, band_amounts)
+
+    def replace_span(self, old_slot: WorkingDaySpan, new_slot: WorkingDaySpan) -> None:
+        """
+        Put new_slot in place of the first span equal to old_slot. Looking it up is linear in
+        the number of spans, as in remove_span, pricing only touches the two spans.
+        """
+        spans = self.__get_own_spans()
+        index = spans.index(old_slot)
+        old_amounts = self.__price_tracked_span(spans[index])
+        new_amounts = self.__price_tracked_span(new_slot)
+        spans[index] = new_slot
+        if old_amounts is not None:
+            self.salary_ledger.remove(old_slot.weekday, old_amounts)
+            self.salary_ledger.add(new_slot.weekday, new_amounts)
+
+    def __get_own_spans(self) -> List[WorkingDaySpan]:
+        # Deduplicated schedules share an immutable tuple of spans, copied on first edit.
+        if self.working_days_spans.__class__ is not list:
+            self.working_days_spans = list(self.working_days_spans)
+        return self.working_days_spans
+
+    def __price_tracked_span(self, employee_slot: WorkingDaySpan) -> Optional[BandAmounts]:
+        if self.salary_ledger is None:
+            return None
+        return self.price_span_by_band(employee_slot, self.salary_ledger.rate_table)
+
+    def price_span_by_band(
+        self, employee_slot: WorkingDaySpan, rate_table: Optional[RateTable] = None
+    ) -> BandAmounts:
+        """
+        Return the band, paid minutes and pay of every rate band a span overlaps, the pay
+        adding up to the full pay of the span.
+        """
+        table = self.__default_rate_table if rate_table is None else rate_table
+        slots = table.get_slots(employee_slot.weekday)
+        span = employee_slot.span
+        if span.__class__ is MinuteSpan:
+            start, end = span.start_minute, span.end_minute
+        elif span.start.second or span.start.microsecond:
+            return [
+                (slots[index].band, minutes, amount)
+                for index, minutes, amount in self.__price_slots_by_intersections(
+                    employee_slot, rate_table
+                )
+            ]
+        else:
+            start = span.start.hour * 60 + span.start.minute
+            end = span.end.hour * 60 + span.end.minute
+        compiled_day = get_compiled_rate_table(table).days[employee_slot.weekday]
+        return [
+            (slots[index].band, minutes, amount)
+            for index, minutes, amount in compiled_day.price_slots(start, end)
+        ]
+
+    def __calculate_span_by_intersections(
+        self, employee_slot: WorkingDaySpan, rate_table: Optional[RateTable] = None
+    ) -> Decimal:
+        salary = Decimal(0.0)
+        for _, _, slot_amount in self.__price_slots_by_intersections(
+            employee_slot, rate_table
+        ):
+            salary += slot_amount
+        return salary
+
+    def __price_slots_by_intersections(
+        self, employee_slot: WorkingDaySpan, rate_table: Optional[RateTable] = None
+    ) -> Iterator[Tuple[int, int, Decimal]]:
+        decimal_two_places = Decimal("0.01")
+        if rate_table is None:
+            weekday_time_payments = self.__weekday_time_payments
+        else:
+            weekday_time_payments = get_payment_slots(rate_table)
+        recording = instrumentation.enabled
+        for index, payment_slot in enumerate(weekday_time_payments[employee_slot.weekday]):
+            (
+                intersection_result,
+                intersection_mins,
+            ) = payment_slot.span.get_intersection(employee_slot.span)
+            if recording:
+                instrumentation.count(f"intersections.{intersection_result.name}")
+                if intersection_result != IntersectionTypes.NO_INTERSECTION:
+                    instrumentation.count("decimal.quantize_calls")
+            if intersection_result != IntersectionTypes.NO_INTERSECTION:
+                intersection_hours = Decimal(intersection_mins / 60).quantize(
+                    decimal_two_places
+                )
+                slot_amount = payment_slot.hour_amount * intersection_hours
+                yield index, int(intersection_mins), slot_amount
+
+
+payment_slots_cache: LRUCache[Dict[int, List[PaymentTimeSlot]]] = LRUCache(
+    DEFAULT_CACHE_SIZE
+)
+
+
+def get_payment_slots(rate_table: RateTable) -> Dict[int, List[PaymentTimeSlot]]:
+    """Return the PaymentTimeSlot lists of a rate table, as used by the intersections path."""
+
+    def create_payment_slots() -> Dict[int, List[PaymentTimeSlot]]:
+        return {
+            weekday: [
+                PaymentTimeSlot(
+                    start=minutes_to_time(slot.start),
+                    end=minutes_to_time(slot.end),
+                    hour_amount=slot.hour_amount,
+                )
+                for slot in slots
+            ]
+            for weekday, slots in rate_table.weekday_slots.items()
+        }
+
+    return payment_slots_cache.get_or_create(rate_table.content_hash, create_payment_slots)
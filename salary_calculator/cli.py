@@ -0,0 +1,579 @@
+import argparse
+import json
+import sys
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Optional
+
+from salary_calculator import dedup, parallel
+from salary_calculator.aggregates import (CostReport,
+                                          calculate_salaries_with_report,
+                                          calculate_salaries_with_report_parallel,
+                                          price_schedules_with_report)
+from salary_calculator.batch import (DEFAULT_CHECKPOINT_LINES, CheckpointError,
+                                     run_batch)
+from salary_calculator.cache import ShiftPayCache
+from salary_calculator.cents import (ROUNDING_MODES, calculate_salaries_cents,
+                                     get_cents_rate_table, get_chunk_pricer)
+from salary_calculator.dedup import DedupStats, calculate_salaries_deduplicated
+from salary_calculator.exceptions import RateTableError, ScheduleParseError
+from salary_calculator.grouping import (DEFAULT_MEMORY_BUDGET, GroupingStats,
+                                        calculate_grouped_salaries)
+from salary_calculator.incremental import (ResultStore, RunChanges,
+                                           calculate_salaries_incremental)
+from salary_calculator.instrumentation import instrumentation, run_profiled
+from salary_calculator.parallel import (DEFAULT_CHUNK_SIZE,
+                                        calculate_salaries_parallel)
+from salary_calculator.pipeline import (OVERLAP_POLICIES, SalaryRecord,
+                                        calculate_salaries, price_schedules)
+from salary_calculator.rates import load_rate_table
+from salary_calculator.readers import MappedFile, calculate_salaries_mapped
+from salary_calculator.schedule_cache import ScheduleCache
+from salary_calculator.streams import (OUTPUT_BUFFER_SIZE, OUTPUT_FORMATTERS,
+                                       read_lines, write_records)
+
+
+def non_negative_int(value: str) -> int:
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"{value} should not be negative")
+    return number
+
+
+def positive_int(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{value} should be a positive number")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="salary_calculator",
+        description="Calculate employee salaries from weekly schedule lines.",
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        metavar="input",
+        help="schedule file to read, one NAME=DDHH:MM-HH:MM,... line per employee (default: stdin), "
+        "several files with --group-by-username",
+    )
+    parser.add_argument(
+        "-o", "--output", default="-", help="file to write salaries to (default: stdout)"
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=sorted(OUTPUT_FORMATTERS),
+        default="text",
+        help="output format (default: text)",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=non_negative_int,
+        default=1,
+        help="number of worker processes, 0 uses every available core (default: 1)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=positive_int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"lines sent to a worker at once (default: {DEFAULT_CHUNK_SIZE})",
+    )
+    parser.add_argument(
+        "--rates",
+        metavar="FILE",
+        help="price with the payment slots of a .json, .toml or .csv rate table file",
+    )
+    parser.add_argument(
+        "--pay-cache",
+        type=int,
+        metavar="SIZE",
+        help="memoize the pay of up to SIZE distinct shifts and report cache counters on stderr",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="parse and price every distinct rota once and report the dedup ratio on stderr",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="record stage timings and hot path counters and print a summary on stderr "
+        "(worker processes are not recorded)",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="run under cProfile and dump pstats data into FILE",
+    )
+    parser.add_argument(
+        "--vectorized",
+        action="store_true",
+        help="price whole chunks of lines at once with numpy arrays",
+    )
+    parser.add_argument(
+        "--mmap",
+        action="store_true",
+        help="memory map the input file and parse raw bytes, workers get byte ranges of it",
+    )
+    parser.add_argument(
+        "--schedule-cache",
+        nargs="?",
+        const="",
+        metavar="FILE",
+        help="load parsed schedules from a binary cache of the input file, (re)building it when "
+        "missing or stale (default: INPUT.schedcache)",
+    )
+    parser.add_argument(
+        "--cents",
+        choices=ROUNDING_MODES,
+        help="price in integer cents, rounding the hours of every slot as usual (legacy) or "
+        "only the salary (exact)",
+    )
+    parser.add_argument(
+        "--overlaps",
+        choices=OVERLAP_POLICIES,
+        default="allow",
+        help="what to do with overlapping or duplicated spans of a week day: price them as they "
+        "are, reject the line or merge them (default: allow)",
+    )
+    parser.add_argument(
+        "--report",
+        metavar="FILE",
+        help="write paid minutes and amounts per week day and rate band into a JSON FILE",
+    )
+    parser.add_argument(
+        "--report-employees",
+        action="store_true",
+        help="break the --report totals down by employee too",
+    )
+    parser.add_argument(
+        "--group-by-username",
+        action="store_true",
+        help="combine the lines of every username across all input files and price each employee "
+        "once, sorting in runs spilled to temporary files when over --memory-budget",
+    )
+    parser.add_argument(
+        "--memory-budget",
+        type=int,
+        default=DEFAULT_MEMORY_BUDGET >> 20,
+        metavar="MB",
+        help=f"memory for sorting lines by username (default: {DEFAULT_MEMORY_BUDGET >> 20})",
+    )
+    parser.add_argument(
+        "--temp-dir",
+        metavar="DIR",
+        help="directory for the sorted runs of --group-by-username (default: system temp dir)",
+    )
+    parser.add_argument(
+        "--incremental",
+        metavar="STORE",
+        help="reuse the salaries of lines priced by previous runs from a SQLite STORE file, "
+        "pricing only new or changed lines, and report employee changes on stderr",
+    )
+    parser.add_argument(
+        "--changes",
+        metavar="FILE",
+        help="write the usernames added, changed or removed since the last --incremental run "
+        "into a JSON FILE",
+    )
+    parser.add_argument(
+        "--reject",
+        metavar="FILE",
+        help="keep going past malformed lines, writing them with their reason into a JSON lines "
+        "FILE",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        metavar="FILE",
+        help="save the progress of the run into FILE and resume from it when it exists",
+    )
+    parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=DEFAULT_CHECKPOINT_LINES,
+        metavar="LINES",
+        help=f"input lines between checkpoints (default: {DEFAULT_CHECKPOINT_LINES})",
+    )
+    return parser
+
+
+def open_input(path: str) -> IO[str]:
+    if path == "-":
+        return sys.stdin
+    return open(path, encoding="utf-8", buffering=OUTPUT_BUFFER_SIZE)
+
+
+def open_output(path: str) -> IO[str]:
+    if path == "-":
+        return sys.stdout
+    return open(path, "w", encoding="utf-8", newline="", buffering=OUTPUT_BUFFER_SIZE)
+
+
+def get_records(
+    lines: Iterable[str],
+    args: argparse.Namespace,
+    pay_cache: Optional[ShiftPayCache] = None,
+    dedup_stats: Optional[DedupStats] = None,
+    report: Optional[CostReport] = None,
+) -> Iterator[SalaryRecord]:
+    rate_table = load_rate_table(args.rates) if args.rates else None
+    if report is not None:
+        if args.workers == 1:
+            return calculate_salaries_with_report(lines, report, rate_table=rate_table)
+        return calculate_salaries_with_report_parallel(
+            lines,
+            report,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            rate_table=rate_table,
+        )
+    if args.cents:
+        if args.workers == 1:
+            return calculate_salaries_cents(lines, rate_table=rate_table, rounding=args.cents)
+        return calculate_salaries_parallel(
+            lines,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            chunk_pricer=get_chunk_pricer(args.cents),
+            rate_table=rate_table,
+        )
+    if args.dedup:
+        if args.workers == 1:
+            return calculate_salaries_deduplicated(
+                lines, rate_table=rate_table, stats=dedup_stats
+            )
+        return calculate_salaries_parallel(
+            lines,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            chunk_pricer=dedup.price_chunk,
+            rate_table=rate_table,
+        )
+    if args.vectorized:
+        from salary_calculator import vectorized
+
+        if args.workers == 1:
+            return vectorized.calculate_salaries_vectorized(
+                lines, args.chunk_size, rate_table
+            )
+        return calculate_salaries_parallel(
+            lines,
+            workers=args.workers,
+            chunk_size=args.chunk_size,
+            chunk_pricer=vectorized.price_chunk,
+            rate_table=rate_table,
+        )
+    if args.workers == 1:
+        return calculate_salaries(
+            lines, rate_table=rate_table, pay_cache=pay_cache, overlaps=args.overlaps
+        )
+    return calculate_salaries_parallel(
+        lines, workers=args.workers, chunk_size=args.chunk_size, rate_table=rate_table
+    )
+
+
+def get_mapped_records(
+    mapped_file: MappedFile,
+    args: argparse.Namespace,
+    pay_cache: Optional[ShiftPayCache] = None,
+) -> Iterator[SalaryRecord]:
+    if args.workers == 1:
+        return get_records(mapped_file.iter_lines(), args, pay_cache)
+    chunk_pricer = parallel.price_chunk
+    if args.cents:
+        chunk_pricer = get_chunk_pricer(args.cents)
+    elif args.vectorized:
+        from salary_calculator import vectorized
+
+        chunk_pricer = vectorized.price_chunk
+    return calculate_salaries_mapped(
+        mapped_file.path,
+        workers=args.workers,
+        chunk_pricer=chunk_pricer,
+        rate_table=load_rate_table(args.rates) if args.rates else None,
+    )
+
+
+def get_cached_records(
+    schedule_cache: ScheduleCache,
+    args: argparse.Namespace,
+    pay_cache: Optional[ShiftPayCache] = None,
+    report: Optional[CostReport] = None,
+) -> Iterator[SalaryRecord]:
+    rate_table = load_rate_table(args.rates) if args.rates else None
+    if report is not None:
+        return price_schedules_with_report(
+            schedule_cache.iter_schedules(), report, rate_table
+        )
+    if args.vectorized:
+        from salary_calculator import vectorized
+
+        return iter(
+            vectorized.price_schedule_columns(schedule_cache.to_columns(), rate_table)
+        )
+    if args.cents:
+        cents_rate_table = get_cents_rate_table(rate_table, args.cents)
+        return (
+            (schedule.username, cents_rate_table.calculate_salary(schedule))
+            for schedule in schedule_cache.iter_schedules()
+        )
+    return price_schedules(schedule_cache.iter_schedules(), rate_table, pay_cache)
+
+
+def select_records(
+    args: argparse.Namespace,
+    input_stream: Optional[IO[str]],
+    mapped_file: Optional[MappedFile],
+    pay_cache: Optional[ShiftPayCache],
+    dedup_stats: Optional[DedupStats],
+    report: Optional[CostReport],
+    grouping_stats: Optional[GroupingStats],
+    result_store: Optional[ResultStore],
+    run_changes: Optional[RunChanges],
+) -> Iterable[SalaryRecord]:
+    """Return the salary records of a run from the source its options pick."""
+    if grouping_stats is not None:
+        return calculate_grouped_salaries(
+            args.inputs or ["-"],
+            load_rate_table(args.rates) if args.rates else None,
+            args.memory_budget << 20,
+            args.temp_dir,
+            args.overlaps,
+            grouping_stats,
+        )
+    if result_store is not None:
+        return calculate_salaries_incremental(
+            read_lines(input_stream),
+            result_store,
+            rate_table=load_rate_table(args.rates) if args.rates else None,
+            changes=run_changes,
+        )
+    if args.schedule_cache is not None:
+        schedule_cache = ScheduleCache.open(args.input, args.schedule_cache or None)
+        return get_cached_records(schedule_cache, args, pay_cache, report)
+    if mapped_file is not None:
+        return get_mapped_records(mapped_file, args, pay_cache)
+    return get_records(read_lines(input_stream), args, pay_cache, dedup_stats, report)
+
+
+# Whether each option the incompatibility rules refer to is in use.
+OPTIONS_IN_USE: Dict[str, Callable[[argparse.Namespace], bool]] = {
+    "stdin": lambda args: args.input == "-",
+    "workers": lambda args: args.workers != 1,
+    "dedup": lambda args: args.dedup,
+    "vectorized": lambda args: args.vectorized,
+    "mmap": lambda args: args.mmap,
+    "schedule_cache": lambda args: args.schedule_cache is not None,
+    "cents": lambda args: bool(args.cents),
+    "report": lambda args: bool(args.report),
+    "pay_cache": lambda args: args.pay_cache is not None,
+    "overlaps": lambda args: args.overlaps != "allow",
+    "group_by_username": lambda args: args.group_by_username,
+    "incremental": lambda args: bool(args.incremental),
+    "batch": lambda args: bool(args.reject or args.checkpoint),
+}
+
+# Every mode, the options it can not be combined with, and the error given when they are.
+INCOMPATIBLE_OPTIONS = (
+    (
+        "pay_cache",
+        ("vectorized", "dedup", "workers"),
+        "--pay-cache only applies to single process object pricing",
+    ),
+    ("dedup", ("vectorized",), "--dedup and --vectorized can not be combined"),
+    (
+        "mmap",
+        ("dedup", "stdin"),
+        "--mmap needs an input file and can not be combined with --dedup",
+    ),
+    (
+        "schedule_cache",
+        ("stdin", "dedup", "mmap", "workers"),
+        "--schedule-cache needs an input file and a single process without --dedup or --mmap",
+    ),
+    (
+        "report",
+        ("dedup", "vectorized", "mmap", "pay_cache"),
+        "--report can not be combined with --dedup, --vectorized, --mmap or --pay-cache",
+    ),
+    (
+        "cents",
+        ("dedup", "vectorized", "report", "pay_cache", "overlaps"),
+        "--cents can not be combined with --dedup, --vectorized, --report, --pay-cache "
+        "or --overlaps",
+    ),
+    (
+        "overlaps",
+        ("dedup", "vectorized", "mmap", "workers", "report", "schedule_cache"),
+        "--overlaps only applies to single process object pricing of text input",
+    ),
+    (
+        "group_by_username",
+        (
+            "workers",
+            "dedup",
+            "vectorized",
+            "mmap",
+            "schedule_cache",
+            "cents",
+            "report",
+            "pay_cache",
+            "batch",
+        ),
+        "--group-by-username only applies to single process object pricing",
+    ),
+    (
+        "incremental",
+        (
+            "workers",
+            "dedup",
+            "vectorized",
+            "mmap",
+            "schedule_cache",
+            "cents",
+            "report",
+            "pay_cache",
+            "overlaps",
+            "group_by_username",
+            "batch",
+        ),
+        "--incremental only applies to single process object pricing",
+    ),
+    (
+        "batch",
+        (
+            "workers",
+            "dedup",
+            "vectorized",
+            "mmap",
+            "schedule_cache",
+            "cents",
+            "report",
+            "pay_cache",
+            "overlaps",
+        ),
+        "--reject and --checkpoint only apply to single process object pricing",
+    ),
+)
+
+
+def check_options(parser: argparse.ArgumentParser, args: argparse.Namespace) -> None:
+    """Exit through parser.error when args combine options that do not apply together."""
+    if len(args.inputs) > 1 and not args.group_by_username:
+        parser.error("several input files need --group-by-username")
+    in_use = {option for option, is_used in OPTIONS_IN_USE.items() if is_used(args)}
+    for option, incompatible_options, message in INCOMPATIBLE_OPTIONS:
+        if option in in_use and in_use.intersection(incompatible_options):
+            parser.error(message)
+    if args.changes and not args.incremental:
+        parser.error("--changes needs --incremental")
+    if args.memory_budget < 1:
+        parser.error("--memory-budget should be a positive number of MB")
+    if args.checkpoint_every < 1:
+        parser.error("--checkpoint-every should be a positive number")
+
+
+def run_batch_mode(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    if args.input == "-" or args.output == "-":
+        parser.error("--reject and --checkpoint need an input and an output file")
+    rate_table = load_rate_table(args.rates) if args.rates else None
+    try:
+        result = run_batch(
+            args.input,
+            args.output,
+            args.format,
+            args.reject,
+            args.checkpoint,
+            args.checkpoint_every,
+            rate_table,
+        )
+    except CheckpointError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    print(f"batch: {result}", file=sys.stderr)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        return run_command(parser, args)
+    except (ScheduleParseError, RateTableError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+
+
+def run_command(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    args.input = args.inputs[0] if args.inputs else "-"
+    check_options(parser, args)
+    if args.reject or args.checkpoint:
+        return run_batch_mode(parser, args)
+    pay_cache = ShiftPayCache(args.pay_cache) if args.pay_cache is not None else None
+    report = CostReport(per_employee=args.report_employees) if args.report else None
+    dedup_stats = DedupStats() if args.dedup and args.workers == 1 else None
+    if args.stats:
+        instrumentation.reset()
+        instrumentation.enable()
+    mapped_file = MappedFile(args.input) if args.mmap else None
+    grouping_stats = GroupingStats() if args.group_by_username else None
+    result_store = ResultStore(args.incremental) if args.incremental else None
+    run_changes = RunChanges() if result_store is not None else None
+    input_stream = (
+        None
+        if args.mmap or args.schedule_cache is not None or grouping_stats is not None
+        else open_input(args.input)
+    )
+    output_stream = open_output(args.output)
+
+    def run() -> None:
+        records = select_records(
+            args,
+            input_stream,
+            mapped_file,
+            pay_cache,
+            dedup_stats,
+            report,
+            grouping_stats,
+            result_store,
+            run_changes,
+        )
+        write_records(records, output_stream, args.format)
+
+    try:
+        if args.profile:
+            run_profiled(run, args.profile)
+        else:
+            run()
+        if report is not None:
+            with open(args.report, "w", encoding="utf-8") as report_file:
+                json.dump(report.as_dict(), report_file, indent=2)
+        if pay_cache is not None:
+            print(f"pay cache: {pay_cache.stats}", file=sys.stderr)
+        if dedup_stats is not None:
+            print(f"dedup: {dedup_stats}", file=sys.stderr)
+        if grouping_stats is not None:
+            print(f"grouping: {grouping_stats}", file=sys.stderr)
+        if run_changes is not None:
+            print(f"incremental: {run_changes}", file=sys.stderr)
+            if args.changes:
+                with open(args.changes, "w", encoding="utf-8") as changes_file:
+                    json.dump(run_changes.as_dict(), changes_file, indent=2)
+        if args.stats:
+            print(instrumentation.summary(), file=sys.stderr)
+    finally:
+        if args.stats:
+            instrumentation.disable()
+        if result_store is not None:
+            result_store.close()
+        if mapped_file is not None:
+            mapped_file.close()
+        elif input_stream is not None and input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+        else:
+            output_stream.flush()
+    return 0
@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import json
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from salary_calculator.server import STATS_COMMAND
+
+SalaryResponse = Tuple[bool, str]
+
+
+class SalaryClient:
+    """Pipelining client for the salary calculation server."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.__reader = reader
+        self.__writer = writer
+
+    @classmethod
+    async def connect(
+        cls, host: str = "127.0.0.1", port: int = 8765, path: Optional[str] = None
+    ) -> "SalaryClient":
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def calculate(self, lines: Iterable[str]) -> List[SalaryResponse]:
+        """
+        Send every line before reading any response, so the server can batch them together.
+        Return (succeeded, message) pairs in request order.
+        """
+        sent = 0
+        for line in lines:
+            self.__writer.write(line.encode("utf-8") + b"\n")
+            sent += 1
+        await self.__writer.drain()
+        return [await self.__read_response() for _ in range(sent)]
+
+    async def get_stats(self) -> Dict:
+        self.__writer.write(STATS_COMMAND.encode("utf-8") + b"\n")
+        await self.__writer.drain()
+        succeeded, message = await self.__read_response()
+        return json.loads(message)
+
+    async def close(self) -> None:
+        self.__writer.close()
+        await self.__writer.wait_closed()
+
+    async def __read_response(self) -> SalaryResponse:
+        raw_line = await self.__reader.readline()
+        if not raw_line:
+            raise ConnectionError("server closed the connection")
+        status, _, message = raw_line.decode("utf-8").rstrip("\n").partition(" ")
+        return status == "OK", message
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="salary_calculator.client",
+        description="Send schedules to a running salary calculation server.",
+    )
+    parser.add_argument("input", nargs="?", default="-", help="schedules file, '-' for stdin")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="connect to a Unix socket instead of TCP")
+    parser.add_argument("--stats", action="store_true", help="print the server stats and exit")
+    return parser
+
+
+async def run(args: argparse.Namespace) -> int:
+    client = await SalaryClient.connect(args.host, args.port, args.unix)
+    try:
+        if args.stats:
+            print(json.dumps(await client.get_stats(), indent=2))
+            return 0
+        if args.input == "-":
+            lines = [line.rstrip("\r\n") for line in sys.stdin]
+        else:
+            with open(args.input, encoding="utf-8") as stream:
+                lines = [line.rstrip("\r\n") for line in stream]
+        status = 0
+        for succeeded, message in await client.calculate(line for line in lines if line):
+            if succeeded:
+                username, salary = message.rsplit(" ", 1)
+                print(f"The amount to pay {username} is: {salary} USD")
+            else:
+                print(f"error: {message}", file=sys.stderr)
+                status = 1
+        return status
+    finally:
+        await client.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    return asyncio.run(run(build_parser().parse_args(argv)))
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,108 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from salary_calculator.cache import LRUCache
+from salary_calculator.classes import EmployeeSchedule, WorkingDaySpan
+from salary_calculator.exceptions import ScheduleParseError
+from salary_calculator.parsing import parse_schedule_line
+from salary_calculator.pipeline import SalaryRecord
+from salary_calculator.rates import RateTable, get_compiled_rate_table
+
+SharedSpans = Tuple[WorkingDaySpan, ...]
+
+DEFAULT_MAX_PATTERNS = 1 << 16
+
+
+@dataclass
+class DedupStats:
+    # Rotas evicted from a bounded interner are counted again when they come back.
+    lines: int = 0
+    distinct_patterns: int = 0
+
+    @property
+    def dedup_ratio(self) -> float:
+        return self.lines / self.distinct_patterns if self.distinct_patterns else 0.0
+
+    def __str__(self) -> str:
+        return "lines=%d distinct_patterns=%d dedup_ratio=%.2f" % (
+            self.lines,
+            self.distinct_patterns,
+            self.dedup_ratio,
+        )
+
+
+class ScheduleInterner:
+    """
+    Parse and price every distinct span part of schedule lines (what follows "=") once.
+
+    Lines repeating a recently seen rota only have their username sliced out, and their
+    schedules share the same immutable tuple of spans. Up to maxsize rotas are kept, the
+    least recently used ones being dropped, and pricing only keeps salaries, never spans.
+    On mostly unique input every line misses, paying a lookup and an insertion on top of
+    its parsing and pricing, and the interner fills up to maxsize entries (about 24MB
+    with the default size) without saving any work.
+    """
+
+    def __init__(
+        self, rate_table: Optional[RateTable] = None, maxsize: int = DEFAULT_MAX_PATTERNS
+    ) -> None:
+        self.rate_table = rate_table
+        self.stats = DedupStats()
+        if rate_table is None:
+            self.__compiled_rate_table = EmployeeSchedule.get_compiled_time_payments()
+        else:
+            self.__compiled_rate_table = get_compiled_rate_table(rate_table)
+        self.__spans: LRUCache[SharedSpans] = LRUCache(maxsize)
+        self.__salaries: LRUCache[Decimal] = LRUCache(maxsize)
+
+    def __split_line(self, line: str, line_number: Optional[int]) -> Tuple[str, str]:
+        self.stats.lines += 1
+        equals_index = line.find("=")
+        if equals_index < 0:
+            raise ScheduleParseError("missing '=' after the username", line_number, 1)
+        return line[:equals_index], line[equals_index + 1 :]
+
+    def serialize(self, line: str, line_number: Optional[int] = None) -> EmployeeSchedule:
+        username, spans_part = self.__split_line(line, line_number)
+        spans = self.__spans.get(spans_part)
+        if spans is None:
+            self.stats.distinct_patterns += 1
+            _, minute_spans = parse_schedule_line(line, line_number)
+            spans = tuple(
+                WorkingDaySpan.from_minutes(weekday=weekday, start=start, end=end)
+                for weekday, start, end in minute_spans
+            )
+            self.__spans.put(spans_part, spans)
+        return EmployeeSchedule(username=username, working_days_spans=spans)
+
+    def calculate_salary(self, line: str, line_number: Optional[int] = None) -> SalaryRecord:
+        username, spans_part = self.__split_line(line, line_number)
+        salary = self.__salaries.get(spans_part)
+        if salary is None:
+            self.stats.distinct_patterns += 1
+            _, minute_spans = parse_schedule_line(line, line_number)
+            salary = self.__compiled_rate_table.price_minute_spans(minute_spans)
+            self.__salaries.put(spans_part, salary)
+        return username, salary
+
+
+def calculate_salaries_deduplicated(
+    lines: Iterable[str],
+    first_line_number: int = 1,
+    rate_table: Optional[RateTable] = None,
+    stats: Optional[DedupStats] = None,
+) -> Iterator[SalaryRecord]:
+    """Price non blank lines through a ScheduleInterner, adding its counters to stats if given."""
+    interner = ScheduleInterner(rate_table)
+    if stats is not None:
+        interner.stats = stats
+    for line_number, line in enumerate(lines, first_line_number):
+        if line:
+            yield interner.calculate_salary(line, line_number)
+
+
+def price_chunk(
+    lines: List[str], first_line_number: int = 1, rate_table: Optional[RateTable] = None
+) -> List[SalaryRecord]:
+    return list(calculate_salaries_deduplicated(lines, first_line_number, rate_table))
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+# Payment slots used unless another rate table is given (see EmployeeSchedule), kept as plain
+# data so rate snapshots can be checked against them without building a RateTable.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Iterator, Tuple
+
+# Start and end minute of every slot, an end at 0 meaning midnight.
+DEFAULT_SLOT_BOUNDS = ((1, 9 * 60), (9 * 60 + 1, 18 * 60), (18 * 60 + 1, 0))
+
+# Hour amounts in USD of every slot by calendar week day, Monday being 0.
+DEFAULT_HOUR_AMOUNTS = {
+    0: ("25", "15", "20"),
+    1: ("25", "15", "20"),
+    2: ("25", "15", "20"),
+    3: ("25", "15", "20"),
+    4: ("25", "15", "20"),
+    5: ("30", "20", "25"),
+    6: ("30", "20", "25"),
+}
+
+
+def get_default_rate_slots() -> Iterator[Tuple[int, int, int, str, str]]:
+    """Return the (weekday, start, end, hour amount, band) rows of the default rate table."""
+    for weekday, hour_amounts in sorted(DEFAULT_HOUR_AMOUNTS.items()):
+        for (start, end), hour_amount in zip(DEFAULT_SLOT_BOUNDS, hour_amounts):
+            band = "%02d:%02d-%02d:%02d" % (divmod(start, 60) + divmod(end, 60))
+            yield weekday, start, end, hour_amount, band
@@ -1,2 +1,43 @@
+from __future__ import annotations
+
+# Imported by the lean entry point, which does without typing.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import List, Optional
+
+
 class StartGreaterThanEndError(Exception):
     pass
+
+
+class ScheduleParseError(ValueError):
+    def __init__(
+        self, reason: str, line: Optional[int] = None, column: Optional[int] = None
+    ) -> None:
+        self.reason = reason
+        self.line = line
+        self.column = column
+        super().__init__(str(self))
+
+    def __str__(self) -> str:
+        # Worked out again every time, so copies of an error can be moved to another line.
+        location = f"column {self.column}" if self.column is not None else ""
+        if self.line is not None:
+            location = f"line {self.line}, {location}" if location else f"line {self.line}"
+        return f"{location}: {self.reason}" if location else self.reason
+
+
+class StartGreaterThanEndParseError(ScheduleParseError, StartGreaterThanEndError):
+    pass
+
+
+class OverlappingSpansError(ScheduleParseError):
+    def __init__(
+        self, reason: str, line: Optional[int] = None, conflicts: Optional[List] = None
+    ) -> None:
+        super().__init__(reason, line)
+        self.conflicts = conflicts or []
+
+
+class RateTableError(ValueError):
+    pass
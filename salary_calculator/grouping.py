@@ -0,0 +1,187 @@
+import copy
+import heapq
+import itertools
+import os
+import sys
+import tempfile
+from dataclasses import dataclass
+from operator import itemgetter
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from salary_calculator.classes import EmployeeSchedule, WorkingDaySpan
+from salary_calculator.exceptions import ScheduleParseError
+from salary_calculator.pipeline import (OVERLAP_POLICIES, SalaryRecord,
+                                        price_schedules)
+from salary_calculator.rates import RateTable
+from salary_calculator.serializers import FastEmployeeScheduleSerializer
+from salary_calculator.streams import read_lines
+
+DEFAULT_MEMORY_BUDGET = 64 << 20
+
+# Rough size of a buffered (username, source, line number, line) tuple besides the line text.
+RECORD_OVERHEAD = 160
+
+MAX_MERGE_FAN_IN = 64
+
+# (username, index of the input file, line number within that file, line)
+ShardLine = Tuple[str, int, int, str]
+
+get_username = itemgetter(0)
+
+
+@dataclass
+class GroupingStats:
+    lines: int = 0
+    employees: int = 0
+    spilled_runs: int = 0
+    merge_passes: int = 0
+
+    def __str__(self) -> str:
+        return "lines=%d employees=%d spilled_runs=%d merge_passes=%d" % (
+            self.lines,
+            self.employees,
+            self.spilled_runs,
+            self.merge_passes,
+        )
+
+
+def iter_shard_lines(paths: Sequence[str]) -> Iterator[ShardLine]:
+    """Yield every non blank line of every file ("-" reads stdin) along with where it came from."""
+    for source, path in enumerate(paths):
+        stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+        try:
+            for line_number, line in enumerate(read_lines(stream), 1):
+                if not line:
+                    continue
+                equals_index = line.find("=")
+                username = line[:equals_index] if equals_index >= 0 else line
+                yield username, source, line_number, line
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+
+def write_run(records: Iterable[ShardLine], directory: str) -> str:
+    file_descriptor, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with open(file_descriptor, "w", encoding="utf-8", newline="\n") as file:
+        file.writelines(
+            f"{source}\t{line_number}\t{line}\n" for _, source, line_number, line in records
+        )
+    return path
+
+
+def read_run(path: str) -> Iterator[ShardLine]:
+    with open(path, encoding="utf-8", newline="\n") as file:
+        for row in file:
+            source, line_number, line = row[:-1].split("\t", 2)
+            equals_index = line.find("=")
+            username = line[:equals_index] if equals_index >= 0 else line
+            yield username, int(source), int(line_number), line
+    os.remove(path)
+
+
+def merge_runs(runs: Sequence[Iterable[ShardLine]]) -> Iterator[ShardLine]:
+    # heapq.merge breaks ties by run order, and runs are in input order, so the parts of an
+    # employee keep the order they had in the input.
+    return heapq.merge(*runs, key=get_username)
+
+
+def sort_into_runs(
+    records: Iterable[ShardLine],
+    directory: str,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    stats: Optional[GroupingStats] = None,
+) -> List[Iterable[ShardLine]]:
+    """
+    Sort records by username in runs that fit in memory_budget bytes, spilling every full run to
+    a temporary file of directory. The last run stays in memory, so inputs fitting in the budget
+    are never written to disk. Runs are merged beforehand while there are more of them than
+    MAX_MERGE_FAN_IN, to bound the number of files open at once.
+    """
+    stats = stats if stats is not None else GroupingStats()
+    run_paths: List[str] = []
+    run: List[ShardLine] = []
+    run_size = 0
+    for record in records:
+        stats.lines += 1
+        run.append(record)
+        run_size += len(record[3]) + RECORD_OVERHEAD
+        if run_size >= memory_budget:
+            run.sort(key=get_username)
+            run_paths.append(write_run(run, directory))
+            stats.spilled_runs += 1
+            run = []
+            run_size = 0
+    run.sort(key=get_username)
+    while len(run_paths) + 1 > MAX_MERGE_FAN_IN:
+        stats.merge_passes += 1
+        run_paths = [
+            write_run(merge_runs([read_run(path) for path in group]), directory)
+            for group in (
+                run_paths[index : index + MAX_MERGE_FAN_IN]
+                for index in range(0, len(run_paths), MAX_MERGE_FAN_IN)
+            )
+        ]
+    return [read_run(path) for path in run_paths] + [run]
+
+
+def combine_parts(
+    username: str, parts: Iterable[ShardLine], paths: Sequence[str]
+) -> Tuple[EmployeeSchedule, int]:
+    """Parse every line of an employee and return a schedule with all of their spans."""
+    spans: List[WorkingDaySpan] = []
+    first_line_number = 0
+    for _, source, line_number, line in parts:
+        first_line_number = first_line_number or line_number
+        try:
+            schedule = FastEmployeeScheduleSerializer(line, line_number).serialize()
+        except ScheduleParseError as exc:
+            error = copy.copy(exc)
+            error.reason = f"{paths[source]}: {exc.reason}"
+            raise error from exc
+        spans.extend(schedule.working_days_spans)
+    return EmployeeSchedule(username=username, working_days_spans=spans), first_line_number
+
+
+def group_schedules(
+    paths: Sequence[str],
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    temporary_directory: Optional[str] = None,
+    overlaps: str = "allow",
+    stats: Optional[GroupingStats] = None,
+) -> Iterator[EmployeeSchedule]:
+    """
+    Yield one schedule per username, sorted by username, with the spans of every line of that
+    username across all files. Lines are sorted in runs bounded by memory_budget, spilled to
+    temporary_directory and k-way merged, so only the lines of one employee are parsed at once.
+    Parse errors report the file and line number of the bad line. The overlaps policy is the
+    one of serialize_lines, applied to the combined schedule.
+    """
+    if overlaps not in OVERLAP_POLICIES:
+        raise ValueError(f"overlaps policy:{overlaps} should be one of {OVERLAP_POLICIES}")
+    if memory_budget < 1:
+        raise ValueError(f"memory budget:{memory_budget} should be a positive number of bytes")
+    stats = stats if stats is not None else GroupingStats()
+    with tempfile.TemporaryDirectory(prefix="salary-runs-", dir=temporary_directory) as directory:
+        runs = sort_into_runs(iter_shard_lines(paths), directory, memory_budget, stats)
+        for username, parts in itertools.groupby(merge_runs(runs), key=get_username):
+            schedule, line_number = combine_parts(username, parts, paths)
+            stats.employees += 1
+            if overlaps == "reject":
+                schedule.validate_spans(line_number)
+            elif overlaps == "merge":
+                schedule = schedule.merge_overlapping_spans()
+            yield schedule
+
+
+def calculate_grouped_salaries(
+    paths: Sequence[str],
+    rate_table: Optional[RateTable] = None,
+    memory_budget: int = DEFAULT_MEMORY_BUDGET,
+    temporary_directory: Optional[str] = None,
+    overlaps: str = "allow",
+    stats: Optional[GroupingStats] = None,
+) -> Iterator[SalaryRecord]:
+    return price_schedules(
+        group_schedules(paths, memory_budget, temporary_directory, overlaps, stats), rate_table
+    )
@@ -0,0 +1,315 @@
+import hashlib
+import sqlite3
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from salary_calculator.classes import EmployeeSchedule
+from salary_calculator.pipeline import SalaryRecord
+from salary_calculator.rates import RateTable
+from salary_calculator.serializers import FastEmployeeScheduleSerializer
+
+STORE_VERSION = 1
+
+DEFAULT_KEEP_RUNS = 3
+
+LINE_HASH_SIZE = 16
+
+# Lines whose stored results are looked up at once, below the 999 parameters SQLite allows.
+LOOKUP_BATCH_SIZE = 500
+
+# Results of the current rate table are compacted once they outnumber the lines of a run by this.
+COMPACT_RATIO = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_tables (id INTEGER PRIMARY KEY, content_hash TEXT UNIQUE);
+CREATE TABLE IF NOT EXISTS results (
+    rate_table INTEGER NOT NULL,
+    line_hash BLOB NOT NULL,
+    username TEXT NOT NULL,
+    salary TEXT NOT NULL,
+    PRIMARY KEY (rate_table, line_hash)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY, rate_table INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS snapshot (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    usernames TEXT NOT NULL,
+    line_hashes BLOB NOT NULL
+);
+"""
+
+
+def hash_line(line: str) -> bytes:
+    return hashlib.blake2b(line.encode("utf-8"), digest_size=LINE_HASH_SIZE).digest()
+
+
+@dataclass
+class RunSnapshot:
+    """The username and line hash of every line of a run, in input order."""
+
+    usernames: List[str] = field(default_factory=list)
+    line_hashes: List[bytes] = field(default_factory=list)
+
+    def add(self, username: str, line_hash: bytes) -> None:
+        self.usernames.append(username)
+        self.line_hashes.append(line_hash)
+
+    def get_lines(self) -> set:
+        return set(zip(self.usernames, self.line_hashes))
+
+    def pack(self) -> Tuple[str, bytes]:
+        return "\n".join(self.usernames), b"".join(self.line_hashes)
+
+    @classmethod
+    def unpack(cls, usernames: str, line_hashes: bytes) -> "RunSnapshot":
+        return cls(
+            usernames.split("\n") if line_hashes else [],
+            [
+                line_hashes[offset : offset + LINE_HASH_SIZE]
+                for offset in range(0, len(line_hashes), LINE_HASH_SIZE)
+            ],
+        )
+
+
+@dataclass
+class RunChanges:
+    """What an incremental run reused and priced, and how employees changed since the last run."""
+
+    lines: int = 0
+    reused: int = 0
+    priced: int = 0
+    compacted: int = 0
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {"added": self.added, "changed": self.changed, "removed": self.removed}
+
+    def __str__(self) -> str:
+        return (
+            "lines=%d reused=%d priced=%d added=%d changed=%d removed=%d compacted=%d"
+            % (
+                self.lines,
+                self.reused,
+                self.priced,
+                len(self.added),
+                len(self.changed),
+                len(self.removed),
+                self.compacted,
+            )
+        )
+
+
+def diff_snapshots(previous: RunSnapshot, current: RunSnapshot, changes: RunChanges) -> None:
+    """Tell apart employees added, removed, or with any line added, removed or changed."""
+    if previous == current:
+        return
+    changed_lines = previous.get_lines() ^ current.get_lines()
+    if not changed_lines:
+        return
+    previous_usernames = set(previous.usernames)
+    current_usernames = set(current.usernames)
+    changed_usernames = {username for username, _ in changed_lines}
+    changes.added = sorted(changed_usernames - previous_usernames)
+    changes.removed = sorted(changed_usernames - current_usernames)
+    changes.changed = sorted(changed_usernames & previous_usernames & current_usernames)
+
+
+class ResultStore:
+    """
+    SQLite store of the salaries priced for schedule lines, keyed by the rate table content hash
+    and a hash of the raw line, plus the usernames and line hashes of the last run to tell which
+    employees were added, changed or removed since then.
+
+    The store compacts itself when a run finishes: results of rate tables not used by the last
+    keep_runs runs are deleted, and so are results of the current rate table that the run did
+    not use, once they outnumber the ones it did. The file is vacuumed once most of it is free.
+    """
+
+    def __init__(self, path: str, keep_runs: int = DEFAULT_KEEP_RUNS) -> None:
+        if keep_runs < 1:
+            raise ValueError(f"kept runs:{keep_runs} should be a positive number")
+        self.path = path
+        self.keep_runs = keep_runs
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        version = self.connection.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, STORE_VERSION):
+            self.connection.close()
+            raise ValueError(f"result store:{path} has unsupported version {version}")
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+            self.connection.execute(f"PRAGMA user_version={STORE_VERSION}")
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def begin_run(self, rate_table_hash: str) -> int:
+        """
+        Return the id of a rate table, left uncommitted when new: a run is only recorded by
+        finish_run, so an aborted one leaves the store as it was.
+        """
+        self.connection.execute(
+            "INSERT OR IGNORE INTO rate_tables (content_hash) VALUES (?)", (rate_table_hash,)
+        )
+        return self.connection.execute(
+            "SELECT id FROM rate_tables WHERE content_hash = ?", (rate_table_hash,)
+        ).fetchone()[0]
+
+    def load_results(self, rate_table_id: int, line_hashes: Iterable[bytes]) -> Dict[bytes, str]:
+        """Return "username salary" texts stored for the given line hashes of a rate table."""
+        results: Dict[bytes, str] = {}
+        line_hashes = list(line_hashes)
+        for offset in range(0, len(line_hashes), LOOKUP_BATCH_SIZE):
+            batch = line_hashes[offset : offset + LOOKUP_BATCH_SIZE]
+            results.update(
+                self.connection.execute(
+                    "SELECT line_hash, username || ' ' || salary FROM results "
+                    f"WHERE rate_table = ? AND line_hash IN ({','.join('?' * len(batch))})",
+                    (rate_table_id, *batch),
+                )
+            )
+        return results
+
+    def add_results(
+        self, rate_table_id: int, results: Iterable[Tuple[bytes, SalaryRecord]]
+    ) -> None:
+        # Left uncommitted until finish_run, so an aborted run leaves the store as it was.
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+            (
+                (rate_table_id, line_hash, username, str(salary))
+                for line_hash, (username, salary) in results
+            ),
+        )
+
+    def get_snapshot(self) -> RunSnapshot:
+        row = self.connection.execute(
+            "SELECT usernames, line_hashes FROM snapshot WHERE id = 1"
+        ).fetchone()
+        return RunSnapshot.unpack(*row) if row else RunSnapshot()
+
+    def finish_run(self, rate_table_id: int, snapshot: RunSnapshot) -> int:
+        """
+        Record the run with the snapshot of its lines and commit it along with its results,
+        then compact. Return the number of deleted results.
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO snapshot VALUES (1, ?, ?)", snapshot.pack()
+            )
+            run_id = self.connection.execute(
+                "INSERT INTO runs (rate_table) VALUES (?)", (rate_table_id,)
+            ).lastrowid
+        return self.compact(run_id, rate_table_id, snapshot)
+
+    def compact(self, run_id: int, rate_table_id: int, snapshot: RunSnapshot) -> int:
+        # Every line of the run has a stored result by now, so the rest are unused ones.
+        used_lines = set(snapshot.line_hashes)
+        stored_lines = self.connection.execute(
+            "SELECT COUNT(*) FROM results WHERE rate_table = ?", (rate_table_id,)
+        ).fetchone()[0]
+        unused_lines = stored_lines - len(used_lines)
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM runs WHERE id <= ?", (run_id - self.keep_runs,)
+            )
+            deleted = self.connection.execute(
+                "DELETE FROM results WHERE rate_table NOT IN (SELECT rate_table FROM runs)"
+            ).rowcount
+            self.connection.execute(
+                "DELETE FROM rate_tables WHERE id NOT IN (SELECT rate_table FROM runs)"
+            )
+            if unused_lines > len(used_lines) * (COMPACT_RATIO - 1):
+                self.connection.execute(
+                    "CREATE TEMP TABLE used_lines (line_hash BLOB PRIMARY KEY) WITHOUT ROWID"
+                )
+                self.connection.executemany(
+                    "INSERT INTO used_lines VALUES (?)",
+                    ((line_hash,) for line_hash in used_lines),
+                )
+                deleted += self.connection.execute(
+                    "DELETE FROM results WHERE rate_table = ? "
+                    "AND line_hash NOT IN (SELECT line_hash FROM used_lines)",
+                    (rate_table_id,),
+                ).rowcount
+                self.connection.execute("DROP TABLE used_lines")
+        page_count = self.connection.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = self.connection.execute("PRAGMA freelist_count").fetchone()[0]
+        if deleted and free_pages * 2 > page_count:
+            self.connection.execute("VACUUM")
+        return deleted
+
+
+def calculate_salaries_incremental(
+    lines: Iterable[str],
+    store: ResultStore,
+    first_line_number: int = 1,
+    rate_table: Optional[RateTable] = None,
+    changes: Optional[RunChanges] = None,
+) -> Iterator[SalaryRecord]:
+    """
+    Price non blank lines reusing the salaries stored for identical lines and rate table, so
+    only new or changed lines get parsed and priced. Stored results are looked up for batches
+    of lines as they are read, and the run is committed only once every line went through:
+    the store then records this run's employees and is compacted, and changes (if given)
+    holds the counters and the usernames added, changed or removed since the previous run.
+    """
+    changes = changes if changes is not None else RunChanges()
+    rate_table_hash = (rate_table or EmployeeSchedule.get_default_rate_table()).content_hash
+    rate_table_id = store.begin_run(rate_table_hash)
+    snapshot = RunSnapshot()
+    try:
+        for batch in iter_line_batches(lines, first_line_number):
+            line_hashes = [hash_line(line) for _, line in batch]
+            stored = store.load_results(rate_table_id, line_hashes)
+            priced: List[Tuple[bytes, SalaryRecord]] = []
+            for (line_number, line), line_hash in zip(batch, line_hashes):
+                changes.lines += 1
+                stored_result = stored.get(line_hash)
+                if stored_result is not None:
+                    username, salary_text = stored_result.rsplit(" ", 1)
+                    salary = Decimal(salary_text)
+                    changes.reused += 1
+                else:
+                    schedule = FastEmployeeScheduleSerializer(line, line_number).serialize()
+                    username, salary = schedule.username, schedule.calculate_salary(rate_table)
+                    # Repeated lines of the batch get reused too, later ones are stored by then.
+                    stored[line_hash] = f"{username} {salary}"
+                    priced.append((line_hash, (username, salary)))
+                    changes.priced += 1
+                snapshot.add(username, line_hash)
+                yield username, salary
+            store.add_results(rate_table_id, priced)
+    except BaseException:
+        store.connection.rollback()
+        raise
+    diff_snapshots(store.get_snapshot(), snapshot, changes)
+    changes.compacted = store.finish_run(rate_table_id, snapshot)
+
+
+def iter_line_batches(
+    lines: Iterable[str], first_line_number: int = 1
+) -> Iterator[List[Tuple[int, str]]]:
+    """Group non blank lines with their numbers into batches of LOOKUP_BATCH_SIZE."""
+    batch: List[Tuple[int, str]] = []
+    for line_number, line in enumerate(lines, first_line_number):
+        if not line:
+            continue
+        batch.append((line_number, line))
+        if len(batch) == LOOKUP_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
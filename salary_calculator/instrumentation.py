@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from contextlib import contextmanager
+from time import perf_counter
+
+# Imported by the lean entry point, so typing is left to type checkers and cProfile to profiled
+# runs.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Callable, Dict, Iterator, TypeVar
+
+    Result = TypeVar("Result")
+
+
+class Instrumentation:
+    """
+    Per stage counters and timings of a payroll run.
+
+    Recording is disabled by default, and instrumented code only checks the enabled flag
+    before doing any work, so the cost of a disabled recorder is a single attribute lookup.
+    Counters live in the current process, runs using worker processes only record the
+    stages done by the main process.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.timings: Dict[str, float] = defaultdict(float)
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        self.counters.clear()
+        self.timings.clear()
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] += amount
+
+    def add_time(self, name: str, seconds: float) -> None:
+        self.timings[name] += seconds
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if not self.enabled:
+            yield
+            return
+        started = perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] += perf_counter() - started
+
+    def as_dict(self) -> Dict[str, Dict]:
+        return {"counters": dict(self.counters), "timings": dict(self.timings)}
+
+    def summary(self) -> str:
+        lines = ["stage timings:"]
+        total = sum(self.timings.values()) or 1.0
+        for name, seconds in sorted(self.timings.items(), key=lambda item: -item[1]):
+            lines.append(f"  {name:<32}{seconds:>10.4f} s{seconds / total:>8.1%}")
+        lines.append("counters:")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"  {name:<32}{value:>14,}")
+        return "\n".join(lines)
+
+
+instrumentation = Instrumentation()
+
+
+def run_profiled(function: Callable[[], Result], path: str) -> Result:
+    """Run function under cProfile, dumping pstats data into path."""
+    import cProfile
+
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(function)
+    finally:
+        profiler.dump_stats(path)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+# Imports nothing, not even typing: rate snapshots restore these tables on the lean path.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Sequence, Tuple
+
+    IntegerTables = Tuple[Sequence[int], ...]
+
+
+def divide_half_even(numerator: int, denominator: int) -> int:
+    """Integer division rounding half to even, as Decimal.quantize does by default."""
+    quotient, remainder = divmod(numerator, denominator)
+    if 2 * remainder > denominator or (2 * remainder == denominator and quotient % 2):
+        quotient += 1
+    return quotient
+
+
+class IntegerDay:
+    """
+    Integer version of a CompiledDay, sharing its slot lookups. Pay is kept in units of
+    10 ** -decimals USD times hundredths of an hour (legacy rounding) or times minutes (exact),
+    slot_units giving the units of every amount of minutes.
+    """
+
+    __slots__ = (
+        "next_slot",
+        "prev_slot",
+        "starts",
+        "ends",
+        "amounts",
+        "head",
+        "tail",
+        "full_cumulative",
+        "slot_units",
+    )
+
+    def __init__(
+        self,
+        next_slot: Sequence[int],
+        prev_slot: Sequence[int],
+        starts: Sequence[int],
+        ends: Sequence[int],
+        amounts: Sequence[int],
+        slot_units: Sequence[int],
+    ) -> None:
+        self.next_slot = next_slot
+        self.prev_slot = prev_slot
+        self.starts = starts
+        self.ends = ends
+        self.amounts = amounts
+        self.slot_units = slot_units
+        self.full_cumulative = [0]
+        for start, end, amount in zip(starts, ends, amounts):
+            self.full_cumulative.append(
+                self.full_cumulative[-1] + amount * slot_units[end - start]
+            )
+        minutes = range(len(next_slot))
+        self.head = [self.__partial_units(next_slot[m], m, None) for m in minutes]
+        self.tail = [self.__partial_units(prev_slot[m], None, m) for m in minutes]
+
+    def __partial_units(self, slot: int, start, end) -> int:
+        if not 0 <= slot < len(self.amounts):
+            return 0
+        slot_start, slot_end = self.starts[slot], self.ends[slot]
+        start = slot_start if start is None else max(start, slot_start)
+        end = slot_end if end is None else min(end, slot_end)
+        if start > end:
+            return 0
+        return self.amounts[slot] * self.slot_units[end - start]
+
+    def price(self, start: int, end: int) -> int:
+        first_slot = self.next_slot[start]
+        last_slot = self.prev_slot[end]
+        if first_slot > last_slot:
+            return 0
+        if first_slot == last_slot:
+            return self.amounts[first_slot] * self.slot_units[
+                min(end, self.ends[first_slot]) - max(start, self.starts[first_slot])
+            ]
+        return (
+            self.head[start]
+            + self.full_cumulative[last_slot]
+            - self.full_cumulative[first_slot + 1]
+            + self.tail[end]
+        )
+
+    def get_tables(self) -> IntegerTables:
+        """Return every lookup table but slot_units, as from_tables takes them back."""
+        return (
+            self.next_slot,
+            self.prev_slot,
+            self.starts,
+            self.ends,
+            self.amounts,
+            self.head,
+            self.tail,
+            self.full_cumulative,
+        )
+
+    @classmethod
+    def from_tables(cls, tables: IntegerTables, slot_units: Sequence[int]) -> "IntegerDay":
+        """Restore a day from get_tables output without computing its tables again."""
+        day = cls.__new__(cls)
+        (
+            day.next_slot,
+            day.prev_slot,
+            day.starts,
+            day.ends,
+            day.amounts,
+            day.head,
+            day.tail,
+            day.full_cumulative,
+        ) = tables
+        day.slot_units = slot_units
+        return day
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import sys
+
+from salary_calculator.exceptions import RateTableError, ScheduleParseError
+from salary_calculator.parsing import parse_schedule_line
+from salary_calculator.snapshot import RateSnapshot, get_rate_snapshot
+from salary_calculator.streams import (OUTPUT_BUFFER_SIZE, OUTPUT_FORMATTERS,
+                                       read_lines, write_records)
+
+# Entry point of `python -m salary_calculator`. Plain runs (an input file or stdin, -o, -f and
+# --rates) are priced here with a rate table snapshot, importing neither the schedule classes
+# nor dataclasses, decimal, argparse or typing. Any other option goes to cli.main.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, Iterable, Iterator, List, Optional
+
+    from salary_calculator.streams import OutputRecord
+
+LEAN_OPTIONS = {
+    "-o": "output",
+    "--output": "output",
+    "-f": "format",
+    "--format": "format",
+    "--rates": "rates",
+}
+
+
+def parse_lean_args(argv: List[str]) -> Optional[Dict[str, Optional[str]]]:
+    """Return the options of a plain run, or None when argv needs the full command line."""
+    options: Dict[str, Optional[str]] = {
+        "input": None,
+        "output": "-",
+        "format": "text",
+        "rates": None,
+    }
+    index = 0
+    while index < len(argv):
+        argument = argv[index]
+        name, has_value, value = argument.partition("=")
+        if argument.startswith("--") and has_value and name in LEAN_OPTIONS:
+            options[LEAN_OPTIONS[name]] = value
+            index += 1
+        elif argument in LEAN_OPTIONS and index + 1 < len(argv):
+            options[LEAN_OPTIONS[argument]] = argv[index + 1]
+            index += 2
+        elif (argument == "-" or not argument.startswith("-")) and options["input"] is None:
+            options["input"] = argument
+            index += 1
+        else:
+            return None
+    if options["format"] not in OUTPUT_FORMATTERS:
+        return None
+    return options
+
+
+def format_cents(cents: int) -> str:
+    """Return an amount in cents the way str shows the quantized Decimal salary."""
+    sign = "-" if cents < 0 else ""
+    return "%s%d.%02d" % ((sign,) + divmod(abs(cents), 100))
+
+
+def calculate_salaries_lean(
+    lines: Iterable[str], snapshot: RateSnapshot
+) -> Iterator[OutputRecord]:
+    """Price non blank lines with a snapshot, giving salaries as strings of Decimal amounts."""
+    price_minute_spans = snapshot.price_minute_spans
+    for line_number, line in enumerate(lines, 1):
+        if not line:
+            continue
+        username, minute_spans = parse_schedule_line(line, line_number)
+        yield username, format_cents(price_minute_spans(minute_spans))
+
+
+def run_lean(options: Dict[str, Optional[str]]) -> None:
+    snapshot = get_rate_snapshot(options["rates"])
+    input_path, output_path = options["input"] or "-", options["output"]
+    input_stream = (
+        sys.stdin
+        if input_path == "-"
+        else open(input_path, encoding="utf-8", buffering=OUTPUT_BUFFER_SIZE)
+    )
+    output_stream = (
+        sys.stdout
+        if output_path == "-"
+        else open(output_path, "w", encoding="utf-8", newline="", buffering=OUTPUT_BUFFER_SIZE)
+    )
+    try:
+        records = calculate_salaries_lean(read_lines(input_stream), snapshot)
+        write_records(records, output_stream, options["format"])
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+        else:
+            output_stream.flush()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    options = parse_lean_args(argv)
+    if options is None:
+        from salary_calculator.cli import main as cli_main
+
+        return cli_main(argv)
+    try:
+        run_lean(options)
+    except (ScheduleParseError, RateTableError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,82 @@
+import os
+from collections import deque
+from itertools import islice
+from typing import (Callable, Iterable, Iterator, List, Optional, Tuple,
+                    TypeVar)
+
+from salary_calculator.pipeline import SalaryRecord, calculate_salaries
+from salary_calculator.rates import RateTable
+
+DEFAULT_CHUNK_SIZE = 2000
+
+T = TypeVar("T")
+
+
+def chunk_lines(lines: Iterable[str], chunk_size: int) -> Iterator[List[str]]:
+    if chunk_size < 1:
+        raise ValueError(f"chunk size:{chunk_size} should be a positive number")
+    iterator = iter(lines)
+    while True:
+        chunk = list(islice(iterator, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def price_chunk(
+    lines: List[str], first_line_number: int = 1, rate_table: Optional[RateTable] = None
+) -> List[SalaryRecord]:
+    return list(calculate_salaries(lines, first_line_number, rate_table))
+
+
+def resolve_workers(workers: Optional[int]) -> int:
+    if not workers:
+        return os.cpu_count() or 1
+    if workers < 0:
+        raise ValueError(f"workers:{workers} should be a positive number")
+    return workers
+
+
+def calculate_salaries_parallel(
+    lines: Iterable[str],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    chunk_pricer: Callable[..., List[SalaryRecord]] = price_chunk,
+    rate_table: Optional[RateTable] = None,
+) -> Iterator[SalaryRecord]:
+    """
+    Split schedule lines into chunks which are parsed and priced by a process pool.
+    Only raw lines and (username, salary) records cross process boundaries, and results are
+    yielded in input order. At most two chunks per worker are in flight, so memory stays bounded.
+    chunk_pricer must be a picklable module level function turning lines, the number of
+    the first one and the rate table into records. Every worker compiles the table only once.
+    """
+    chunks = (
+        (chunk, 1 + index * chunk_size, rate_table)
+        for index, chunk in enumerate(chunk_lines(lines, chunk_size))
+    )
+    for records in map_in_order(chunk_pricer, chunks, workers):
+        yield from records
+
+
+def map_in_order(
+    function: Callable[..., T], arguments: Iterable[Tuple], workers: Optional[int] = None
+) -> Iterator[T]:
+    """
+    Call a picklable function with every tuple of arguments in a process pool, yielding the
+    results in order while keeping at most two calls per worker in flight.
+    """
+    # Imported here, multiprocessing alone doubles the start up time of single process runs.
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = resolve_workers(workers)
+    arguments = iter(arguments)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque(
+            executor.submit(function, *call) for call in islice(arguments, workers * 2)
+        )
+        while pending:
+            result = pending.popleft().result()
+            for call in islice(arguments, 1):
+                pending.append(executor.submit(function, *call))
+            yield result
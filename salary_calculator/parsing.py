@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+from salary_calculator.exceptions import (ScheduleParseError,
+                                          StartGreaterThanEndParseError)
+from salary_calculator.instrumentation import instrumentation
+
+# Kept apart from serializers, which import the schedule classes: the lean entry point parses
+# lines with this module alone. Neither typing nor utils get imported at run time, typing
+# loading re and enum, and utils calendar and datetime.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Dict, List, Optional, Tuple, Union
+
+    RawLine = Union[str, bytes, memoryview]
+    # (weekday, start, end) in minutes, the plain tuple form of classes.MinuteSpan.
+    MinuteTuple = Tuple[int, int, int]
+
+# Calendar numbers of the week day abbreviations, as utils.get_calendar_day_by_abbrev gives them.
+WEEKDAY_NUMBERS = {"MO": 0, "TU": 1, "WE": 2, "TH": 3, "FR": 4, "SA": 5, "SU": 6}
+
+
+def __build_time_tokens() -> Dict[RawLine, int]:
+    # Same spellings "%H:%M" accepts: one or two digit hours and minutes.
+    hour_tokens = [(f"{hour:02d}", hour) for hour in range(24)]
+    hour_tokens += [(str(hour), hour) for hour in range(10)]
+    minute_tokens = [(f"{minute:02d}", minute) for minute in range(60)]
+    minute_tokens += [(str(minute), minute) for minute in range(10)]
+    tokens: Dict[RawLine, int] = {}
+    for hour_token, hour in hour_tokens:
+        for minute_token, minute in minute_tokens:
+            token = f"{hour_token}:{minute_token}"
+            tokens[token] = tokens[token.encode()] = hour * 60 + minute
+    return tokens
+
+
+def __build_weekday_tokens() -> Dict[RawLine, int]:
+    tokens: Dict[RawLine, int] = {}
+    for abbrev, weekday in WEEKDAY_NUMBERS.items():
+        tokens[abbrev] = tokens[abbrev.encode()] = weekday
+    return tokens
+
+
+TIME_TOKENS = __build_time_tokens()
+WEEKDAY_TOKENS = __build_weekday_tokens()
+
+
+def parse_schedule_line(
+    raw_line: RawLine, line_number: Optional[int] = None
+) -> Tuple[str, List[MinuteTuple]]:
+    """
+    Parse a NAME=DDHH:MM-HH:MM,... line, given as str, bytes or a memoryview slice of a mapped
+    file (copied into bytes once, only the username gets decoded), into its username and a list of
+    (weekday, start minute, end minute) tuples. End minutes are kept raw, so midnight is 0.
+    Tokens are resolved through lookup tables instead of strptime, and invalid input raises
+    ScheduleParseError pointing to the offending line and column.
+    """
+    is_bytes = not isinstance(raw_line, str)
+    if raw_line.__class__ is memoryview:
+        raw_line = raw_line.tobytes()
+    equals_index = raw_line.find(b"=" if is_bytes else "=")
+    if equals_index < 0:
+        raise ScheduleParseError("missing '=' after the username", line_number, 1)
+    username = raw_line[:equals_index]
+    if is_bytes:
+        username = username.decode("utf-8")
+
+    time_tokens, weekday_tokens = TIME_TOKENS, WEEKDAY_TOKENS
+    spans = []
+    column = equals_index + 2
+    for span_token in raw_line[equals_index + 1 :].split(b"," if is_bytes else ","):
+        weekday = weekday_tokens.get(span_token[:2])
+        if weekday is None:
+            raise ScheduleParseError(
+                f"week day prefix:{span_token[:2]!r} is invalid", line_number, column
+            )
+        times = span_token[2:].split(b"-" if is_bytes else "-")
+        if len(times) != 2:
+            raise ScheduleParseError(
+                f"span:{span_token[2:]!r} should have the HH:MM-HH:MM format",
+                line_number,
+                column + 2,
+            )
+        start_token, end_token = times
+        start = time_tokens.get(start_token)
+        if start is None:
+            raise ScheduleParseError(
+                f"start time:{start_token!r} is invalid", line_number, column + 2
+            )
+        end = time_tokens.get(end_token)
+        if end is None:
+            raise ScheduleParseError(
+                f"end time:{end_token!r} is invalid",
+                line_number,
+                column + 3 + len(start_token),
+            )
+        if end and start > end:
+            raise StartGreaterThanEndParseError(
+                f"start time({start_token}) should be lower or equal to end time({end_token})",
+                line_number,
+                column + 2,
+            )
+        spans.append((weekday, start, end))
+        column += len(span_token) + 1
+    if instrumentation.enabled:
+        instrumentation.count("parse.lines")
+        instrumentation.count("parse.spans", len(spans))
+    return username, spans
@@ -0,0 +1,307 @@
+import json
+import os
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import date
+from decimal import Decimal
+from typing import (Dict, FrozenSet, Iterable, Iterator, List, Mapping,
+                    NamedTuple, Optional, Sequence, Tuple)
+
+from salary_calculator.exceptions import (RateTableError, ScheduleParseError,
+                                          StartGreaterThanEndParseError)
+from salary_calculator.parsing import TIME_TOKENS
+from salary_calculator.pipeline import SalaryRecord
+from salary_calculator.rates import (LAST_MINUTE, CompiledDay, RateSlot,
+                                     RateTable, create_rate_slot, get_weekday,
+                                     import_toml)
+
+ALL_WEEKDAYS: FrozenSet[int] = frozenset(range(7))
+
+
+class DatedSpan(NamedTuple):
+    """Working span of a given date, in minutes since midnight. Ends at midnight are kept as 0."""
+
+    day: date
+    start: int
+    end: int
+
+    @property
+    def normalized_end(self) -> int:
+        return self.end or LAST_MINUTE
+
+
+class RateRule(NamedTuple):
+    """
+    Payment slot applying to the dates between valid_from and valid_until (both included, None
+    meaning unbounded) falling on one of the given week days. Where rules overlap, the time of
+    the day is paid by the rule with the highest priority.
+    """
+
+    slot: RateSlot
+    valid_from: Optional[date] = None
+    valid_until: Optional[date] = None
+    weekdays: FrozenSet[int] = ALL_WEEKDAYS
+    priority: int = 0
+
+    def applies_to(self, day: date) -> bool:
+        return (
+            (self.valid_from is None or self.valid_from <= day)
+            and (self.valid_until is None or day <= self.valid_until)
+            and day.weekday() in self.weekdays
+        )
+
+
+def rules_from_rate_table(
+    rate_table: RateTable,
+    valid_from: Optional[date] = None,
+    valid_until: Optional[date] = None,
+    priority: int = 0,
+) -> List[RateRule]:
+    """Turn the weekly grid of a rate table into rules valid over a range of dates."""
+    return [
+        RateRule(slot, valid_from, valid_until, frozenset((weekday,)), priority)
+        for weekday, slots in rate_table.weekday_slots.items()
+        for slot in slots
+    ]
+
+
+def resolve_day_slots(rules: Sequence[RateRule]) -> Tuple[RateSlot, ...]:
+    """
+    Merge the slots of the rules applying to a day into non overlapping slots, where rules
+    with a higher priority cut out the part of the day they pay from lower priority ones.
+    Slots are closed minute intervals measured the way TimeSpan.get_intersection does it,
+    so pieces cut at a shared minute do not pay that minute twice.
+
+    A 23:59-00:00 slot is normalized into the empty 23:59-23:59 interval, which is kept like
+    RateTable keeps it; other empty pieces merely touch the time left at one of its bounds.
+    """
+    resolved: List[RateSlot] = []
+    free = [(0, LAST_MINUTE)]
+    for rule in sorted(rules, key=lambda rule: -rule.priority):
+        slot = rule.slot
+        start, end = slot.start, slot.normalized_end
+        remaining = []
+        for free_start, free_end in free:
+            piece_start, piece_end = max(start, free_start), min(end, free_end)
+            if piece_start > piece_end or (piece_start == piece_end and start < end):
+                remaining.append((free_start, free_end))
+                continue
+            resolved.append(slot._replace(start=piece_start, end=piece_end))
+            if free_start < piece_start:
+                remaining.append((free_start, piece_start))
+            if piece_end < free_end:
+                remaining.append((piece_end, free_end))
+        free = remaining
+    return tuple(sorted(resolved))
+
+
+@dataclass
+class DayPlan:
+    """Resolved payment slots of a day, compiled for pricing."""
+
+    slots: Tuple[RateSlot, ...]
+    compiled: CompiledDay
+
+    def price(self, start: int, end: int) -> Decimal:
+        return self.compiled.price(start, end)
+
+    def price_by_band(self, start: int, end: int) -> List[Tuple[str, int, Decimal]]:
+        return [
+            (self.slots[index].band, minutes, amount)
+            for index, minutes, amount in self.compiled.price_slots(start, end)
+        ]
+
+
+class RateRuleIndex:
+    """
+    Rate rules indexed by the dates their validity changes at.
+
+    The sorted boundaries split the calendar into segments within which the very same rules
+    are valid, so the plan of a day is found with a binary search and resolved only once per
+    segment and week day. Pricing spans costs O(log rules) each, not a scan of every rule, and
+    resolving a plan only looks at the rules of its segment.
+    """
+
+    def __init__(self, rules: Iterable[RateRule]) -> None:
+        self.rules = tuple(rules)
+        boundaries = set()
+        for rule in self.rules:
+            if rule.valid_from is not None:
+                boundaries.add(rule.valid_from.toordinal())
+            if rule.valid_until is not None:
+                boundaries.add(rule.valid_until.toordinal() + 1)
+        self.boundaries = sorted(boundaries)
+        self.segment_rules: List[List[RateRule]] = [[] for _ in range(len(self.boundaries) + 1)]
+        for rule in self.rules:
+            first_segment = 0 if rule.valid_from is None else self.get_segment(rule.valid_from)
+            last_segment = (
+                len(self.boundaries)
+                if rule.valid_until is None
+                else self.get_segment(rule.valid_until)
+            )
+            for segment in range(first_segment, last_segment + 1):
+                self.segment_rules[segment].append(rule)
+        self.__plans: Dict[Tuple[int, int], DayPlan] = {}
+        self.__compiled_days: Dict[Tuple[RateSlot, ...], DayPlan] = {}
+
+    def get_segment(self, day: date) -> int:
+        return bisect_right(self.boundaries, day.toordinal())
+
+    def get_day_plan(self, day: date) -> DayPlan:
+        segment, weekday = key = self.get_segment(day), day.weekday()
+        plan = self.__plans.get(key)
+        if plan is None:
+            slots = resolve_day_slots(
+                [rule for rule in self.segment_rules[segment] if weekday in rule.weekdays]
+            )
+            plan = self.__compiled_days.get(slots)
+            if plan is None:
+                compiled = CompiledDay([slot.get_bounds() for slot in slots])
+                plan = self.__compiled_days[slots] = DayPlan(slots, compiled)
+            self.__plans[key] = plan
+        return plan
+
+    def price(self, span: DatedSpan) -> Decimal:
+        return self.get_day_plan(span.day).price(span.start, span.normalized_end)
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "RateRuleIndex":
+        """
+        Build an index out of {"tables": [{"from": "2024-01-01", "until": "2024-03-31",
+        "priority": 0, "weekdays": {...}}], "rules": [{"from": ..., "until": ..., "weekdays": "SA,SU",
+        "start": "18:01", "end": "00:00", "hour_amount": "40", "band": "holiday", "priority": 10}]},
+        where tables use the RateTable.from_dict layout and every bound is optional.
+        """
+        rules: List[RateRule] = []
+        for table in data.get("tables", ()):
+            rules += rules_from_rate_table(
+                RateTable.from_dict(table),
+                parse_date(table.get("from")),
+                parse_date(table.get("until")),
+                parse_priority(table.get("priority", 0)),
+            )
+        for rule in data.get("rules", ()):
+            rules.append(
+                RateRule(
+                    create_rate_slot(rule),
+                    parse_date(rule.get("from")),
+                    parse_date(rule.get("until")),
+                    parse_weekdays(rule.get("weekdays")),
+                    parse_priority(rule.get("priority", 0)),
+                )
+            )
+        if not rules:
+            raise RateTableError("rate rules should have a tables or rules section")
+        return cls(rules)
+
+
+def parse_date(value) -> Optional[date]:
+    if value is None or isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError) as exc:
+        raise RateTableError(f"date:{value!r} should have the YYYY-MM-DD format") from exc
+
+
+def parse_priority(value) -> int:
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise RateTableError(f"priority:{value!r} should be a whole number")
+    try:
+        return int(value)
+    except ValueError as exc:
+        raise RateTableError(f"priority:{value!r} should be a whole number") from exc
+
+
+def parse_weekdays(value) -> FrozenSet[int]:
+    if not value:
+        return ALL_WEEKDAYS
+    if not isinstance(value, str):
+        raise RateTableError(f"weekdays:{value!r} should be comma separated week days like SA,SU")
+    return frozenset(get_weekday(abbrev) for abbrev in value.split(","))
+
+
+def load_rate_rules(path: str) -> RateRuleIndex:
+    """Load rate rules from a .json or .toml file."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        with open(path, encoding="utf-8") as file:
+            return RateRuleIndex.from_dict(json.load(file))
+    if extension == ".toml":
+        with open(path, "rb") as file:
+            return RateRuleIndex.from_dict(import_toml().load(file))
+    raise RateTableError(f"rate rules file:{path} should be a .json or .toml file")
+
+
+@dataclass
+class DatedEmployeeSchedule:
+    username: Optional[str] = None
+    spans: List[DatedSpan] = field(default_factory=list)
+
+    def calculate_salary(self, rule_index: RateRuleIndex) -> Decimal:
+        salary = Decimal(0)
+        for span in self.spans:
+            salary += rule_index.price(span)
+        return salary.quantize(Decimal("0.01"))
+
+    def calculate_salary_by_band(
+        self, rule_index: RateRuleIndex
+    ) -> Dict[Tuple[date, str], Decimal]:
+        amounts: Dict[Tuple[date, str], Decimal] = {}
+        for span in self.spans:
+            plan = rule_index.get_day_plan(span.day)
+            for band, _, amount in plan.price_by_band(span.start, span.normalized_end):
+                key = span.day, band
+                amounts[key] = amounts.get(key, Decimal(0)) + amount
+        return amounts
+
+
+def parse_dated_schedule_line(
+    line: str, line_number: Optional[int] = None
+) -> DatedEmployeeSchedule:
+    """Parse a NAME=YYYY-MM-DDTHH:MM-HH:MM,... line, the dated version of schedule lines."""
+    equals_index = line.find("=")
+    if equals_index < 0:
+        raise ScheduleParseError("missing '=' after the username", line_number, 1)
+    spans = []
+    column = equals_index + 2
+    for span_token in line[equals_index + 1 :].split(","):
+        day_token, separator, times_token = span_token.partition("T")
+        try:
+            day = date.fromisoformat(day_token)
+        except ValueError:
+            raise ScheduleParseError(
+                f"date:{day_token!r} should have the YYYY-MM-DD format", line_number, column
+            ) from None
+        times = times_token.split("-")
+        if not separator or len(times) != 2:
+            raise ScheduleParseError(
+                f"span:{span_token!r} should have the YYYY-MM-DDTHH:MM-HH:MM format",
+                line_number,
+                column,
+            )
+        times_column = column + len(day_token) + 1
+        start, end = TIME_TOKENS.get(times[0]), TIME_TOKENS.get(times[1])
+        if start is None or end is None:
+            raise ScheduleParseError(
+                f"span times:{times_token!r} are invalid", line_number, times_column
+            )
+        if end and start > end:
+            raise StartGreaterThanEndParseError(
+                f"start time({times[0]}) should be lower or equal to end time({times[1]})",
+                line_number,
+                times_column,
+            )
+        spans.append(DatedSpan(day, start, end))
+        column += len(span_token) + 1
+    return DatedEmployeeSchedule(username=line[:equals_index], spans=spans)
+
+
+def calculate_dated_salaries(
+    lines: Iterable[str], rule_index: RateRuleIndex, first_line_number: int = 1
+) -> Iterator[SalaryRecord]:
+    for line_number, line in enumerate(lines, first_line_number):
+        if not line:
+            continue
+        schedule = parse_dated_schedule_line(line, line_number)
+        yield schedule.username, schedule.calculate_salary(rule_index)
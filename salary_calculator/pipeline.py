@@ -0,0 +1,66 @@
+from decimal import Decimal
+from time import perf_counter
+from typing import Iterable, Iterator, Optional, Tuple
+
+from salary_calculator.cache import ShiftPayCache
+from salary_calculator.classes import EmployeeSchedule
+from salary_calculator.instrumentation import instrumentation
+from salary_calculator.rates import RateTable
+from salary_calculator.serializers import FastEmployeeScheduleSerializer
+
+SalaryRecord = Tuple[str, Decimal]
+
+OVERLAP_POLICIES = ("allow", "reject", "merge")
+
+
+def serialize_lines(
+    lines: Iterable[str], first_line_number: int = 1, overlaps: str = "allow"
+) -> Iterator[EmployeeSchedule]:
+    """
+    Serialize every non blank line, numbering lines from first_line_number for error reports.
+    Schedules with overlapping or duplicated spans are kept as they are with the "allow"
+    overlaps policy, raise OverlappingSpansError with "reject", or get them merged with "merge".
+    """
+    if overlaps not in OVERLAP_POLICIES:
+        raise ValueError(f"overlaps policy:{overlaps} should be one of {OVERLAP_POLICIES}")
+    for line_number, line in enumerate(lines, first_line_number):
+        if not line:
+            continue
+        if not instrumentation.enabled:
+            schedule = FastEmployeeScheduleSerializer(line, line_number).serialize()
+        else:
+            started = perf_counter()
+            schedule = FastEmployeeScheduleSerializer(line, line_number).serialize()
+            instrumentation.add_time("parse", perf_counter() - started)
+        if overlaps == "reject":
+            schedule.validate_spans(line_number)
+        elif overlaps == "merge":
+            schedule = schedule.merge_overlapping_spans()
+        yield schedule
+
+
+def price_schedules(
+    schedules: Iterable[EmployeeSchedule],
+    rate_table: Optional[RateTable] = None,
+    pay_cache: Optional[ShiftPayCache] = None,
+) -> Iterator[SalaryRecord]:
+    for schedule in schedules:
+        if not instrumentation.enabled:
+            yield schedule.username, schedule.calculate_salary(rate_table, pay_cache)
+            continue
+        started = perf_counter()
+        salary = schedule.calculate_salary(rate_table, pay_cache)
+        instrumentation.add_time("price", perf_counter() - started)
+        yield schedule.username, salary
+
+
+def calculate_salaries(
+    lines: Iterable[str],
+    first_line_number: int = 1,
+    rate_table: Optional[RateTable] = None,
+    pay_cache: Optional[ShiftPayCache] = None,
+    overlaps: str = "allow",
+) -> Iterator[SalaryRecord]:
+    return price_schedules(
+        serialize_lines(lines, first_line_number, overlaps), rate_table, pay_cache
+    )
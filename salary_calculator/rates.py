@@ -0,0 +1,361 @@
+import csv
+import json
+import os
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from decimal import Decimal
+from typing import (IO, Dict, Iterable, Iterator, List, Mapping, NamedTuple,
+                    Optional, Sequence, Tuple, Union)
+
+from salary_calculator.cache import LRUCache
+from salary_calculator.exceptions import RateTableError
+from salary_calculator.utils import (get_abbrev_by_calendar_day,
+                                     get_calendar_day_by_abbrev,
+                                     hash_rate_slots, time_to_minutes)
+
+MINUTES_PER_DAY = 24 * 60
+LAST_MINUTE = MINUTES_PER_DAY - 1
+DECIMAL_TWO_PLACES = Decimal("0.01")
+ZERO_AMOUNT = Decimal(0)
+
+# Hours worked for every whole amount of minutes, rounded the same way the intersection
+# based calculation does it: Decimal(intersection_mins / 60) quantized to two places.
+QUANTIZED_HOURS = [
+    Decimal(mins / 60).quantize(DECIMAL_TWO_PLACES) for mins in range(MINUTES_PER_DAY)
+]
+
+SlotBounds = Tuple[int, int, Decimal]
+
+
+class CompiledDay:
+    """
+    Payment slots of a single week day compiled into per-minute lookup tables.
+
+    For every minute m of the day the tables hold the first slot not ending before m,
+    the last slot not starting after m, the quantized pay from m up to the end of the
+    former slot (head) and from the start of the latter slot up to m (tail), plus the
+    cumulative pay of whole slots. Pricing any span is then a handful of lookups,
+    while still rounding the hours of every slot separately.
+    """
+
+    __slots__ = (
+        "starts",
+        "ends",
+        "amounts",
+        "next_slot",
+        "prev_slot",
+        "head",
+        "tail",
+        "full_cumulative",
+    )
+
+    def __init__(self, slots: Sequence[SlotBounds]) -> None:
+        slots = sorted(slots)
+        for (_, previous_end, _), (start, _, _) in zip(slots, slots[1:]):
+            if start < previous_end:
+                raise RateTableError(f"payment slots overlap at minute {start}")
+        self.starts = [start for start, _, _ in slots]
+        self.ends = [end for _, end, _ in slots]
+        self.amounts = [amount for _, _, amount in slots]
+
+        self.full_cumulative = [ZERO_AMOUNT]
+        for start, end, amount in slots:
+            self.full_cumulative.append(
+                self.full_cumulative[-1] + amount * QUANTIZED_HOURS[end - start]
+            )
+
+        minutes = range(MINUTES_PER_DAY)
+        self.next_slot = [bisect_left(self.ends, m) for m in minutes]
+        self.prev_slot = [bisect_right(self.starts, m) - 1 for m in minutes]
+        self.head = [self.__partial_amount(self.next_slot[m], m, None) for m in minutes]
+        self.tail = [self.__partial_amount(self.prev_slot[m], None, m) for m in minutes]
+
+    def __partial_amount(self, slot: int, start, end) -> Decimal:
+        if not 0 <= slot < len(self.starts):
+            return ZERO_AMOUNT
+        slot_start, slot_end = self.starts[slot], self.ends[slot]
+        start = slot_start if start is None else max(start, slot_start)
+        end = slot_end if end is None else min(end, slot_end)
+        if start > end:
+            return ZERO_AMOUNT
+        return self.amounts[slot] * QUANTIZED_HOURS[end - start]
+
+    def price(self, start: int, end: int) -> Decimal:
+        first_slot = self.next_slot[start]
+        last_slot = self.prev_slot[end]
+        if first_slot > last_slot:
+            return ZERO_AMOUNT
+        if first_slot == last_slot:
+            slot_start, slot_end = self.starts[first_slot], self.ends[first_slot]
+            return self.amounts[first_slot] * QUANTIZED_HOURS[
+                min(end, slot_end) - max(start, slot_start)
+            ]
+        return (
+            self.head[start]
+            + self.full_cumulative[last_slot]
+            - self.full_cumulative[first_slot + 1]
+            + self.tail[end]
+        )
+
+    def price_slots(self, start: int, end: int) -> Iterator[Tuple[int, int, Decimal]]:
+        """
+        Yield the index, paid minutes and pay of every slot the span overlaps, the pay adding
+        up to price(start, end).
+        """
+        for slot in range(self.next_slot[start], self.prev_slot[end] + 1):
+            minutes = min(end, self.ends[slot]) - max(start, self.starts[slot])
+            yield slot, minutes, self.amounts[slot] * QUANTIZED_HOURS[minutes]
+
+
+class CompiledRateTable:
+    """Per week day compiled payment slots, pricing spans given as minutes since midnight."""
+
+    __slots__ = ("days",)
+
+    def __init__(self, days: Mapping[int, CompiledDay]) -> None:
+        self.days = dict(days)
+
+    def price(self, weekday: int, start: int, end: int) -> Decimal:
+        return self.days[weekday].price(start, end)
+
+    def price_minute_spans(self, minute_spans: Iterable[Tuple[int, int, int]]) -> Decimal:
+        """
+        Return the pay of (weekday, start minute, end minute) spans as parse_schedule_line
+        gives them, ends at midnight being 0, rounded to cents like calculate_salary does.
+        """
+        days = self.days
+        salary = ZERO_AMOUNT
+        for weekday, start, end in minute_spans:
+            salary += days[weekday].price(start, end or LAST_MINUTE)
+        return salary.quantize(DECIMAL_TWO_PLACES)
+
+
+class RateSlot(NamedTuple):
+    start: int
+    end: int
+    hour_amount: Decimal
+    band: str
+
+    @property
+    def normalized_end(self) -> int:
+        # Slots ending at midnight are normalized into the last minute of the day.
+        return self.end or LAST_MINUTE
+
+    def get_bounds(self) -> SlotBounds:
+        return self.start, self.normalized_end, self.hour_amount
+
+
+def format_minutes(minutes: int) -> str:
+    return "%02d:%02d" % divmod(minutes, 60)
+
+
+def parse_time_token(value: str) -> int:
+    try:
+        parsed = datetime.strptime(value, "%H:%M")
+    except (TypeError, ValueError) as exc:
+        raise RateTableError(f"time:{value!r} should have the HH:MM format") from exc
+    return parsed.hour * 60 + parsed.minute
+
+
+def parse_hour_amount(value) -> Decimal:
+    if isinstance(value, float):
+        value = str(value)
+    try:
+        amount = Decimal(value)
+    except (TypeError, ArithmeticError) as exc:
+        raise RateTableError(f"hour amount:{value!r} is not a number") from exc
+    if not amount.is_finite() or amount < 0:
+        raise RateTableError(f"hour amount:{value!r} should be a non negative number")
+    return amount
+
+
+class RateTable:
+    """
+    Validated payment slots of every week day.
+
+    Tables are identified by a hash of their content, so equal grids built from different
+    sources share the same compiled lookup tables.
+    """
+
+    __slots__ = ("name", "weekday_slots", "content_hash")
+
+    def __init__(
+        self, weekday_slots: Mapping[int, Iterable[RateSlot]], name: Optional[str] = None
+    ) -> None:
+        missing_weekdays = set(range(7)) - set(weekday_slots)
+        if missing_weekdays:
+            missing = ", ".join(get_abbrev_by_calendar_day(day) for day in sorted(missing_weekdays))
+            raise RateTableError(f"rate table has no payment slots for {missing}")
+        self.name = name
+        self.weekday_slots: Dict[int, Tuple[RateSlot, ...]] = {
+            weekday: validate_rate_slots(weekday, slots)
+            for weekday, slots in sorted(weekday_slots.items())
+        }
+        self.content_hash = hash_rate_slots(
+            (weekday, *slot) for weekday, slots in self.weekday_slots.items() for slot in slots
+        )
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, RateTable):
+            return NotImplemented
+        return self.content_hash == other.content_hash
+
+    def __hash__(self) -> int:
+        return hash(self.content_hash)
+
+    def __repr__(self) -> str:
+        return f"RateTable(name={self.name!r}, content_hash={self.content_hash[:12]!r})"
+
+    @classmethod
+    def from_payment_slots(
+        cls, weekday_time_payments: Mapping[int, Sequence], name: Optional[str] = None
+    ) -> "RateTable":
+        weekday_slots = {}
+        for weekday, payment_slots in weekday_time_payments.items():
+            slots = []
+            for payment_slot in payment_slots:
+                start, end = payment_slot.span.start, payment_slot.span.raw_end
+                if start.second or start.microsecond:
+                    raise RateTableError(f"payment slot start({start}) should be a whole minute")
+                slots.append(
+                    RateSlot(
+                        start=time_to_minutes(start),
+                        end=time_to_minutes(end),
+                        hour_amount=payment_slot.hour_amount,
+                        band=f"{format_minutes(time_to_minutes(start))}-{format_minutes(time_to_minutes(end))}",
+                    )
+                )
+            weekday_slots[weekday] = slots
+        return cls(weekday_slots, name=name)
+
+    @classmethod
+    def from_dict(cls, data: Mapping, name: Optional[str] = None) -> "RateTable":
+        """
+        Build a table out of {"name": ..., "weekdays": {"MO,TU": [{"start": "00:01", "end": "09:00",
+        "hour_amount": "25", "band": "night"}, ...], ...}}, where every key lists week day prefixes.
+        """
+        try:
+            weekdays = data["weekdays"]
+        except (KeyError, TypeError) as exc:
+            raise RateTableError("rate table should have a weekdays section") from exc
+        weekday_slots: Dict[int, List[RateSlot]] = {}
+        for weekday_key, slots in weekdays.items():
+            for abbrev in weekday_key.split(","):
+                weekday = get_weekday(abbrev)
+                if weekday in weekday_slots:
+                    raise RateTableError(f"week day {abbrev.strip()} is defined twice")
+                weekday_slots[weekday] = [create_rate_slot(slot) for slot in slots]
+        return cls(weekday_slots, name=data.get("name", name))
+
+    @classmethod
+    def from_csv(cls, stream: IO[str], name: Optional[str] = None) -> "RateTable":
+        """Build a table out of weekday,start,end,hour_amount[,band] rows, with a header row."""
+        weekday_slots: Dict[int, List[RateSlot]] = {}
+        for row in csv.DictReader(stream):
+            for abbrev in (row.get("weekday") or "").split(","):
+                weekday_slots.setdefault(get_weekday(abbrev), []).append(create_rate_slot(row))
+        return cls(weekday_slots, name=name)
+
+    def get_slots(self, weekday: int) -> Tuple[RateSlot, ...]:
+        return self.weekday_slots[weekday]
+
+
+def get_weekday(abbrev: str) -> int:
+    try:
+        return get_calendar_day_by_abbrev(abbrev.strip().upper())
+    except ValueError as exc:
+        raise RateTableError(str(exc)) from exc
+
+
+def create_rate_slot(data: Mapping) -> RateSlot:
+    try:
+        start, end, hour_amount = data["start"], data["end"], data["hour_amount"]
+    except (KeyError, TypeError) as exc:
+        raise RateTableError(
+            f"payment slot {data!r} should have start, end and hour_amount values"
+        ) from exc
+    start_minute, end_minute = parse_time_token(start), parse_time_token(end)
+    band = data.get("band") or f"{format_minutes(start_minute)}-{format_minutes(end_minute)}"
+    return RateSlot(start_minute, end_minute, parse_hour_amount(hour_amount), band)
+
+
+def validate_rate_slots(weekday: int, slots: Iterable[RateSlot]) -> Tuple[RateSlot, ...]:
+    abbrev = get_abbrev_by_calendar_day(weekday)
+    slots = tuple(sorted(slots))
+    for slot in slots:
+        if not 0 <= slot.start < MINUTES_PER_DAY or not 0 <= slot.end < MINUTES_PER_DAY:
+            raise RateTableError(f"{abbrev} payment slot {slot} is out of the day")
+        if slot.start > slot.normalized_end:
+            raise RateTableError(
+                f"{abbrev} payment slot start({format_minutes(slot.start)}) should be lower or equal to end({format_minutes(slot.end)})"
+            )
+        if not isinstance(slot.hour_amount, Decimal):
+            raise RateTableError(f"{abbrev} payment slot hour amount should be a Decimal")
+    for previous, current in zip(slots, slots[1:]):
+        if current.start < previous.normalized_end:
+            raise RateTableError(
+                f"{abbrev} payment slots {previous.band} and {current.band} overlap"
+            )
+    return slots
+
+
+def load_rate_table(path: str) -> RateTable:
+    """Load a rate table from a .json, .toml or .csv file."""
+    name = os.path.splitext(os.path.basename(path))[0]
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        with open(path, encoding="utf-8") as file:
+            return RateTable.from_dict(json.load(file, parse_float=Decimal), name=name)
+    if extension == ".toml":
+        toml = import_toml()
+        with open(path, "rb") as file:
+            return RateTable.from_dict(toml.load(file), name=name)
+    if extension == ".csv":
+        with open(path, encoding="utf-8", newline="") as file:
+            return RateTable.from_csv(file, name=name)
+    raise RateTableError(f"rate table file:{path} should be a .json, .toml or .csv file")
+
+
+def import_toml():
+    try:
+        import tomllib
+    except ImportError:  # pragma: no cover - python < 3.11
+        try:
+            import tomli as tomllib
+        except ImportError as exc:
+            raise RateTableError(
+                "reading TOML rate tables requires python 3.11 or the tomli package"
+            ) from exc
+    return tomllib
+
+
+def compile_rate_table(rate_table: Union[RateTable, Mapping[int, Sequence]]) -> CompiledRateTable:
+    """
+    Compile a RateTable, or a mapping of week days to PaymentTimeSlot lists, into a
+    CompiledRateTable. Week days sharing the very same slots share a single CompiledDay.
+    """
+    if not isinstance(rate_table, RateTable):
+        rate_table = RateTable.from_payment_slots(rate_table)
+    compiled_days: Dict[Tuple[SlotBounds, ...], CompiledDay] = {}
+    days = {}
+    for weekday, slots in rate_table.weekday_slots.items():
+        key = tuple(slot.get_bounds() for slot in slots)
+        if key not in compiled_days:
+            compiled_days[key] = CompiledDay(key)
+        days[weekday] = compiled_days[key]
+    return CompiledRateTable(days)
+
+
+DEFAULT_CACHE_SIZE = 32
+
+compiled_rate_tables: LRUCache[CompiledRateTable] = LRUCache(DEFAULT_CACHE_SIZE)
+
+
+def get_compiled_rate_table(
+    rate_table: RateTable, cache: Optional[LRUCache] = None
+) -> CompiledRateTable:
+    """Return the compiled version of a table, compiling it only once per distinct content."""
+    cache = compiled_rate_tables if cache is None else cache
+    return cache.get_or_create(
+        rate_table.content_hash, lambda: compile_rate_table(rate_table)
+    )
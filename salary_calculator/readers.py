@@ -0,0 +1,144 @@
+import copy
+import mmap
+from typing import Callable, Iterator, List, Optional, Tuple, Union
+
+from salary_calculator.exceptions import ScheduleParseError
+from salary_calculator.parallel import map_in_order, price_chunk
+from salary_calculator.pipeline import SalaryRecord
+from salary_calculator.rates import RateTable
+
+ByteRange = Tuple[int, int]
+Buffer = Union[bytes, mmap.mmap]
+
+DEFAULT_RANGE_SIZE = 1 << 22
+
+
+class MappedFile:
+    """
+    Read only memory map of a schedule file, exposed as a memoryview so lines are sliced
+    out of the page cache without being decoded. Slicing copies nothing, but memoryviews have
+    neither find nor split, so parse_schedule_line copies every line once into bytes.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.__file = open(path, "rb")
+        try:
+            self.buffer: Buffer = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can not be mapped.
+            self.buffer = b""
+        self.view = memoryview(self.buffer)
+
+    def __enter__(self) -> "MappedFile":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def iter_lines(self, byte_range: Optional[ByteRange] = None) -> Iterator[memoryview]:
+        start, stop = byte_range or (0, len(self.buffer))
+        return iter_line_views(self.buffer, self.view, start, stop)
+
+    def close(self) -> None:
+        self.view.release()
+        if isinstance(self.buffer, mmap.mmap):
+            try:
+                self.buffer.close()
+            except BufferError:
+                # Line views are still referenced, the map goes away with the last of them.
+                pass
+        self.__file.close()
+
+
+def iter_line_views(
+    buffer: Buffer, view: memoryview, start: int = 0, stop: Optional[int] = None
+) -> Iterator[memoryview]:
+    """Yield every line between two offsets as a memoryview, without its line ending."""
+    stop = len(buffer) if stop is None else stop
+    find = buffer.find
+    while start < stop:
+        end = find(b"\n", start, stop)
+        next_start = stop if end < 0 else end + 1
+        end = stop if end < 0 else end
+        if end > start and buffer[end - 1] == 13:
+            end -= 1
+        yield view[start:end]
+        start = next_start
+
+
+def find_line_start(buffer: Buffer, offset: int) -> int:
+    """Return the offset of the first line starting at or after offset."""
+    if offset <= 0:
+        return 0
+    if offset >= len(buffer):
+        return len(buffer)
+    newline = buffer.find(b"\n", offset - 1)
+    return len(buffer) if newline < 0 else newline + 1
+
+
+def iter_byte_ranges(buffer: Buffer, range_size: int = DEFAULT_RANGE_SIZE) -> Iterator[ByteRange]:
+    """
+    Split a buffer into ranges of about range_size bytes ending on line boundaries.
+    Every boundary only needs a search for the next newline, so the file is not scanned upfront.
+    """
+    if range_size < 1:
+        raise ValueError(f"range size:{range_size} should be a positive number")
+    start, size = 0, len(buffer)
+    while start < size:
+        stop = find_line_start(buffer, start + range_size)
+        yield start, stop
+        start = stop
+
+
+def split_byte_ranges(buffer: Buffer, parts: int) -> List[ByteRange]:
+    """Split a buffer into at most parts ranges of similar size ending on line boundaries."""
+    if parts < 1:
+        raise ValueError(f"parts:{parts} should be a positive number")
+    return list(iter_byte_ranges(buffer, max(1, -(-len(buffer) // parts))))
+
+
+def price_byte_range(
+    path: str,
+    byte_range: ByteRange,
+    rate_table: Optional[RateTable] = None,
+    chunk_pricer: Callable[..., List[SalaryRecord]] = price_chunk,
+) -> List[SalaryRecord]:
+    """
+    Map the file in a worker and price the lines of one range. Line numbers are only
+    worked out, by counting the newlines before the range, when a line fails to parse.
+    """
+    with MappedFile(path) as mapped_file:
+        lines = list(mapped_file.iter_lines(byte_range))
+        try:
+            return chunk_pricer(lines, 1, rate_table)
+        except ScheduleParseError as exc:
+            if exc.line is None:
+                raise
+            previous_lines = mapped_file.buffer[: byte_range[0]].count(b"\n")
+            error = copy.copy(exc)
+            error.line = previous_lines + exc.line
+            raise error from exc
+        finally:
+            del lines
+
+
+def calculate_salaries_mapped(
+    path: str,
+    workers: Optional[int] = None,
+    range_size: int = DEFAULT_RANGE_SIZE,
+    chunk_pricer: Callable[..., List[SalaryRecord]] = price_chunk,
+    rate_table: Optional[RateTable] = None,
+) -> Iterator[SalaryRecord]:
+    """
+    Price a schedule file in a process pool, handing workers byte ranges of a memory mapped
+    file instead of lines, so no line crosses a process boundary. Records keep input order.
+    """
+    with MappedFile(path) as mapped_file:
+        byte_ranges = list(iter_byte_ranges(mapped_file.buffer, range_size))
+    calls = ((path, byte_range, rate_table, chunk_pricer) for byte_range in byte_ranges)
+    for records in map_in_order(price_byte_range, calls, workers):
+        yield from records
@@ -0,0 +1,214 @@
+import hashlib
+import os
+import struct
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from salary_calculator.classes import EmployeeSchedule, WorkingDaySpan
+from salary_calculator.parsing import parse_schedule_line
+
+CACHE_MAGIC = b"SCHC"
+CACHE_VERSION = 1
+CACHE_SUFFIX = ".schedcache"
+
+# magic, version, source size, source mtime (ns), source sha256, usernames, employees, spans
+HEADER = struct.Struct("<4sHxxQq32sIII")
+# username id, first span, span count
+INDEX_ENTRY = struct.Struct("<III")
+# weekday, start minute, raw end minute
+SPAN_RECORD = struct.Struct("<BHH")
+
+
+def get_cache_path(source_path: str) -> str:
+    return source_path + CACHE_SUFFIX
+
+
+def get_source_stamp(source_path: str) -> Tuple[int, int]:
+    stat = os.stat(source_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def hash_file(path: str) -> bytes:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+class ScheduleCache:
+    """
+    Parsed schedules of a source file in a compact binary layout: a table of interned
+    usernames, one index entry per employee pointing to its packed (weekday, start, end)
+    span records, and a header holding the size, mtime and sha256 of the source file.
+    Any employee can be loaded on its own without reading the others.
+    """
+
+    def __init__(self, data: bytes) -> None:
+        (
+            magic,
+            version,
+            self.source_size,
+            self.source_mtime_ns,
+            self.source_hash,
+            username_count,
+            employee_count,
+            span_count,
+        ) = HEADER.unpack_from(data)
+        if magic != CACHE_MAGIC or version != CACHE_VERSION:
+            raise ValueError("not a schedule cache file of the current version")
+        offset = HEADER.size
+        self.__username_offsets = struct.unpack_from(f"<{username_count + 1}I", data, offset)
+        offset += 4 * (username_count + 1)
+        self.__usernames_data = data[offset : offset + self.__username_offsets[-1]]
+        offset += self.__username_offsets[-1]
+        self.__index = memoryview(data)[offset : offset + INDEX_ENTRY.size * employee_count]
+        offset += INDEX_ENTRY.size * employee_count
+        self.__spans = memoryview(data)[offset : offset + SPAN_RECORD.size * span_count]
+        if len(self.__spans) != SPAN_RECORD.size * span_count:
+            raise ValueError("schedule cache file is truncated")
+        self.__usernames: List[Optional[str]] = [None] * username_count
+        self.__employees_by_username: Optional[Dict[str, List[int]]] = None
+
+    def __len__(self) -> int:
+        return len(self.__index) // INDEX_ENTRY.size
+
+    def get_username(self, username_id: int) -> str:
+        username = self.__usernames[username_id]
+        if username is None:
+            start, end = self.__username_offsets[username_id : username_id + 2]
+            username = self.__usernames_data[start:end].decode("utf-8")
+            self.__usernames[username_id] = username
+        return username
+
+    def get_schedule(self, index: int) -> EmployeeSchedule:
+        entry = INDEX_ENTRY.unpack_from(self.__index, index * INDEX_ENTRY.size)
+        return self.__build_schedule(*entry)
+
+    def iter_schedules(self) -> Iterator[EmployeeSchedule]:
+        # Spans are built entry by entry, so only the schedule being priced is held in memory.
+        build_schedule = self.__build_schedule
+        for username_id, first_span, span_count in INDEX_ENTRY.iter_unpack(self.__index):
+            yield build_schedule(username_id, first_span, span_count)
+
+    def __build_schedule(
+        self, username_id: int, first_span: int, span_count: int
+    ) -> EmployeeSchedule:
+        records = self.__spans[
+            first_span * SPAN_RECORD.size : (first_span + span_count) * SPAN_RECORD.size
+        ]
+        spans = [
+            WorkingDaySpan.from_minutes(weekday=weekday, start=start, end=end)
+            for weekday, start, end in SPAN_RECORD.iter_unpack(records)
+        ]
+        return EmployeeSchedule(username=self.get_username(username_id), working_days_spans=spans)
+
+    def find(self, username: str) -> List[int]:
+        """Return the index of every schedule of an employee, in input order."""
+        if self.__employees_by_username is None:
+            self.__employees_by_username = {}
+            for index, (username_id, _, _) in enumerate(INDEX_ENTRY.iter_unpack(self.__index)):
+                self.__employees_by_username.setdefault(
+                    self.get_username(username_id), []
+                ).append(index)
+        return self.__employees_by_username.get(username, [])
+
+    def to_columns(self):
+        """Return the spans as vectorized ScheduleColumns, straight from the packed records."""
+        from salary_calculator.vectorized import (LAST_MINUTE, ScheduleColumns,
+                                                  np, require_numpy)
+
+        require_numpy()
+        index = np.frombuffer(self.__index, dtype=np.dtype("<u4")).reshape(-1, 3)
+        records = np.frombuffer(
+            self.__spans, dtype=np.dtype([("weekday", "u1"), ("start", "<u2"), ("end", "<u2")])
+        )
+        end = records["end"].astype(np.int16)
+        end[end == 0] = LAST_MINUTE
+        return ScheduleColumns(
+            usernames=[self.get_username(username_id) for username_id in index[:, 0].tolist()],
+            employee=np.repeat(np.arange(len(index), dtype=np.int64), index[:, 2]),
+            weekday=records["weekday"].astype(np.int8),
+            start=records["start"].astype(np.int16),
+            end=end,
+        )
+
+    def is_fresh(self, source_path: str) -> bool:
+        """
+        Check the cache against its source: matching size and mtime are trusted, otherwise the
+        source is hashed, so touched but unchanged files keep their cache.
+        """
+        try:
+            size, mtime_ns = get_source_stamp(source_path)
+        except OSError:
+            return False
+        if size != self.source_size:
+            return False
+        return mtime_ns == self.source_mtime_ns or hash_file(source_path) == self.source_hash
+
+    @classmethod
+    def load(cls, source_path: str, cache_path: Optional[str] = None) -> Optional["ScheduleCache"]:
+        """Return the cache of a source file, or None when it is missing, corrupt or stale."""
+        try:
+            with open(cache_path or get_cache_path(source_path), "rb") as file:
+                cache = cls(file.read())
+        except (OSError, ValueError, struct.error):
+            return None
+        return cache if cache.is_fresh(source_path) else None
+
+    @classmethod
+    def build(cls, source_path: str, cache_path: Optional[str] = None) -> "ScheduleCache":
+        """Parse a source file, hashing it in the same pass, and write its cache atomically."""
+        size, mtime_ns = get_source_stamp(source_path)
+        digest = hashlib.sha256()
+        username_ids: Dict[str, int] = {}
+        usernames = bytearray()
+        username_offsets = [0]
+        index = bytearray()
+        spans = bytearray()
+        span_count = 0
+        with open(source_path, "rb") as file:
+            for line_number, raw_line in enumerate(file, 1):
+                digest.update(raw_line)
+                line = raw_line.rstrip(b"\r\n")
+                if not line:
+                    continue
+                username, minute_spans = parse_schedule_line(line, line_number)
+                username_id = username_ids.get(username)
+                if username_id is None:
+                    username_id = username_ids[username] = len(username_ids)
+                    usernames += username.encode("utf-8")
+                    username_offsets.append(len(usernames))
+                index += INDEX_ENTRY.pack(username_id, span_count, len(minute_spans))
+                for span in minute_spans:
+                    spans += SPAN_RECORD.pack(*span)
+                span_count += len(minute_spans)
+        header = HEADER.pack(
+            CACHE_MAGIC,
+            CACHE_VERSION,
+            size,
+            mtime_ns,
+            digest.digest(),
+            len(username_ids),
+            len(index) // INDEX_ENTRY.size,
+            span_count,
+        )
+        data = b"".join(
+            (
+                header,
+                struct.pack(f"<{len(username_offsets)}I", *username_offsets),
+                usernames,
+                index,
+                spans,
+            )
+        )
+        cache_path = cache_path or get_cache_path(source_path)
+        temporary_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(data)
+        os.replace(temporary_path, cache_path)
+        return cls(data)
+
+    @classmethod
+    def open(cls, source_path: str, cache_path: Optional[str] = None) -> "ScheduleCache":
+        """Load the cache of a source file, building it first when it is missing or stale."""
+        return cls.load(source_path, cache_path) or cls.build(source_path, cache_path)
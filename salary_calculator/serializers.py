@@ -1,7 +1,15 @@
+from __future__ import annotations
+
 from datetime import datetime
+from typing import TYPE_CHECKING, Optional
 
 from salary_calculator.classes import EmployeeSchedule, WorkingDaySpan
-from salary_calculator.utils import get_calendar_day_by_abbrev
+from salary_calculator.instrumentation import instrumentation
+from salary_calculator.parsing import parse_schedule_line
+from salary_calculator.utils import get_calendar_day_by_abbrev, minutes_to_time
+
+if TYPE_CHECKING:
+    from salary_calculator.parsing import RawLine
 
 
 class EmployeeScheduleSerializer:
@@ -22,4 +30,37 @@ class EmployeeScheduleSerializer:
             end = datetime.strptime(end_token, "%H:%M").time()
             span = WorkingDaySpan(weekday=weekday, start=start, end=end)
             spans.append(span)
+        if instrumentation.enabled:
+            instrumentation.count("parse.lines")
+            instrumentation.count("parse.spans", len(spans))
+        return EmployeeSchedule(working_days_spans=spans, username=username)
+
+
+class FastEmployeeScheduleSerializer(EmployeeScheduleSerializer):
+    """
+    Serializer producing the same schedules as EmployeeScheduleSerializer, without strptime.
+    Spans are compact MinuteSpan values unless compact is False.
+    """
+
+    def __init__(
+        self, raw_str: RawLine, line_number: Optional[int] = None, compact: bool = True
+    ) -> None:
+        super().__init__(raw_str)
+        self.line_number = line_number
+        self.compact = compact
+
+    def serialize(self) -> EmployeeSchedule:
+        username, minute_spans = parse_schedule_line(self.raw_data, self.line_number)
+        if self.compact:
+            spans = [
+                WorkingDaySpan.from_minutes(weekday=weekday, start=start, end=end)
+                for weekday, start, end in minute_spans
+            ]
+            return EmployeeSchedule(working_days_spans=spans, username=username)
+        spans = [
+            WorkingDaySpan(
+                weekday=weekday, start=minutes_to_time(start), end=minutes_to_time(end)
+            )
+            for weekday, start, end in minute_spans
+        ]
         return EmployeeSchedule(working_days_spans=spans, username=username)
@@ -0,0 +1,284 @@
+import argparse
+import asyncio
+import json
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from decimal import Decimal
+from time import perf_counter
+from typing import Deque, Dict, List, Optional, Tuple
+
+from salary_calculator.exceptions import StartGreaterThanEndError
+from salary_calculator.rates import RateTable, load_rate_table
+from salary_calculator.serializers import FastEmployeeScheduleSerializer
+
+# Responses are "OK <username> <salary>" or "ERR <reason>", one per request line, in order.
+STATS_COMMAND = "STATS"
+LATENCY_SAMPLES = 10000
+
+PricedLine = Tuple[bool, str]
+
+
+def price_lines(lines: List[str], rate_table: Optional[RateTable] = None) -> List[PricedLine]:
+    """Price a micro batch of schedule lines, reporting invalid lines instead of failing the batch."""
+    results = []
+    for line in lines:
+        try:
+            schedule = FastEmployeeScheduleSerializer(line).serialize()
+            salary: Decimal = schedule.calculate_salary(rate_table)
+        except (ValueError, StartGreaterThanEndError) as exc:
+            results.append((False, str(exc)))
+        else:
+            results.append((True, f"{schedule.username} {salary}"))
+    return results
+
+
+@dataclass
+class ServerStats:
+    requests: int = 0
+    errors: int = 0
+    batches: int = 0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+
+    def get_percentile(self, percentile: float) -> float:
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(percentile / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def as_dict(self, pending: int) -> Dict:
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "batches": self.batches,
+            "pending": pending,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "latency_ms": {
+                f"p{percentile}": round(self.get_percentile(percentile) * 1000, 3)
+                for percentile in (50, 90, 99)
+            },
+        }
+
+
+@dataclass
+class PendingRequest:
+    line: str
+    received_at: float
+    future: "asyncio.Future[PricedLine]"
+
+
+class SalaryServer:
+    """
+    Long running salary calculation service speaking a line protocol.
+
+    Request lines of every connection go into a single bounded queue. A batcher groups
+    them into micro batches of up to batch_size lines, or whatever arrived batch_latency
+    seconds after the first one, and prices every batch in a worker pool. A full queue, or
+    max_pending responses of a connection waiting to be sent, stops connections from being
+    read, which pushes back on clients through TCP flow control, and at most two batches per
+    worker are priced at once.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 256,
+        batch_latency: float = 0.002,
+        max_pending: int = 10000,
+        workers: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        rate_table: Optional[RateTable] = None,
+    ) -> None:
+        if batch_size < 1 or max_pending < 1 or batch_latency < 0:
+            raise ValueError("batch size and pending requests should be positive numbers")
+        self.batch_size = batch_size
+        self.batch_latency = batch_latency
+        self.max_pending = max_pending
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = executor
+        self.rate_table = rate_table
+        self.stats = ServerStats()
+        self.__queue: Optional["asyncio.Queue[PendingRequest]"] = None
+        self.__batcher: Optional[asyncio.Task] = None
+        self.__server: Optional[asyncio.AbstractServer] = None
+        self.__owns_executor = executor is None
+
+    async def start(
+        self, host: Optional[str] = None, port: int = 0, path: Optional[str] = None
+    ) -> asyncio.AbstractServer:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.__queue = asyncio.Queue(maxsize=self.max_pending)
+        self.__batcher = asyncio.ensure_future(self.__run_batcher())
+        if path is not None:
+            self.__server = await asyncio.start_unix_server(self.__handle_connection, path=path)
+        else:
+            self.__server = await asyncio.start_server(
+                self.__handle_connection, host=host or "127.0.0.1", port=port
+            )
+        return self.__server
+
+    async def close(self) -> None:
+        if self.__server is not None:
+            self.__server.close()
+            await self.__server.wait_closed()
+        if self.__batcher is not None:
+            self.__batcher.cancel()
+            try:
+                await self.__batcher
+            except asyncio.CancelledError:
+                pass
+        if self.__owns_executor and self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def get_stats(self) -> Dict:
+        return self.stats.as_dict(self.__queue.qsize() if self.__queue else 0)
+
+    async def __handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        # Bounded too, so a client not reading its responses stops being read.
+        responses: "asyncio.Queue[Optional[asyncio.Future]]" = asyncio.Queue(
+            maxsize=self.max_pending
+        )
+        responder = asyncio.ensure_future(self.__write_responses(responses, writer))
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                raw_line = await reader.readline()
+                if not raw_line:
+                    break
+                line = raw_line.decode("utf-8", errors="replace").rstrip("\r\n")
+                future = loop.create_future()
+                if line == STATS_COMMAND:
+                    future.set_result((True, json.dumps(self.get_stats())))
+                else:
+                    # Waiting here while the queue is full is the backpressure point.
+                    await self.__queue.put(PendingRequest(line, perf_counter(), future))
+                await responses.put(future)
+            await responses.put(None)
+            await responder
+        finally:
+            responder.cancel()
+            writer.close()
+
+    async def __write_responses(
+        self, responses: "asyncio.Queue[Optional[asyncio.Future]]", writer: asyncio.StreamWriter
+    ) -> None:
+        connected = True
+        while True:
+            future = await responses.get()
+            if future is None:
+                return
+            succeeded, message = await future
+            if not connected:
+                # Still taken off the queue, so the connection handler never waits on it.
+                continue
+            writer.write(f"{'OK' if succeeded else 'ERR'} {message}\n".encode("utf-8"))
+            # Only waits while the transport buffer is over its high water mark.
+            try:
+                await writer.drain()
+            except ConnectionError:
+                connected = False
+
+    async def __collect_batch(self) -> List[PendingRequest]:
+        batch = [await self.__queue.get()]
+        deadline = perf_counter() + self.batch_latency
+        while len(batch) < self.batch_size:
+            if not self.__queue.empty():
+                batch.append(self.__queue.get_nowait())
+                continue
+            remaining = deadline - perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.__queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def __run_batcher(self) -> None:
+        in_flight = asyncio.Semaphore(self.workers * 2)
+        tasks = set()
+        try:
+            while True:
+                batch = await self.__collect_batch()
+                await in_flight.acquire()
+                task = asyncio.ensure_future(self.__price_batch(batch, in_flight))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def __price_batch(
+        self, batch: List[PendingRequest], in_flight: asyncio.Semaphore
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(
+                self.executor, price_lines, [request.line for request in batch], self.rate_table
+            )
+        except Exception as exc:  # A broken pool should not hang clients.
+            results = [(False, f"pricing failed: {exc}")] * len(batch)
+        finally:
+            in_flight.release()
+        finished_at = perf_counter()
+        self.stats.batches += 1
+        for request, result in zip(batch, results):
+            self.stats.requests += 1
+            self.stats.errors += not result[0]
+            self.stats.latencies.append(finished_at - request.received_at)
+            if not request.future.done():
+                request.future.set_result(result)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="salary_calculator.server",
+        description="Serve salary calculations over a TCP or Unix socket line protocol.",
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", metavar="PATH", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument(
+        "--batch-latency-ms",
+        type=float,
+        default=2.0,
+        help="longest wait for a micro batch to fill up (default: 2ms)",
+    )
+    parser.add_argument("--max-pending", type=int, default=10000)
+    parser.add_argument("-j", "--workers", type=int, default=0)
+    parser.add_argument("--rates", metavar="FILE")
+    return parser
+
+
+async def serve(args: argparse.Namespace) -> None:
+    server = SalaryServer(
+        batch_size=args.batch_size,
+        batch_latency=args.batch_latency_ms / 1000,
+        max_pending=args.max_pending,
+        workers=args.workers,
+        rate_table=load_rate_table(args.rates) if args.rates else None,
+    )
+    listener = await server.start(host=args.host, port=args.port, path=args.unix)
+    try:
+        await listener.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
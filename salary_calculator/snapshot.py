@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import marshal
+import os
+
+from salary_calculator.default_rates import (DEFAULT_HOUR_AMOUNTS,
+                                             DEFAULT_SLOT_BOUNDS)
+from salary_calculator.integer_days import IntegerDay, divide_half_even
+
+# Imports neither the schedule classes, the rates module nor typing: the lean entry point loads
+# rate tables from snapshots before (and most of the time without) importing the rest of the
+# package. hashlib is only imported to look up snapshots of rate table files.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import Any, Iterable, List, Optional, Tuple
+
+SNAPSHOT_VERSION = 3
+SNAPSHOT_SUFFIX = ".ratesnap"
+DEFAULT_SNAPSHOT_PATH = os.path.join(os.path.dirname(__file__), "default_rates" + SNAPSHOT_SUFFIX)
+CACHE_DIRECTORY_VARIABLE = "SALARY_CALCULATOR_CACHE_DIR"
+LAST_MINUTE = 24 * 60 - 1
+# Source key of default rate table snapshots, compared as is instead of hashing the grid.
+DEFAULT_RATES_SOURCE = (DEFAULT_SLOT_BOUNDS, DEFAULT_HOUR_AMOUNTS)
+
+
+class RateSnapshot:
+    """
+    The integer pricing tables of a rate table with legacy rounding (see CentsRateTable),
+    written and read with marshal. Prices the very same cents as the Decimal engine without
+    importing it. Snapshots carry the content hash of their rate table and a source key, the
+    hash of the rate table file they were built from or DEFAULT_RATES_SOURCE, so stale ones are
+    told apart by their content without building the rate table again.
+    """
+
+    __slots__ = ("content_hash", "source_key", "decimals", "slot_units", "days")
+
+    def __init__(
+        self,
+        content_hash: str,
+        source_key: Any,
+        decimals: int,
+        slot_units: Tuple[int, ...],
+        days: List[IntegerDay],
+    ) -> None:
+        self.content_hash = content_hash
+        self.source_key = source_key
+        self.decimals = decimals
+        self.slot_units = slot_units
+        # Tables of every week day, Monday first, as calendar numbers them.
+        self.days = days
+
+    def price_minute_spans(self, minute_spans: Iterable[Tuple[int, int, int]]) -> int:
+        """Return the pay in cents of spans as parse_schedule_line gives them."""
+        days = self.days
+        units = 0
+        for weekday, start, end in minute_spans:
+            units += days[weekday].price(start, end or LAST_MINUTE)
+        return divide_half_even(units, 10 ** self.decimals)
+
+    def dump(self, path: str) -> None:
+        # Week days sharing the same slots (Monday to Friday usually) share their tables.
+        day_tables: List[Tuple[Tuple[int, ...], ...]] = []
+        weekday_tables = []
+        for day in self.days:
+            tables = tuple(tuple(table) for table in day.get_tables())
+            if tables not in day_tables:
+                day_tables.append(tables)
+            weekday_tables.append(day_tables.index(tables))
+        data = (
+            SNAPSHOT_VERSION,
+            self.content_hash,
+            self.source_key,
+            self.decimals,
+            tuple(self.slot_units),
+            tuple(day_tables),
+            tuple(weekday_tables),
+        )
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(marshal.dumps(data))
+        os.replace(temporary_path, path)
+
+    @classmethod
+    def load(
+        cls,
+        path: str,
+        content_hash: Optional[str] = None,
+        source_key: Any = None,
+    ) -> Optional[RateSnapshot]:
+        """
+        Return the snapshot stored at path, or None when missing, corrupt, written by another
+        version, or not matching the given content_hash or source_key.
+        """
+        try:
+            # marshal.load reads a file piecewise, ten times slower than reading it at once.
+            with open(path, "rb") as file:
+                version, *data = marshal.loads(file.read())
+            if version != SNAPSHOT_VERSION:
+                return None
+            (
+                stored_content_hash,
+                stored_source_key,
+                decimals,
+                slot_units,
+                day_tables,
+                weekday_tables,
+            ) = data
+            shared_days = [IntegerDay.from_tables(tables, slot_units) for tables in day_tables]
+            days = [shared_days[index] for index in weekday_tables]
+        except (OSError, EOFError, ValueError, TypeError, IndexError):
+            return None
+        if content_hash is not None and stored_content_hash != content_hash:
+            return None
+        if source_key is not None and stored_source_key != source_key:
+            return None
+        return cls(stored_content_hash, stored_source_key, decimals, slot_units, days)
+
+
+def get_cache_directory() -> str:
+    """
+    Return the directory snapshots of rate table files are written to:
+    $SALARY_CALCULATOR_CACHE_DIR, or salary_calculator in the user cache directory.
+    """
+    directory = os.environ.get(CACHE_DIRECTORY_VARIABLE)
+    if directory:
+        return directory
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(cache_home, "salary_calculator")
+
+
+def hash_rate_file(path: str) -> str:
+    import hashlib
+
+    # The extension picks the file format, so equal bytes read as another format differ.
+    digest = hashlib.sha256(os.path.splitext(path)[1].lower().encode() + b"\0")
+    with open(path, "rb") as file:
+        digest.update(file.read())
+    return digest.hexdigest()
+
+
+def build_snapshot(rate_table=None, source_key: Any = None) -> RateSnapshot:
+    """
+    Compile a RateTable (the default one if None) into a snapshot, importing the engine. The
+    source key of default rate table snapshots is DEFAULT_RATES_SOURCE.
+    """
+    from salary_calculator.cents import get_cents_rate_table
+
+    if rate_table is None and source_key is None:
+        source_key = DEFAULT_RATES_SOURCE
+
+    cents_rate_table = get_cents_rate_table(rate_table, "legacy")
+    days = [cents_rate_table.days[weekday] for weekday in range(7)]
+    return RateSnapshot(
+        cents_rate_table.rate_table.content_hash,
+        source_key,
+        cents_rate_table.decimals,
+        tuple(days[0].slot_units),
+        days,
+    )
+
+
+def get_rate_snapshot(rates_path: Optional[str] = None) -> RateSnapshot:
+    """
+    Return the snapshot of the default rate table, or of a rate table file. The snapshot
+    shipped with the package is only used while it was built from the current default grid;
+    an outdated one is built again once and cached as default.ratesnap under
+    get_cache_directory. Snapshots of rate table files are cached there too, named after the
+    hash of their content. Snapshots that can not be cached are built again on every run.
+    """
+    if rates_path is None:
+        snapshot = RateSnapshot.load(DEFAULT_SNAPSHOT_PATH, source_key=DEFAULT_RATES_SOURCE)
+        if snapshot is not None:
+            return snapshot
+        snapshot_path = os.path.join(get_cache_directory(), "default" + SNAPSHOT_SUFFIX)
+        source_key = DEFAULT_RATES_SOURCE
+    else:
+        source_key = hash_rate_file(rates_path)
+        snapshot_path = os.path.join(get_cache_directory(), source_key + SNAPSHOT_SUFFIX)
+    snapshot = RateSnapshot.load(snapshot_path, source_key=source_key)
+    if snapshot is None:
+        rate_table = None
+        if rates_path is not None:
+            from salary_calculator.rates import load_rate_table
+
+            rate_table = load_rate_table(rates_path)
+        snapshot = build_snapshot(rate_table, source_key)
+        save_snapshot(snapshot, snapshot_path)
+    return snapshot
+
+
+def save_snapshot(snapshot: RateSnapshot, path: str) -> None:
+    try:
+        snapshot.dump(path)
+    except OSError:
+        pass
+
+
+def write_default_snapshot(path: str = DEFAULT_SNAPSHOT_PATH) -> None:
+    """Regenerate the snapshot of the default rate table shipped with the package."""
+    build_snapshot().dump(path)
+
+
+if __name__ == "__main__":
+    write_default_snapshot()
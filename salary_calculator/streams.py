@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import io
+from time import perf_counter
+
+from salary_calculator.instrumentation import instrumentation
+
+# Reading and writing of batch runs, kept apart from the pricing pipeline so the lean entry point
+# shares them without importing the schedule classes. typing, csv and json import re and enum,
+# so the first is left to type checkers and the others to the formats using them.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from typing import IO, Any, Callable, Dict, Iterable, Iterator, Tuple
+
+    # Username and salary, a Decimal or the string of one on the lean path.
+    OutputRecord = Tuple[str, Any]
+
+OUTPUT_BUFFER_SIZE = 1 << 16
+
+
+def read_lines(stream: IO[str]) -> Iterator[str]:
+    for line in stream:
+        yield line.rstrip("\r\n")
+
+
+def format_text(records: Iterable[OutputRecord]) -> Iterator[str]:
+    for username, salary in records:
+        yield f"The amount to pay {username} is: {salary} USD\n"
+
+
+def format_csv(records: Iterable[OutputRecord]) -> Iterator[str]:
+    import csv
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for username, salary in records:
+        writer.writerow((username, salary))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def format_jsonl(records: Iterable[OutputRecord]) -> Iterator[str]:
+    import json
+
+    dumps = json.dumps
+    for username, salary in records:
+        yield '{"username": %s, "salary": "%s"}\n' % (dumps(username), salary)
+
+
+OUTPUT_HEADERS = {"csv": "username,salary\n"}
+
+OUTPUT_FORMATTERS: Dict[str, Callable[[Iterable[OutputRecord]], Iterator[str]]] = {
+    "text": format_text,
+    "csv": format_csv,
+    "jsonl": format_jsonl,
+}
+
+
+def write_records(
+    records: Iterable[OutputRecord], stream: IO[str], output_format: str = "text"
+) -> int:
+    """
+    Format salary records and write them through a buffered writer.
+    Records are consumed lazily, so memory stays flat regardless of the input size.
+    Return the number of records written.
+    """
+    formatter = OUTPUT_FORMATTERS[output_format]
+    written = 0
+    chunk = []
+    if output_format in OUTPUT_HEADERS:
+        write_chunk(stream, OUTPUT_HEADERS[output_format])
+    for formatted in formatter(records):
+        chunk.append(formatted)
+        if len(chunk) >= 1024:
+            write_chunk(stream, "".join(chunk))
+            written += len(chunk)
+            chunk.clear()
+    if chunk:
+        write_chunk(stream, "".join(chunk))
+        written += len(chunk)
+    if instrumentation.enabled:
+        instrumentation.count("write.records", written)
+    return written
+
+
+def write_chunk(stream: IO[str], data: str) -> None:
+    if not instrumentation.enabled:
+        stream.write(data)
+        return
+    started = perf_counter()
+    stream.write(data)
+    instrumentation.add_time("write", perf_counter() - started)
+    instrumentation.count("write.bytes", len(data.encode("utf-8")))
@@ -0,0 +1,106 @@
+import json
+import os
+import tempfile
+from decimal import Decimal
+from unittest import TestCase
+
+from salary_calculator.aggregates import (BandTotal, CostReport,
+                                          calculate_salaries_with_report,
+                                          calculate_salaries_with_report_parallel)
+from salary_calculator.cli import main
+from salary_calculator.pipeline import calculate_salaries
+from salary_calculator.rates import load_rate_table
+
+NIGHT_PREMIUM_RATES = "salary_calculator/test_data_files/night_premium_rates.toml"
+
+
+class CostReportTestCase(TestCase):
+    def setUp(self) -> None:
+        self.input_lines = [
+            "RENE=MO10:00-12:00,TU10:00-12:00,TH01:00-03:00,SA14:00-18:00,SU20:00-21:00",
+            "ASTRID=MO10:00-12:00,TH12:00-14:00,SU20:00-21:00",
+            "C1=MO08:35-09:45,MO12:50-18:30,SA03:32-09:50,SA17:59-20:00",
+            "SC1=MO00:00-09:00,MO23:00-00:00,SU18:40-00:00",
+            "RENE=SA22:00-00:00",
+        ]
+        return super().setUp()
+
+    def test_records_match_plain_pricing(self):
+        report = CostReport()
+        records = list(calculate_salaries_with_report(self.input_lines, report))
+        self.assertEqual(list(calculate_salaries(self.input_lines)), records)
+        self.assertEqual(sum(salary for _, salary in records), report.salaries)
+        self.assertEqual(len(self.input_lines), report.schedules)
+
+    def test_salaries_are_totaled_as_rounded(self):
+        # 251.425 each, rounded half to even into 251.42.
+        lines = ["A=MO00:00-09:10,MO18:00-18:07", "B=MO00:00-09:10,MO18:00-18:07"]
+        report = CostReport()
+        rate_table = load_rate_table(NIGHT_PREMIUM_RATES)
+        records = list(calculate_salaries_with_report(lines, report, rate_table=rate_table))
+        self.assertEqual([Decimal("251.42")] * 2, [salary for _, salary in records])
+        self.assertEqual(Decimal("502.84"), report.salaries)
+        self.assertEqual(Decimal("502.85"), report.total_amount)
+        summary = report.as_dict()
+        self.assertEqual(("502.85", "502.84"), (summary["amount"], summary["salaries"]))
+
+    def test_band_totals(self):
+        report = CostReport()
+        list(calculate_salaries_with_report(self.input_lines, report))
+        # SA14:00-18:00, plus the day parts of SA03:32-09:50 (09:01-09:50) and SA17:59-20:00.
+        self.assertEqual(
+            BandTotal(240 + 49 + 1, Decimal("96.80")), report.bands[(5, "09:01-18:00")]
+        )
+        # SA17:59-20:00 and SA22:00-00:00, whose end is normalized into 23:59.
+        self.assertEqual(
+            BandTotal(119 + 119, Decimal("99.00")), report.bands[(5, "18:01-00:00")]
+        )
+        rene = report.employees["RENE"]
+        self.assertEqual(BandTotal(119, Decimal("49.50")), rene[(5, "18:01-00:00")])
+        self.assertEqual(Decimal("264.50"), sum(total.amount for total in rene.values()))
+
+    def test_partial_reports_merge_into_the_full_one(self):
+        full_report = CostReport()
+        list(calculate_salaries_with_report(self.input_lines, full_report))
+        merged = CostReport()
+        for line in self.input_lines:
+            partial = CostReport()
+            list(calculate_salaries_with_report([line], partial))
+            merged.merge(partial)
+        self.assertEqual(full_report, merged)
+
+    def test_parallel_report(self):
+        report = CostReport(per_employee=False)
+        records = list(
+            calculate_salaries_with_report_parallel(
+                self.input_lines * 4, report, workers=2, chunk_size=3
+            )
+        )
+        self.assertEqual(list(calculate_salaries(self.input_lines * 4)), records)
+        serial_report = CostReport(per_employee=False)
+        list(calculate_salaries_with_report(self.input_lines * 4, serial_report))
+        self.assertEqual(serial_report, report)
+        self.assertEqual({}, report.employees)
+
+    def test_cli_report(self):
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, "input.txt")
+            report_path = os.path.join(directory, "report.json")
+            with open(input_path, "w") as file:
+                file.write("\n".join(self.input_lines))
+            exit_code = main(
+                [input_path, "-o", os.devnull, "--report", report_path, "--report-employees"]
+            )
+            with open(report_path) as file:
+                report = json.load(file)
+        self.assertEqual(0, exit_code)
+        self.assertEqual(5, report["schedules"])
+        self.assertEqual(
+            str(sum(salary for _, salary in calculate_salaries(self.input_lines))),
+            report["salaries"],
+        )
+        self.assertIn("ASTRID", report["employees"])
+        self.assertEqual(
+            {"weekday": "SU", "band": "18:01-00:00"},
+            {key: report["bands"][-1][key] for key in ("weekday", "band")},
+        )
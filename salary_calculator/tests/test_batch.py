@@ -0,0 +1,157 @@
+import json
+import os
+import tempfile
+from unittest import TestCase, mock
+
+from salary_calculator import batch
+from salary_calculator.batch import Checkpoint, CheckpointError, run_batch
+from salary_calculator.cli import main
+from salary_calculator.pipeline import calculate_salaries
+from salary_calculator.streams import format_text
+
+
+class BatchTestCase(TestCase):
+    def setUp(self) -> None:
+        self.valid_lines = [
+            "RENE=MO10:00-12:00,TU10:00-12:00,TH01:00-03:00,SA14:00-18:00,SU20:00-21:00",
+            "ASTRID=MO10:00-12:00,TH12:00-14:00,SU20:00-21:00",
+            "C1=MO08:35-09:45,MO12:50-18:30,SA03:32-09:50,SA17:59-20:00",
+            "SC1=MO00:00-09:00,MO23:00-00:00,SU18:40-00:00",
+        ]
+        self.input_lines = []
+        for repeat in range(5):
+            self.input_lines.extend(self.valid_lines)
+            self.input_lines.append(f"BROKEN{repeat}=XX10:00-12:00")
+            self.input_lines.append("")
+        self.input_lines.append("LATE=MO12:00-10:00")
+        self.directory = tempfile.TemporaryDirectory()
+        self.input_path = self.get_path("schedules.txt")
+        with open(self.input_path, "w", encoding="utf-8") as file:
+            file.write("\n".join(self.input_lines) + "\n")
+        self.output_path = self.get_path("salaries.txt")
+        self.reject_path = self.get_path("rejects.jsonl")
+        self.checkpoint_path = self.get_path("run.checkpoint")
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+        return super().tearDown()
+
+    def get_path(self, name: str) -> str:
+        return os.path.join(self.directory.name, name)
+
+    def read(self, path: str) -> str:
+        with open(path, encoding="utf-8") as file:
+            return file.read()
+
+    def get_expected_output(self) -> str:
+        return "".join(format_text(calculate_salaries(self.valid_lines * 5)))
+
+    def test_bad_lines_are_rejected(self):
+        result = run_batch(self.input_path, self.output_path, reject_path=self.reject_path)
+        self.assertEqual((20, 6), (result.records, result.rejected))
+        self.assertEqual(self.get_expected_output(), self.read(self.output_path))
+        rejects = [json.loads(line) for line in self.read(self.reject_path).splitlines()]
+        self.assertEqual([5, 11, 17, 23, 29, 31], [reject["line"] for reject in rejects])
+        self.assertEqual("BROKEN0=XX10:00-12:00", rejects[0]["text"])
+        self.assertIn("line 5", rejects[0]["reason"])
+        self.assertEqual("LATE=MO12:00-10:00", rejects[-1]["text"])
+
+    def test_resume_after_interruption(self):
+        price_line = batch.price_line
+
+        def interrupt_at_line_20(raw_line, line_number, rate_table):
+            if line_number == 20:
+                raise KeyboardInterrupt
+            return price_line(raw_line, line_number, rate_table)
+
+        with mock.patch.object(batch, "price_line", interrupt_at_line_20):
+            with self.assertRaises(KeyboardInterrupt):
+                run_batch(
+                    self.input_path,
+                    self.output_path,
+                    reject_path=self.reject_path,
+                    checkpoint_path=self.checkpoint_path,
+                    checkpoint_every=7,
+                )
+        checkpoint = Checkpoint.load(self.checkpoint_path)
+        self.assertEqual(14, checkpoint.line_number)
+        self.assertEqual(len(self.read(self.output_path)), checkpoint.output_offset)
+        # Anything written after the last checkpoint is dropped when resuming.
+        with open(self.output_path, "a", encoding="utf-8") as file:
+            file.write("The amount to pay HALF")
+        result = run_batch(
+            self.input_path,
+            self.output_path,
+            reject_path=self.reject_path,
+            checkpoint_path=self.checkpoint_path,
+            checkpoint_every=7,
+        )
+        self.assertEqual((20, 6, 14), (result.records, result.rejected, result.resumed_from_line))
+        self.assertEqual(self.get_expected_output(), self.read(self.output_path))
+        self.assertEqual(6, len(self.read(self.reject_path).splitlines()))
+        self.assertFalse(os.path.exists(self.checkpoint_path))
+
+    def test_resume_without_reject_file(self):
+        price_line = batch.price_line
+
+        def interrupt_at_line_20(raw_line, line_number, rate_table):
+            if line_number == 20:
+                raise KeyboardInterrupt
+            return price_line(raw_line, line_number, rate_table)
+
+        with mock.patch.object(batch, "price_line", interrupt_at_line_20):
+            with self.assertRaises(KeyboardInterrupt):
+                run_batch(
+                    self.input_path,
+                    self.output_path,
+                    checkpoint_path=self.checkpoint_path,
+                    checkpoint_every=7,
+                )
+        # Salaries written before the checkpoint can not be written again.
+        os.rename(self.output_path, self.get_path("moved.txt"))
+        with self.assertRaises(CheckpointError):
+            run_batch(self.input_path, self.output_path, checkpoint_path=self.checkpoint_path)
+        os.rename(self.get_path("moved.txt"), self.output_path)
+        result = run_batch(
+            self.input_path,
+            self.output_path,
+            reject_path=self.reject_path,
+            checkpoint_path=self.checkpoint_path,
+            checkpoint_every=7,
+        )
+        self.assertEqual((20, 6, 14), (result.records, result.rejected, result.resumed_from_line))
+        self.assertEqual(self.get_expected_output(), self.read(self.output_path))
+        # Lines rejected before the checkpoint were only counted.
+        rejects = [json.loads(line) for line in self.read(self.reject_path).splitlines()]
+        self.assertEqual([17, 23, 29, 31], [reject["line"] for reject in rejects])
+
+    def test_stale_checkpoint_is_refused(self):
+        Checkpoint("other.txt", 1, 1, "text", "hash", input_offset=10).save(self.checkpoint_path)
+        with self.assertRaises(CheckpointError):
+            run_batch(self.input_path, self.output_path, checkpoint_path=self.checkpoint_path)
+        with open(self.checkpoint_path, "w", encoding="utf-8") as file:
+            file.write("{")
+        with self.assertRaises(CheckpointError):
+            run_batch(self.input_path, self.output_path, checkpoint_path=self.checkpoint_path)
+
+    def test_cli(self):
+        with mock.patch("sys.stderr"):
+            exit_code = main(
+                [
+                    self.input_path,
+                    "-o",
+                    self.output_path,
+                    "--reject",
+                    self.reject_path,
+                    "--checkpoint",
+                    self.checkpoint_path,
+                    "--checkpoint-every",
+                    "3",
+                ]
+            )
+        self.assertEqual(0, exit_code)
+        self.assertEqual(self.get_expected_output(), self.read(self.output_path))
+        self.assertEqual(6, len(self.read(self.reject_path).splitlines()))
+        with self.assertRaises(SystemExit), mock.patch("sys.stderr"):
+            main([self.input_path, "--reject", self.reject_path])
@@ -0,0 +1,151 @@
+from decimal import Decimal
+from unittest import TestCase
+
+from salary_calculator.benchmarks.generator import DatasetSpec, generate_lines
+from salary_calculator.benchmarks.parity import (ENGINES, ScheduleFuzzer,
+                                                 price_compiled, run_parity,
+                                                 shrink_line)
+from salary_calculator.benchmarks.runner import (create_report,
+                                                 find_regressions,
+                                                 run_benchmarks)
+from salary_calculator.benchmarks.startup import (find_forbidden_imports,
+                                                  measure_startup,
+                                                  parse_importtime)
+from salary_calculator.rates import RateTable
+from salary_calculator.serializers import FastEmployeeScheduleSerializer
+
+
+class GeneratorTestCase(TestCase):
+    def test_same_seed_same_dataset(self):
+        spec = DatasetSpec(employees=50, seed=7)
+        self.assertEqual(list(generate_lines(spec)), list(generate_lines(spec)))
+        self.assertNotEqual(
+            list(generate_lines(spec)), list(generate_lines(DatasetSpec(employees=50, seed=8)))
+        )
+
+    def test_valid_lines_parse(self):
+        spec = DatasetSpec(employees=300, spans_per_employee=4, overlap_rate=0.5, midnight_rate=0.5)
+        lines = list(generate_lines(spec))
+        self.assertEqual(300, len(lines))
+        schedules = [FastEmployeeScheduleSerializer(line).serialize() for line in lines]
+        self.assertTrue(all(len(schedule.working_days_spans) == 4 for schedule in schedules))
+        self.assertTrue(any("-00:00" in line for line in lines))
+
+    def test_bad_lines(self):
+        lines = list(generate_lines(DatasetSpec(employees=200, bad_line_rate=0.5)))
+        failures = 0
+        for line in lines:
+            try:
+                FastEmployeeScheduleSerializer(line).serialize()
+            except ValueError:
+                failures += 1
+        self.assertTrue(50 < failures < 150)
+
+
+class RunnerTestCase(TestCase):
+    def test_report_and_regressions(self):
+        spec = DatasetSpec(employees=30)
+        report = create_report(spec, run_benchmarks(spec, repeat=1))
+        self.assertEqual(30, report["dataset"]["employees"])
+        for name in ("parse.strptime", "parse.fast", "price.compiled", "format.str", "end_to_end.csv"):
+            self.assertEqual(30, report["results"][name]["items"])
+        self.assertEqual([], find_regressions(report, report))
+        faster = {
+            "results": {
+                name: {"items_per_second": result["items_per_second"] * 2}
+                for name, result in report["results"].items()
+            }
+        }
+        self.assertEqual(len(report["results"]), len(find_regressions(report, faster)))
+        self.assertNotIn("end_to_end.rejects", report["results"])
+
+    def test_bad_lines_are_rejected(self):
+        spec = DatasetSpec(employees=60, bad_line_rate=0.3, seed=3)
+        results = run_benchmarks(spec, repeat=1)
+        valid_lines = results["parse.fast"]["items"]
+        self.assertLess(valid_lines, 60)
+        self.assertEqual(valid_lines, results["end_to_end.csv"]["items"])
+        self.assertEqual(60, results["end_to_end.rejects"]["items"])
+
+
+def price_midnight_wrongly(lines, rate_table):
+    # A broken engine paying one cent too much for schedules with a span ending at 00:00.
+    return [
+        salary + (Decimal("0.01") if "-00:00" in line else 0)
+        for line, salary in zip(lines, price_compiled(lines, rate_table))
+    ]
+
+
+class ParityTestCase(TestCase):
+    def test_engines_match_reference(self):
+        report = run_parity(ENGINES, 400, seed=11, chunk_size=150)
+        self.assertEqual(400, report.schedules)
+        self.assertTrue(report.passed, report.format())
+        self.assertIn("compiled", report.format())
+
+    def test_fuzzer_covers_edge_cases(self):
+        lines = ScheduleFuzzer(seed=1).create_lines(0, 300)
+        self.assertEqual(lines, ScheduleFuzzer(seed=1).create_lines(0, 300))
+        text = "\n".join(lines)
+        for bound in ("-00:00", "09:00", "09:01", "18:00", "18:01", "00:00-"):
+            self.assertIn(bound, text)
+
+    def test_fuzzer_edges_follow_their_week_day(self):
+        rate_table = RateTable.from_dict(
+            {
+                "weekdays": {
+                    "MO,TU,WE,TH,FR,SA": [{"start": "00:01", "end": "00:00", "hour_amount": "20"}],
+                    "SU": [
+                        {"start": "00:01", "end": "13:37", "hour_amount": "20"},
+                        {"start": "13:38", "end": "00:00", "hour_amount": "30"},
+                    ],
+                }
+            }
+        )
+        edge_tokens = {"SU": 0, "other": 0}
+        for line in ScheduleFuzzer(rate_table, seed=3).create_lines(0, 300):
+            for token in line.split("=")[1].split(","):
+                if any(edge in token for edge in ("13:36", "13:37", "13:38", "13:39")):
+                    edge_tokens["SU" if token.startswith("SU") else "other"] += 1
+        # Other days only get those minutes by chance.
+        self.assertGreater(edge_tokens["SU"], 10 * edge_tokens["other"])
+
+    def test_mismatches_are_shrunk(self):
+        report = run_parity({"broken": price_midnight_wrongly}, 200, seed=2, max_examples=2)
+        self.assertFalse(report.passed)
+        result = report.engines["broken"]
+        self.assertGreater(result.mismatches, 2)
+        self.assertEqual(2, len(result.examples))
+        for mismatch in result.examples:
+            self.assertEqual(mismatch.expected + Decimal("0.01"), mismatch.actual)
+            self.assertEqual("X=MO00:00-00:00", mismatch.shrunk_line)
+        self.assertEqual(
+            "X=MO10:00-12:00", shrink_line("X=MO10:00-12:00", price_midnight_wrongly)
+        )
+
+    def test_exceptions_are_mismatches(self):
+        def fail_on_sunday(lines, rate_table):
+            if any("SU" in line for line in lines):
+                raise ValueError("no sundays")
+            return price_compiled(lines, rate_table)
+
+        report = run_parity({"sundays": fail_on_sunday}, 50, seed=4, max_examples=1)
+        (mismatch,) = report.engines["sundays"].examples
+        self.assertEqual("ValueError: no sundays", mismatch.actual)
+        self.assertEqual("X=SU00:00-00:00", mismatch.shrunk_line)
+
+
+class StartupTestCase(TestCase):
+    def test_parse_importtime(self):
+        stderr = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   _io\n"
+            "import time:      1530 |       1650 | salary_calculator.lean\n"
+            "unrelated warning\n"
+        )
+        self.assertEqual({"_io": 120, "salary_calculator.lean": 1530}, parse_importtime(stderr))
+
+    def test_lean_entry_point_skips_heavy_imports(self):
+        result = measure_startup([], repeat=1)
+        self.assertIn("salary_calculator.lean", result.imports)
+        self.assertEqual([], find_forbidden_imports(result))
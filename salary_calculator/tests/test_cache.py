@@ -0,0 +1,86 @@
+import threading
+from datetime import time
+from decimal import Decimal
+from unittest import TestCase
+
+from salary_calculator.cache import LRUCache, ShiftPayCache
+from salary_calculator.classes import EmployeeSchedule, WorkingDaySpan
+from salary_calculator.rates import RateSlot, RateTable
+from salary_calculator.serializers import FastEmployeeScheduleSerializer
+
+
+class LRUCacheTestCase(TestCase):
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        self.assertEqual(1, cache.get("a"))
+        cache.put("c", 3)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((1, 1, 1), (cache.stats.hits, cache.stats.misses, cache.stats.evictions))
+        self.assertEqual(0.5, cache.stats.hit_ratio)
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            LRUCache(0)
+
+    def test_concurrent_access_keeps_bounds_and_counters(self):
+        cache = LRUCache(50)
+
+        def work(offset: int) -> None:
+            for index in range(2000):
+                key = (offset + index) % 120
+                cache.get_or_create(key, lambda: key * 2)
+
+        threads = [threading.Thread(target=work, args=(offset,)) for offset in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertLessEqual(len(cache), 50)
+        self.assertEqual(8 * 2000, cache.stats.hits + cache.stats.misses)
+
+
+class ShiftPayCacheTestCase(TestCase):
+    def setUp(self) -> None:
+        self.input_lines = [
+            "RENE=MO10:00-12:00,TU10:00-12:00,TH01:00-03:00,SA14:00-18:00,SU20:00-21:00",
+            "ASTRID=MO10:00-12:00,TH12:00-14:00,SU20:00-21:00",
+            "C2=MO10:12-20:30,TU07:36-10:55,FR12:30-19:45,SU09:11-20:35",
+        ] * 3
+        return super().setUp()
+
+    def create_schedules(self):
+        return [FastEmployeeScheduleSerializer(line).serialize() for line in self.input_lines]
+
+    def test_memoized_salaries_match(self):
+        pay_cache = ShiftPayCache(64)
+        for schedule in self.create_schedules():
+            self.assertEqual(schedule.calculate_salary(), schedule.calculate_salary(pay_cache=pay_cache))
+        # ASTRID works the MO and SU shifts of RENE.
+        distinct_shifts = 5 + 1 + 4
+        self.assertEqual(distinct_shifts, pay_cache.stats.misses)
+        self.assertEqual(3 * (5 + 3 + 4) - distinct_shifts, pay_cache.stats.hits)
+        self.assertEqual(distinct_shifts, len(pay_cache))
+
+    def test_spans_with_seconds_are_not_memoized(self):
+        pay_cache = ShiftPayCache(64)
+        schedule = EmployeeSchedule(
+            working_days_spans=[
+                WorkingDaySpan(weekday=1, start=time(8, 59, 30), end=time(18, 30))
+            ]
+        )
+        self.assertEqual(schedule.calculate_salary(), schedule.calculate_salary(pay_cache=pay_cache))
+        self.assertEqual(0, len(pay_cache))
+
+    def test_rate_tables_do_not_share_entries(self):
+        pay_cache = ShiftPayCache(64)
+        flat_table = RateTable(
+            {weekday: [RateSlot(0, 0, Decimal(1), "all")] for weekday in range(7)}
+        )
+        schedule = self.create_schedules()[0]
+        self.assertEqual(Decimal("215.00"), schedule.calculate_salary(pay_cache=pay_cache))
+        self.assertEqual(Decimal("11.00"), schedule.calculate_salary(flat_table, pay_cache))
+        self.assertEqual(0, pay_cache.stats.hits)
@@ -0,0 +1,118 @@
+import random
+from datetime import time
+from decimal import ROUND_HALF_EVEN, Decimal
+from fractions import Fraction
+from unittest import TestCase
+
+from salary_calculator.cents import (CentsRateTable, calculate_salaries_cents,
+                                     get_cents_rate_table, get_chunk_pricer)
+from salary_calculator.classes import EmployeeSchedule, WorkingDaySpan
+from salary_calculator.integer_days import divide_half_even
+from salary_calculator.parallel import calculate_salaries_parallel
+from salary_calculator.pipeline import calculate_salaries
+from salary_calculator.rates import load_rate_table
+from salary_calculator.serializers import (EmployeeScheduleSerializer,
+                                           FastEmployeeScheduleSerializer)
+from salary_calculator.tests import test_schedules
+
+WEEKDAY_ABBREVS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+
+def get_schedule_cases():
+    schedule_test_case = test_schedules.ScheduleTestCase()
+    schedule_test_case.setUp()
+    return schedule_test_case.input_ouput_dataset.values()
+
+
+class CentsTestCase(TestCase):
+    def setUp(self) -> None:
+        self.night_premium = load_rate_table(
+            "salary_calculator/test_data_files/night_premium_rates.toml"
+        )
+        return super().setUp()
+
+    def create_random_line(self, rnd: random.Random) -> str:
+        spans = []
+        for _ in range(rnd.randrange(1, 6)):
+            start = rnd.randrange(1440)
+            end = rnd.choice([0, rnd.randrange(start, 1440)])
+            spans.append(
+                "%s%02d:%02d-%02d:%02d"
+                % ((rnd.choice(WEEKDAY_ABBREVS),) + divmod(start, 60) + divmod(end, 60))
+            )
+        return "X=" + ",".join(spans)
+
+    def test_legacy_parity_on_schedule_cases(self):
+        cents_rate_table = get_cents_rate_table()
+        for case in get_schedule_cases():
+            schedule = EmployeeScheduleSerializer(case["input_line"]).serialize()
+            self.assertEqual(case["output_value"], cents_rate_table.calculate_salary(schedule))
+
+    def test_legacy_parity_on_random_schedules(self):
+        rnd = random.Random(19)
+        for rate_table in (None, self.night_premium):
+            cents_rate_table = get_cents_rate_table(rate_table)
+            for _ in range(500):
+                schedule = FastEmployeeScheduleSerializer(self.create_random_line(rnd)).serialize()
+                self.assertEqual(
+                    schedule.calculate_salary(rate_table),
+                    cents_rate_table.calculate_salary(schedule),
+                )
+
+    def test_exact_rounding(self):
+        rnd = random.Random(23)
+        cents_rate_table = get_cents_rate_table(self.night_premium, "exact")
+        for _ in range(300):
+            schedule = FastEmployeeScheduleSerializer(self.create_random_line(rnd)).serialize()
+            expected = Fraction(0)
+            for employee_slot in schedule.working_days_spans:
+                slots = self.night_premium.get_slots(employee_slot.weekday)
+                hour_amounts = {slot.band: slot.hour_amount for slot in slots}
+                for band, minutes, _ in schedule.price_span_by_band(
+                    employee_slot, self.night_premium
+                ):
+                    expected += Fraction(hour_amounts[band]) * minutes / 60
+            expected_cents = Decimal(expected.numerator * 100) / expected.denominator
+            expected_salary = expected_cents.quantize(0, rounding=ROUND_HALF_EVEN).scaleb(-2)
+            self.assertEqual(expected_salary, cents_rate_table.calculate_salary(schedule))
+
+    def test_exact_differs_from_legacy(self):
+        schedule = FastEmployeeScheduleSerializer("A=MO10:00-10:07").serialize()
+        self.assertEqual(Decimal("1.80"), get_cents_rate_table().calculate_salary(schedule))
+        self.assertEqual(
+            Decimal("1.75"), get_cents_rate_table(None, "exact").calculate_salary(schedule)
+        )
+
+    def test_spans_starting_at_seconds(self):
+        schedule = EmployeeSchedule(
+            working_days_spans=[
+                WorkingDaySpan(weekday=3, start=time(8, 59, 30), end=time(18, 0, 40))
+            ]
+        )
+        self.assertEqual(
+            schedule.calculate_salary(), get_cents_rate_table().calculate_salary(schedule)
+        )
+
+    def test_divide_half_even(self):
+        self.assertEqual(
+            [0, 2, 2, 2, 4, -2],
+            [divide_half_even(numerator, 2) for numerator in (1, 3, 4, 5, 7, -3)],
+        )
+        self.assertEqual(3, divide_half_even(10, 3))
+
+    def test_calculate_salaries_cents(self):
+        lines = [case["input_line"] for case in get_schedule_cases()]
+        expected = list(calculate_salaries(lines))
+        self.assertEqual(expected, list(calculate_salaries_cents(lines)))
+        self.assertEqual(
+            expected,
+            list(
+                calculate_salaries_parallel(
+                    lines, workers=2, chunk_size=3, chunk_pricer=get_chunk_pricer("legacy")
+                )
+            ),
+        )
+
+    def test_invalid_rounding(self):
+        with self.assertRaises(ValueError):
+            CentsRateTable(self.night_premium, "bankers")
@@ -0,0 +1,54 @@
+from unittest import TestCase
+
+from salary_calculator.dedup import (DedupStats, ScheduleInterner,
+                                     calculate_salaries_deduplicated)
+from salary_calculator.exceptions import ScheduleParseError
+from salary_calculator.pipeline import calculate_salaries
+
+
+class DedupTestCase(TestCase):
+    def setUp(self) -> None:
+        rotas = [
+            "MO10:00-12:00,TU10:00-12:00,TH01:00-03:00,SA14:00-18:00,SU20:00-21:00",
+            "MO10:00-12:00,TH12:00-14:00,SU20:00-21:00",
+            "SC1=MO00:00-09:00,MO23:00-00:00,SU18:40-00:00".split("=")[1],
+        ]
+        self.input_lines = [
+            f"EMPLOYEE{index}={rotas[index % len(rotas)]}" for index in range(30)
+        ]
+        return super().setUp()
+
+    def test_salaries_match_and_ratio_is_reported(self):
+        stats = DedupStats()
+        records = list(calculate_salaries_deduplicated(self.input_lines, stats=stats))
+        self.assertEqual(list(calculate_salaries(self.input_lines)), records)
+        self.assertEqual(30, stats.lines)
+        self.assertEqual(3, stats.distinct_patterns)
+        self.assertEqual(10.0, stats.dedup_ratio)
+
+    def test_schedules_share_spans(self):
+        interner = ScheduleInterner()
+        first = interner.serialize(self.input_lines[0])
+        second = interner.serialize(self.input_lines[3])
+        self.assertEqual("EMPLOYEE3", second.username)
+        self.assertIs(first.working_days_spans, second.working_days_spans)
+        self.assertIsInstance(first.working_days_spans, tuple)
+        self.assertEqual(first.calculate_salary(), second.calculate_salary())
+
+    def test_errors_keep_their_line_numbers(self):
+        lines = ["A=MO10:00-12:00", "", "B=MO10:00-12:00,XX01:00-02:00"]
+        with self.assertRaises(ScheduleParseError) as context:
+            list(calculate_salaries_deduplicated(lines))
+        self.assertEqual((3, 17), (context.exception.line, context.exception.column))
+
+    def test_bounded_interner_forgets_least_recent_rotas(self):
+        interner = ScheduleInterner(maxsize=2)
+        records = [interner.calculate_salary(line) for line in self.input_lines]
+        self.assertEqual(list(calculate_salaries(self.input_lines)), records)
+        # Three rotas taking turns in a two entry cache always miss.
+        self.assertEqual(30, interner.stats.distinct_patterns)
+        interner = ScheduleInterner(maxsize=3)
+        for line in self.input_lines:
+            interner.calculate_salary(line)
+            interner.serialize(line)
+        self.assertEqual(6, interner.stats.distinct_patterns)
@@ -0,0 +1,126 @@
+import io
+import os
+import tempfile
+from unittest import TestCase, mock
+
+from salary_calculator import grouping
+from salary_calculator.cli import main
+from salary_calculator.exceptions import (OverlappingSpansError,
+                                          ScheduleParseError)
+from salary_calculator.grouping import (GroupingStats,
+                                        calculate_grouped_salaries,
+                                        group_schedules)
+from salary_calculator.pipeline import calculate_salaries
+
+
+class GroupingTestCase(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.site_paths = [
+            self.write_file(
+                "site_a.txt",
+                [
+                    "RENE=MO10:00-12:00,TU10:00-12:00",
+                    "ASTRID=MO10:00-12:00",
+                    "",
+                    "C1=MO08:35-09:45,MO12:50-18:30",
+                ],
+            ),
+            self.write_file(
+                "site_b.txt",
+                [
+                    "ASTRID=TH12:00-14:00,SU20:00-21:00",
+                    "RENE=TH01:00-03:00,SA14:00-18:00",
+                    "SC1=MO00:00-09:00,MO23:00-00:00,SU18:40-00:00",
+                ],
+            ),
+            self.write_file(
+                "site_c.txt",
+                ["C1=SA03:32-09:50,SA17:59-20:00", "RENE=SU20:00-21:00"],
+            ),
+        ]
+        self.combined_lines = [
+            "ASTRID=MO10:00-12:00,TH12:00-14:00,SU20:00-21:00",
+            "C1=MO08:35-09:45,MO12:50-18:30,SA03:32-09:50,SA17:59-20:00",
+            "RENE=MO10:00-12:00,TU10:00-12:00,TH01:00-03:00,SA14:00-18:00,SU20:00-21:00",
+            "SC1=MO00:00-09:00,MO23:00-00:00,SU18:40-00:00",
+        ]
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+        return super().tearDown()
+
+    def write_file(self, name: str, lines) -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+        return path
+
+    def test_lines_of_an_employee_are_priced_once(self):
+        stats = GroupingStats()
+        records = list(calculate_grouped_salaries(self.site_paths, stats=stats))
+        self.assertEqual(list(calculate_salaries(self.combined_lines)), records)
+        self.assertEqual((8, 4, 0), (stats.lines, stats.employees, stats.spilled_runs))
+
+    def test_spilled_runs_keep_input_order_of_parts(self):
+        stats = GroupingStats()
+        schedules = list(group_schedules(self.site_paths, memory_budget=1, stats=stats))
+        self.assertEqual(8, stats.spilled_runs)
+        expected = [
+            schedule.working_days_spans
+            for schedule in (
+                grouping.FastEmployeeScheduleSerializer(line).serialize()
+                for line in self.combined_lines
+            )
+        ]
+        self.assertEqual(expected, [schedule.working_days_spans for schedule in schedules])
+
+    def test_multiple_merge_passes(self):
+        lines = [
+            f"EMPLOYEE{index % 7}=MO{index % 10:02d}:00-{index % 10:02d}:30"
+            for index in range(40)
+        ]
+        path = self.write_file("many.txt", lines)
+        stats = GroupingStats()
+        with mock.patch.object(grouping, "MAX_MERGE_FAN_IN", 3):
+            records = list(calculate_grouped_salaries([path], memory_budget=1, stats=stats))
+        self.assertEqual(3, stats.merge_passes)
+        self.assertEqual([f"EMPLOYEE{index}" for index in range(7)], [name for name, _ in records])
+        expected = {}
+        for username, salary in calculate_salaries(lines):
+            expected[username] = expected.get(username, 0) + salary
+        self.assertEqual(expected, dict(records))
+
+    def test_errors_and_overlaps(self):
+        bad_path = self.write_file("bad.txt", ["RENE=MO10:00-12:00", "ASTRID=XX10:00-12:00"])
+        with self.assertRaises(ScheduleParseError) as context:
+            list(group_schedules([self.site_paths[0], bad_path]))
+        self.assertIn("bad.txt", str(context.exception))
+        self.assertEqual(2, context.exception.line)
+        overlap_path = self.write_file("overlap.txt", ["RENE=MO11:00-13:00"])
+        with self.assertRaises(OverlappingSpansError):
+            list(group_schedules([self.site_paths[0], overlap_path], overlaps="reject"))
+        (rene,) = [
+            schedule
+            for schedule in group_schedules([self.site_paths[0], overlap_path], overlaps="merge")
+            if schedule.username == "RENE"
+        ]
+        self.assertEqual(2, len(rene.working_days_spans))
+
+    def test_cli(self):
+        output = io.StringIO()
+        with mock.patch("sys.stdout", output), mock.patch("sys.stderr"):
+            exit_code = main(
+                self.site_paths
+                + ["--group-by-username", "--memory-budget", "1", "--temp-dir", self.directory.name]
+            )
+        self.assertEqual(0, exit_code)
+        self.assertEqual(4, len(output.getvalue().splitlines()))
+        # Sorted runs are removed along with their temporary directory.
+        self.assertEqual(
+            sorted(os.path.basename(path) for path in self.site_paths),
+            sorted(os.listdir(self.directory.name)),
+        )
+        with self.assertRaises(SystemExit), mock.patch("sys.stderr"):
+            main(self.site_paths)
@@ -0,0 +1,137 @@
+import io
+import json
+import os
+import tempfile
+from unittest import TestCase, mock
+
+from salary_calculator.cli import main
+from salary_calculator.exceptions import ScheduleParseError
+from salary_calculator.incremental import (ResultStore, RunChanges,
+                                           calculate_salaries_incremental)
+from salary_calculator.pipeline import calculate_salaries
+from salary_calculator.rates import load_rate_table
+
+
+class IncrementalTestCase(TestCase):
+    def setUp(self) -> None:
+        self.lines = [
+            "RENE=MO10:00-12:00,TU10:00-12:00,TH01:00-03:00,SA14:00-18:00,SU20:00-21:00",
+            "ASTRID=MO10:00-12:00,TH12:00-14:00,SU20:00-21:00",
+            "",
+            "C1=MO08:35-09:45,MO12:50-18:30,SA03:32-09:50,SA17:59-20:00",
+            "SC1=MO00:00-09:00,MO23:00-00:00,SU18:40-00:00",
+        ]
+        self.directory = tempfile.TemporaryDirectory()
+        self.store_path = os.path.join(self.directory.name, "results.sqlite")
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+        return super().tearDown()
+
+    def run_incremental(self, lines, rate_table=None, keep_runs=3):
+        changes = RunChanges()
+        with ResultStore(self.store_path, keep_runs) as store:
+            records = list(
+                calculate_salaries_incremental(lines, store, rate_table=rate_table, changes=changes)
+            )
+            stored_results = len(store)
+        self.assertEqual(list(calculate_salaries(lines, rate_table=rate_table)), records)
+        return changes, stored_results
+
+    def test_unchanged_lines_are_reused(self):
+        changes, _ = self.run_incremental(self.lines)
+        self.assertEqual((4, 0, 4), (changes.lines, changes.reused, changes.priced))
+        self.assertEqual(["ASTRID", "C1", "RENE", "SC1"], changes.added)
+        changes, _ = self.run_incremental(self.lines)
+        self.assertEqual((4, 0), (changes.reused, changes.priced))
+        self.assertEqual(([], [], []), (changes.added, changes.changed, changes.removed))
+
+    def test_added_changed_and_removed_employees(self):
+        self.run_incremental(self.lines)
+        new_lines = [
+            self.lines[0],
+            "ASTRID=MO10:00-12:00,TH12:00-15:00,SU20:00-21:00",
+            self.lines[3],
+            "NEW=SA10:00-12:00",
+        ]
+        changes, _ = self.run_incremental(new_lines)
+        self.assertEqual((2, 2), (changes.reused, changes.priced))
+        self.assertEqual(["NEW"], changes.added)
+        self.assertEqual(["ASTRID"], changes.changed)
+        self.assertEqual(["SC1"], changes.removed)
+
+    def test_rate_table_is_part_of_the_key(self):
+        self.run_incremental(self.lines)
+        rate_table = load_rate_table(
+            os.path.join(
+                os.path.dirname(__file__), os.pardir, "test_data_files", "night_premium_rates.toml"
+            )
+        )
+        changes, stored_results = self.run_incremental(self.lines, rate_table)
+        self.assertEqual((0, 4), (changes.reused, changes.priced))
+        self.assertEqual([], changes.changed)
+        self.assertEqual(8, stored_results)
+
+    def test_unused_results_are_compacted(self):
+        self.run_incremental(self.lines)
+        changes, stored_results = self.run_incremental(self.lines[:2])
+        # Results unused by the run are kept while they do not outnumber the used ones.
+        self.assertEqual((0, 4), (changes.compacted, stored_results))
+        changes, stored_results = self.run_incremental(self.lines[:1])
+        self.assertEqual((3, 1), (changes.compacted, stored_results))
+
+    def test_unused_rate_tables_are_compacted(self):
+        rate_table = load_rate_table(
+            os.path.join(
+                os.path.dirname(__file__), os.pardir, "test_data_files", "night_premium_rates.toml"
+            )
+        )
+        self.run_incremental(self.lines, rate_table, keep_runs=2)
+        self.run_incremental(self.lines, keep_runs=2)
+        changes, stored_results = self.run_incremental(self.lines, keep_runs=2)
+        self.assertEqual((4, 4), (changes.compacted, stored_results))
+
+    def test_bad_lines_are_not_stored(self):
+        with ResultStore(self.store_path) as store:
+            with self.assertRaises(ScheduleParseError) as context:
+                list(calculate_salaries_incremental(self.lines + ["BAD=XX10:00"], store))
+            self.assertEqual(6, context.exception.line)
+            self.assertEqual(0, len(store))
+            for table in ("runs", "rate_tables"):
+                count = store.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                self.assertEqual(0, count, table)
+        # An aborted run does not replace the employees of the last complete run.
+        changes, _ = self.run_incremental(self.lines)
+        self.assertEqual(4, len(changes.added))
+
+    def test_results_are_looked_up_in_batches(self):
+        self.run_incremental(self.lines)
+        lines = self.lines + ["NEW=SA10:00-12:00"] * 3 + self.lines
+        with mock.patch("salary_calculator.incremental.LOOKUP_BATCH_SIZE", 3), mock.patch.object(
+            ResultStore, "load_results", autospec=True, side_effect=ResultStore.load_results
+        ) as load_results:
+            changes, _ = self.run_incremental(lines)
+        self.assertEqual((11, 10, 1), (changes.lines, changes.reused, changes.priced))
+        self.assertEqual(
+            [3, 3, 3, 2], [len(call.args[2]) for call in load_results.call_args_list]
+        )
+
+    def test_cli(self):
+        input_path = os.path.join(self.directory.name, "schedules.txt")
+        changes_path = os.path.join(self.directory.name, "changes.json")
+        with open(input_path, "w", encoding="utf-8") as file:
+            file.write("\n".join(self.lines))
+        for _ in range(2):
+            output, errors = io.StringIO(), io.StringIO()
+            with mock.patch("sys.stdout", output), mock.patch("sys.stderr", errors):
+                exit_code = main(
+                    [input_path, "--incremental", self.store_path, "--changes", changes_path]
+                )
+            self.assertEqual(0, exit_code)
+            self.assertEqual(4, len(output.getvalue().splitlines()))
+        self.assertIn("reused=4 priced=0", errors.getvalue())
+        with open(changes_path, encoding="utf-8") as file:
+            self.assertEqual({"added": [], "changed": [], "removed": []}, json.load(file))
+        with self.assertRaises(SystemExit), mock.patch("sys.stderr"):
+            main([input_path, "--changes", changes_path])
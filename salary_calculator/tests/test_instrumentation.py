@@ -0,0 +1,70 @@
+import contextlib
+import io
+import os
+import pstats
+import tempfile
+from unittest import TestCase
+
+from salary_calculator.cli import main
+from salary_calculator.instrumentation import instrumentation
+from salary_calculator.pipeline import calculate_salaries
+from salary_calculator.serializers import EmployeeScheduleSerializer
+from salary_calculator.streams import write_records
+
+
+class InstrumentationTestCase(TestCase):
+    def setUp(self) -> None:
+        self.input_lines = [
+            "RENE=MO10:00-12:00,TU10:00-12:00,TH01:00-03:00,SA14:00-18:00,SU20:00-21:00",
+            "C1=MO08:35-09:45,MO12:50-18:30,SA03:32-09:50,SA17:59-20:00",
+        ]
+        instrumentation.reset()
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        instrumentation.disable()
+        instrumentation.reset()
+        return super().tearDown()
+
+    def test_disabled_recorder_records_nothing(self):
+        list(calculate_salaries(self.input_lines))
+        self.assertEqual({"counters": {}, "timings": {}}, instrumentation.as_dict())
+
+    def test_pipeline_counters_and_timings(self):
+        instrumentation.enable()
+        output = io.StringIO()
+        write_records(calculate_salaries(self.input_lines), output, "csv")
+        counters = instrumentation.counters
+        self.assertEqual(2, counters["parse.lines"])
+        self.assertEqual(9, counters["parse.spans"])
+        self.assertEqual(9, counters["minute_span.built"])
+        self.assertEqual(9, counters["price.compiled_spans"])
+        self.assertEqual(2, counters["write.records"])
+        self.assertEqual(len(output.getvalue()), counters["write.bytes"])
+        self.assertEqual({"parse", "price", "write"}, set(instrumentation.timings))
+
+    def test_intersections_are_counted_by_case(self):
+        schedule = EmployeeScheduleSerializer(self.input_lines[1]).serialize()
+        instrumentation.enable()
+        schedule.calculate_salary_by_intersections()
+        counters = instrumentation.counters
+        self.assertEqual(12, sum(value for name, value in counters.items() if name.startswith("intersections.")))
+        self.assertEqual(4, counters["intersections.NO_INTERSECTION"])
+        self.assertEqual(4, counters["intersections.START_BOUNDED"])
+        self.assertEqual(4, counters["intersections.END_BOUNDED"])
+        self.assertEqual(9, counters["decimal.quantize_calls"])
+
+    def test_cli_summary_and_profile(self):
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, "input.txt")
+            profile_path = os.path.join(directory, "run.prof")
+            with open(input_path, "w") as file:
+                file.write("\n".join(self.input_lines))
+            stderr, stdout = io.StringIO(), io.StringIO()
+            with contextlib.redirect_stderr(stderr), contextlib.redirect_stdout(stdout):
+                main([input_path, "-f", "csv", "--stats", "--profile", profile_path])
+            stats = pstats.Stats(profile_path)
+        self.assertIn("parse.lines", stderr.getvalue())
+        self.assertIn("stage timings:", stderr.getvalue())
+        self.assertGreater(stats.total_calls, 0)
+        self.assertFalse(instrumentation.enabled)
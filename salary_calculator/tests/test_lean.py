@@ -0,0 +1,198 @@
+import io
+import marshal
+import os
+import shutil
+import tempfile
+from unittest import TestCase, mock
+
+from salary_calculator import snapshot as snapshot_module
+from salary_calculator.benchmarks.parity import ScheduleFuzzer
+from salary_calculator.classes import EmployeeSchedule
+from salary_calculator.cli import main as cli_main
+from salary_calculator.default_rates import get_default_rate_slots
+from salary_calculator.lean import format_cents, main, parse_lean_args
+from salary_calculator.parsing import parse_schedule_line
+from salary_calculator.pipeline import calculate_salaries
+from salary_calculator.rates import load_rate_table
+from salary_calculator.snapshot import (CACHE_DIRECTORY_VARIABLE,
+                                        DEFAULT_RATES_SOURCE,
+                                        DEFAULT_SNAPSHOT_PATH,
+                                        SNAPSHOT_SUFFIX, RateSnapshot,
+                                        build_snapshot, get_rate_snapshot)
+from salary_calculator.utils import hash_rate_slots
+
+NIGHT_PREMIUM_RATES = "salary_calculator/test_data_files/night_premium_rates.toml"
+
+
+class SnapshotTestCase(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_directory = os.path.join(self.directory.name, "cache")
+        patcher = mock.patch.dict(os.environ, {CACHE_DIRECTORY_VARIABLE: self.cache_directory})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+        return super().tearDown()
+
+    def test_shipped_default_snapshot_is_up_to_date(self):
+        # Regenerate it with `python -m salary_calculator.snapshot` after editing default rates.
+        content_hash = EmployeeSchedule.get_default_rate_table().content_hash
+        self.assertEqual(content_hash, hash_rate_slots(get_default_rate_slots()))
+        shipped = RateSnapshot.load(DEFAULT_SNAPSHOT_PATH, source_key=DEFAULT_RATES_SOURCE)
+        self.assertIsNotNone(shipped)
+        self.assertEqual(content_hash, shipped.content_hash)
+        built = build_snapshot()
+        self.assertEqual(
+            [day.get_tables() for day in built.days],
+            [tuple(map(list, day.get_tables())) for day in shipped.days],
+        )
+        self.assertIs(shipped.days[0], shipped.days[4])
+
+    def test_outdated_default_snapshot_is_not_used(self):
+        stale_path = os.path.join(self.directory.name, "stale" + SNAPSHOT_SUFFIX)
+        stale_source = (((0, 0),), {})
+        build_snapshot(load_rate_table(NIGHT_PREMIUM_RATES), stale_source).dump(stale_path)
+        with mock.patch.object(snapshot_module, "DEFAULT_SNAPSHOT_PATH", stale_path):
+            snapshot = get_rate_snapshot()
+            self.assertEqual(
+                EmployeeSchedule.get_default_rate_table().content_hash, snapshot.content_hash
+            )
+            self.assertEqual(DEFAULT_RATES_SOURCE, snapshot.source_key)
+            self.assertEqual(1, len(os.listdir(self.cache_directory)))
+            with mock.patch.object(snapshot_module, "build_snapshot") as build:
+                get_rate_snapshot()
+            build.assert_not_called()
+
+    def test_snapshot_prices_like_the_decimal_engine(self):
+        rate_table = load_rate_table(NIGHT_PREMIUM_RATES)
+        snapshots = ((None, get_rate_snapshot()), (rate_table, build_snapshot(rate_table)))
+        for table, snapshot in snapshots:
+            lines = ScheduleFuzzer(table, seed=5).create_lines(0, 500)
+            expected = [str(salary) for _, salary in calculate_salaries(lines, rate_table=table)]
+            actual = [
+                format_cents(snapshot.price_minute_spans(parse_schedule_line(line)[1]))
+                for line in lines
+            ]
+            self.assertEqual(expected, actual)
+
+    def test_rate_file_snapshots_are_cached_by_content(self):
+        rates_path = os.path.join(self.directory.name, "rates.toml")
+        shutil.copy(NIGHT_PREMIUM_RATES, rates_path)
+        snapshot = get_rate_snapshot(rates_path)
+        # Nothing is written next to the rate table file.
+        self.assertEqual(["cache", "rates.toml"], sorted(os.listdir(self.directory.name)))
+        self.assertEqual(1, len(os.listdir(self.cache_directory)))
+        self.assertEqual(load_rate_table(rates_path).content_hash, snapshot.content_hash)
+        with mock.patch.object(snapshot_module, "build_snapshot") as build:
+            get_rate_snapshot(rates_path)
+        build.assert_not_called()
+
+        # Same size and modification time, other content.
+        stat = os.stat(rates_path)
+        with open(rates_path, "r+", encoding="utf-8") as file:
+            content = file.read().replace("27.5", "27.6")
+            file.seek(0)
+            file.write(content)
+        os.utime(rates_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        changed = get_rate_snapshot(rates_path)
+        self.assertNotEqual(snapshot.content_hash, changed.content_hash)
+        self.assertEqual(2, len(os.listdir(self.cache_directory)))
+
+    def test_unreadable_snapshots_are_ignored(self):
+        path = os.path.join(self.directory.name, "rates" + SNAPSHOT_SUFFIX)
+        with open(path, "wb") as file:
+            file.write(b"corrupt")
+        self.assertIsNone(RateSnapshot.load(path))
+        build_snapshot().dump(path)
+        self.assertIsNotNone(RateSnapshot.load(path))
+        self.assertIsNone(RateSnapshot.load(path, content_hash="other"))
+        self.assertIsNone(RateSnapshot.load(path, source_key="other"))
+        with open(path, "rb") as file:
+            version, *data = marshal.loads(file.read())
+        with open(path, "wb") as file:
+            file.write(marshal.dumps((version + 1, *data)))
+        self.assertIsNone(RateSnapshot.load(path))
+
+
+class LeanTestCase(TestCase):
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        patcher = mock.patch.dict(os.environ, {CACHE_DIRECTORY_VARIABLE: self.directory.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.input_path = os.path.join(self.directory.name, "schedules.txt")
+        lines = ScheduleFuzzer(seed=8).create_lines(0, 200)
+        # Spellings %H:%M also accepts, and a name the csv writer has to quote.
+        lines[10] = "LENIENT=MO9:00-10:5,SU00:00-00:00"
+        lines[20] = '"QUOTED, NAME"=SA10:00-12:00'
+        lines.insert(30, "")
+        with open(self.input_path, "w", encoding="utf-8") as file:
+            file.write("\r\n".join(lines))
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+        return super().tearDown()
+
+    def run_main(self, run, argv):
+        output = io.StringIO()
+        with mock.patch("sys.stdout", output):
+            self.assertEqual(0, run(argv))
+        return output.getvalue()
+
+    def test_parse_lean_args(self):
+        self.assertEqual(
+            {"input": "in.txt", "output": "out.csv", "format": "csv", "rates": "r.toml"},
+            parse_lean_args(["in.txt", "-o", "out.csv", "--format=csv", "--rates", "r.toml"]),
+        )
+        self.assertEqual("-", parse_lean_args(["-", "-f", "jsonl"])["input"])
+        self.assertIsNone(parse_lean_args(["in.txt", "-j", "2"]))
+        self.assertIsNone(parse_lean_args(["in.txt", "--format", "xml"]))
+        self.assertIsNone(parse_lean_args(["in.txt", "other.txt"]))
+        self.assertIsNone(parse_lean_args(["in.txt", "-o"]))
+        self.assertIsNone(parse_lean_args(["--help"]))
+
+    def test_format_cents(self):
+        self.assertEqual(
+            ["0.00", "0.05", "-0.05", "1234.50"],
+            [format_cents(cents) for cents in (0, 5, -5, 123450)],
+        )
+
+    def test_same_output_as_the_full_cli(self):
+        for argv in (
+            [],
+            ["-f", "csv"],
+            ["-f", "jsonl"],
+            ["--rates", NIGHT_PREMIUM_RATES],
+        ):
+            lean_output = self.run_main(main, [self.input_path] + argv)
+            self.assertEqual(self.run_main(cli_main, [self.input_path] + argv), lean_output)
+        self.assertIn('"""QUOTED, NAME""",', self.run_main(main, [self.input_path, "-f", "csv"]))
+
+    def test_other_options_run_the_full_cli(self):
+        with mock.patch("salary_calculator.cli.main", return_value=0) as cli:
+            self.assertEqual(0, main([self.input_path, "--dedup"]))
+        cli.assert_called_once_with([self.input_path, "--dedup"])
+
+    def run_failing_main(self, run, argv):
+        errors = io.StringIO()
+        with mock.patch("sys.stdout"), mock.patch("sys.stderr", errors):
+            self.assertEqual(1, run(argv))
+        return errors.getvalue()
+
+    def test_errors_are_reported_like_the_full_cli(self):
+        with open(self.input_path, "a", encoding="utf-8") as file:
+            file.write("\nBAD=MO12:00-10:00")
+        errors = self.run_failing_main(main, [self.input_path])
+        self.assertTrue(errors.startswith("error: line 202, column 7: "), errors)
+        full_errors = self.run_failing_main(cli_main, [self.input_path, "--overlaps", "allow"])
+        self.assertEqual(full_errors, errors)
+
+        rates_path = os.path.join(self.directory.name, "rates.json")
+        with open(rates_path, "w", encoding="utf-8") as file:
+            file.write('{"weekdays": {"XX": []}}')
+        errors = self.run_failing_main(main, [self.input_path, "--rates", rates_path])
+        self.assertTrue(errors.startswith("error: "), errors)
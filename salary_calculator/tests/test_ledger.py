@@ -0,0 +1,107 @@
+import random
+from datetime import time
+from decimal import Decimal
+from unittest import TestCase
+
+from salary_calculator.classes import EmployeeSchedule, WorkingDaySpan
+from salary_calculator.dedup import ScheduleInterner
+from salary_calculator.rates import RateTable
+from salary_calculator.serializers import FastEmployeeScheduleSerializer
+
+
+class SalaryLedgerTestCase(TestCase):
+    def setUp(self) -> None:
+        self.schedule = FastEmployeeScheduleSerializer(
+            "C1=MO08:35-09:45,MO12:50-18:30,SA03:32-09:50,SA17:59-20:00"
+        ).serialize()
+        self.night_premium = RateTable.from_dict(
+            {
+                "weekdays": {
+                    "MO,TU,WE,TH,FR,SA,SU": [
+                        {"start": "00:00", "end": "06:00", "hour_amount": "27.33", "band": "night"},
+                        {"start": "06:01", "end": "00:00", "hour_amount": "15.5", "band": "day"},
+                    ]
+                }
+            }
+        )
+        return super().setUp()
+
+    def create_random_span(self, rnd: random.Random) -> WorkingDaySpan:
+        start = rnd.randrange(0, 1440)
+        end = rnd.choice([0, rnd.randrange(start, 1440)])
+        return WorkingDaySpan.from_minutes(weekday=rnd.randrange(7), start=start, end=end)
+
+    def test_tracked_salary_matches_full_calculation(self):
+        self.schedule.track_salary()
+        self.assertEqual(Decimal("339.00"), self.schedule.get_tracked_salary())
+        new_span = WorkingDaySpan.from_minutes(weekday=6, start=18 * 60, end=0)
+        self.schedule.add_span(new_span)
+        self.assertEqual(Decimal("488.25"), self.schedule.get_tracked_salary())
+        self.assertEqual(Decimal("488.25"), self.schedule.calculate_salary())
+        self.schedule.remove_span(new_span)
+        self.assertEqual(Decimal("339.00"), self.schedule.get_tracked_salary())
+
+    def test_breakdown_by_weekday_and_band(self):
+        self.schedule.track_salary()
+        breakdown = self.schedule.get_salary_breakdown()
+        self.assertEqual(Decimal("10.50"), breakdown[(0, "00:01-09:00")])
+        self.assertEqual(sum(breakdown.values()).quantize(Decimal("0.01")), Decimal("339.00"))
+        self.assertEqual({0, 5}, {weekday for weekday, _ in breakdown})
+
+    def test_random_edits_keep_parity(self):
+        rnd = random.Random(13)
+        for rate_table in (None, self.night_premium):
+            schedule = EmployeeSchedule(username="RANDOM")
+            schedule.track_salary(rate_table)
+            for _ in range(300):
+                operation = rnd.random()
+                spans = schedule.working_days_spans
+                if operation < 0.5 or not spans:
+                    schedule.add_span(self.create_random_span(rnd))
+                elif operation < 0.75:
+                    schedule.remove_span(rnd.choice(spans))
+                else:
+                    schedule.replace_span(rnd.choice(spans), self.create_random_span(rnd))
+                full = EmployeeSchedule(working_days_spans=list(schedule.working_days_spans))
+                self.assertEqual(full.calculate_salary(rate_table), schedule.get_tracked_salary())
+
+    def test_spans_with_seconds_use_intersections(self):
+        schedule = EmployeeSchedule(
+            working_days_spans=[
+                WorkingDaySpan(weekday=1, start=time(8, 59, 30), end=time(18, 30))
+            ]
+        )
+        expected = schedule.calculate_salary()
+        schedule.track_salary()
+        self.assertEqual(expected, schedule.get_tracked_salary())
+
+    def test_shared_dedup_spans_are_copied_on_write(self):
+        interner = ScheduleInterner()
+        first = interner.serialize("A=MO10:00-12:00")
+        second = interner.serialize("B=MO10:00-12:00")
+        first.track_salary()
+        first.add_span(WorkingDaySpan.from_minutes(weekday=2, start=600, end=660))
+        self.assertEqual(1, len(second.working_days_spans))
+        self.assertEqual(Decimal("45.00"), first.get_tracked_salary())
+        self.assertEqual(Decimal("30.00"), second.calculate_salary())
+
+    def test_untracked_edits_and_direct_mutation(self):
+        self.schedule.add_span(WorkingDaySpan.from_minutes(weekday=2, start=600, end=660))
+        self.assertIsNone(self.schedule.salary_ledger)
+        with self.assertRaises(ValueError):
+            self.schedule.get_tracked_salary()
+        self.schedule.track_salary()
+        self.schedule.working_days_spans.pop()
+        self.assertEqual(Decimal("339.00"), self.schedule.calculate_salary())
+        self.schedule.working_days_spans[0] = WorkingDaySpan.from_minutes(
+            weekday=6, start=0, end=0
+        )
+        full = EmployeeSchedule(working_days_spans=list(self.schedule.working_days_spans))
+        self.assertEqual(full.calculate_salary(), self.schedule.calculate_salary())
+        self.assertNotEqual(self.schedule.get_tracked_salary(), self.schedule.calculate_salary())
+        self.assertEqual(
+            self.schedule.calculate_salary(),
+            sum(self.schedule.get_salary_breakdown().values()).quantize(Decimal("0.01")),
+        )
+        with self.assertRaises(ValueError):
+            self.schedule.remove_span(WorkingDaySpan.from_minutes(weekday=4, start=1, end=2))
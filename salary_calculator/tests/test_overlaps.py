@@ -0,0 +1,99 @@
+from datetime import time
+from decimal import Decimal
+from unittest import TestCase
+
+from salary_calculator.classes import (EmployeeSchedule, SpanConflictTypes,
+                                       WorkingDaySpan)
+from salary_calculator.exceptions import OverlappingSpansError
+from salary_calculator.pipeline import calculate_salaries
+from salary_calculator.serializers import (EmployeeScheduleSerializer,
+                                           FastEmployeeScheduleSerializer)
+
+
+class SpanOverlapsTestCase(TestCase):
+    def serialize(self, line: str) -> EmployeeSchedule:
+        return FastEmployeeScheduleSerializer(line).serialize()
+
+    def test_no_conflicts(self):
+        schedule = self.serialize("A=MO10:00-12:00,MO12:00-14:00,TU10:00-12:00,MO08:00-09:00")
+        self.assertEqual([], schedule.find_conflicts())
+        schedule.validate_spans()
+
+    def test_overlaps_and_duplicates(self):
+        schedule = self.serialize(
+            "A=MO10:00-12:00,TU10:00-11:00,MO08:00-18:00,TU10:00-11:00,MO17:00-00:00"
+        )
+        conflicts = [
+            (conflict.weekday, conflict.conflict_type, str(conflict))
+            for conflict in schedule.find_conflicts()
+        ]
+        self.assertEqual(
+            [
+                (0, SpanConflictTypes.OVERLAP, "MO 08:00-18:00 overlaps 10:00-12:00"),
+                (0, SpanConflictTypes.OVERLAP, "MO 08:00-18:00 overlaps 17:00-00:00"),
+                (1, SpanConflictTypes.DUPLICATE, "TU 10:00-11:00 is duplicated"),
+            ],
+            conflicts,
+        )
+        with self.assertRaises(OverlappingSpansError) as context:
+            schedule.validate_spans(7)
+        self.assertEqual(7, context.exception.line)
+        self.assertEqual(3, len(context.exception.conflicts))
+
+    def test_merge_overlapping_spans(self):
+        schedule = self.serialize(
+            "A=MO10:00-12:00,TU10:00-11:00,MO08:00-11:00,TU10:00-11:00,MO12:00-13:00,MO11:30-00:00"
+        )
+        merged = schedule.merge_overlapping_spans()
+        self.assertEqual(
+            ["MO -> 08:00-00:00", "TU -> 10:00-11:00"],
+            [str(span) for span in merged.working_days_spans],
+        )
+        self.assertEqual([], merged.find_conflicts())
+
+    def test_merge_adjacent_spans(self):
+        schedule = self.serialize("A=MO10:00-12:00,MO12:00-14:00,MO14:01-15:00")
+        self.assertEqual(3, len(schedule.merge_overlapping_spans().working_days_spans))
+        self.assertEqual(
+            ["MO -> 10:00-14:00", "MO -> 14:01-15:00"],
+            [
+                str(span)
+                for span in schedule.merge_overlapping_spans(merge_adjacent=True).working_days_spans
+            ],
+        )
+
+    def test_merge_time_spans(self):
+        schedule = EmployeeSchedule(
+            working_days_spans=[
+                WorkingDaySpan(weekday=2, start=time(9, 0), end=time(11, 0)),
+                WorkingDaySpan(weekday=2, start=time(10, 0, 30), end=time(0, 0)),
+            ]
+        )
+        merged = schedule.merge_overlapping_spans().working_days_spans
+        self.assertEqual(1, len(merged))
+        self.assertEqual((time(9, 0), time(23, 59, 59)), (merged[0].span.start, merged[0].span.end))
+
+    def test_overlaps_policies(self):
+        lines = ["A=MO10:00-12:00,MO11:00-13:00", "B=TU10:00-11:00"]
+        self.assertEqual(
+            [("A", Decimal("60.00")), ("B", Decimal("15.00"))],
+            list(calculate_salaries(lines)),
+        )
+        self.assertEqual(
+            [("A", Decimal("45.00")), ("B", Decimal("15.00"))],
+            list(calculate_salaries(lines, overlaps="merge")),
+        )
+        with self.assertRaises(OverlappingSpansError) as context:
+            list(calculate_salaries(lines, overlaps="reject"))
+        self.assertEqual(1, context.exception.line)
+        with self.assertRaises(ValueError):
+            list(calculate_salaries(lines, overlaps="ignore"))
+
+    def test_str_groups_sorted_spans(self):
+        line = "A=TU10:00-11:00,MO12:00-13:00,TU08:00-09:00,MO09:00-10:00,TU08:00-08:30"
+        schedule = EmployeeScheduleSerializer(line).serialize()
+        self.assertEqual(
+            "A\n\tTU\n\t\t08:00-08:30\n\t\t08:00-09:00\n\t\t10:00-11:00\n\tMO\n\t\t09:00-10:00\n\t\t12:00-13:00",
+            str(schedule),
+        )
+        self.assertEqual(str(schedule), str(self.serialize(line)))
@@ -0,0 +1,53 @@
+from decimal import Decimal
+from unittest import TestCase, mock
+
+from salary_calculator.cli import main
+from salary_calculator.parallel import (calculate_salaries_parallel,
+                                        chunk_lines, resolve_workers)
+from salary_calculator.pipeline import calculate_salaries
+
+
+class ParallelTestCase(TestCase):
+    def setUp(self) -> None:
+        self.input_lines = [
+            "RENE=MO10:00-12:00,TU10:00-12:00,TH01:00-03:00,SA14:00-18:00,SU20:00-21:00",
+            "ASTRID=MO10:00-12:00,TH12:00-14:00,SU20:00-21:00",
+            "C1=MO08:35-09:45,MO12:50-18:30,SA03:32-09:50,SA17:59-20:00",
+            "SC1=MO00:00-09:00,MO23:00-00:00,SU18:40-00:00",
+            "SC2=MO00:01-00:00,SU18:00-00:00",
+        ] * 7
+        return super().setUp()
+
+    def test_chunk_lines(self):
+        chunks = list(chunk_lines(range(7), 3))
+        self.assertEqual([[0, 1, 2], [3, 4, 5], [6]], chunks)
+        with self.assertRaises(ValueError):
+            list(chunk_lines(range(7), 0))
+
+    def test_resolve_workers(self):
+        self.assertEqual(3, resolve_workers(3))
+        self.assertGreaterEqual(resolve_workers(0), 1)
+        with self.assertRaises(ValueError):
+            resolve_workers(-2)
+
+    def test_cli_refuses_invalid_workers_and_chunk_sizes(self):
+        for argv in (["-j", "-2"], ["--chunk-size", "0"], ["-j", "two"]):
+            with self.assertRaises(SystemExit) as raised, mock.patch("sys.stderr"):
+                main(["-"] + argv)
+            self.assertEqual(2, raised.exception.code)
+
+    def test_results_keep_input_order(self):
+        expected = list(calculate_salaries(self.input_lines))
+        records = list(
+            calculate_salaries_parallel(self.input_lines, workers=2, chunk_size=3)
+        )
+        self.assertEqual(expected, records)
+        self.assertEqual(("SC2", Decimal("627.85")), records[-1])
+
+    def test_worker_errors_are_raised(self):
+        with self.assertRaises(ValueError):
+            list(
+                calculate_salaries_parallel(
+                    self.input_lines + ["BAD=XX10:00-12:00"], workers=2, chunk_size=4
+                )
+            )
@@ -0,0 +1,165 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import TestCase
+
+from salary_calculator.classes import EmployeeSchedule
+from salary_calculator.exceptions import (RateTableError, ScheduleParseError,
+                                          StartGreaterThanEndParseError)
+from salary_calculator.periods import (DatedEmployeeSchedule, DatedSpan,
+                                       RateRule, RateRuleIndex,
+                                       calculate_dated_salaries,
+                                       load_rate_rules,
+                                       parse_dated_schedule_line,
+                                       resolve_day_slots,
+                                       rules_from_rate_table)
+from salary_calculator.rates import RateSlot
+from salary_calculator.serializers import FastEmployeeScheduleSerializer
+from salary_calculator.utils import get_abbrev_by_calendar_day
+
+RULES_PATH = "salary_calculator/test_data_files/pay_period_rules.json"
+
+
+class PayPeriodTestCase(TestCase):
+    def setUp(self) -> None:
+        self.rule_index = load_rate_rules(RULES_PATH)
+        return super().setUp()
+
+    def test_weekly_rules_match_weekday_pricing(self):
+        default_rate_table = EmployeeSchedule.get_default_rate_table()
+        rule_index = RateRuleIndex(rules_from_rate_table(default_rate_table))
+        monday = date(2024, 3, 4)
+        rnd = random.Random(17)
+        for _ in range(500):
+            weekday, start = rnd.randrange(7), rnd.randrange(1440)
+            end = rnd.choice([0, rnd.randrange(start, 1440)])
+            line = "X=%s%02d:%02d-%02d:%02d" % (
+                (get_abbrev_by_calendar_day(weekday),) + divmod(start, 60) + divmod(end, 60)
+            )
+            expected = FastEmployeeScheduleSerializer(line).serialize().calculate_salary()
+            schedule = DatedEmployeeSchedule(
+                "X", [DatedSpan(monday + timedelta(weekday), start, end)]
+            )
+            self.assertEqual(expected, schedule.calculate_salary(rule_index), line)
+
+    def test_rate_change_mid_period(self):
+        before = DatedEmployeeSchedule("A", [DatedSpan(date(2024, 3, 14), 600, 720)])
+        after = DatedEmployeeSchedule("A", [DatedSpan(date(2024, 3, 15), 600, 720)])
+        self.assertEqual(Decimal("30.00"), before.calculate_salary(self.rule_index))
+        self.assertEqual(Decimal("33.00"), after.calculate_salary(self.rule_index))
+
+    def test_holiday_overrides_the_whole_day(self):
+        # 2 hours, plus 21:00-23:59 as midnight ends are normalized.
+        schedule = parse_dated_schedule_line("A=2024-03-29T08:00-10:00,2024-03-29T21:00-00:00")
+        self.assertEqual(
+            {(date(2024, 3, 29), "holiday"): Decimal("199.20")},
+            schedule.calculate_salary_by_band(self.rule_index),
+        )
+
+    def test_premium_cuts_lower_priority_slots(self):
+        # Friday 19:00-23:30: 19:00-20:00 and 23:00-23:30 regular evening, 20:00-23:00 premium.
+        schedule = parse_dated_schedule_line("A=2024-03-22T19:00-23:30")
+        self.assertEqual(
+            {
+                (date(2024, 3, 22), "18:01-00:00"): Decimal("33.00"),
+                (date(2024, 3, 22), "friday late"): Decimal("72.00"),
+            },
+            schedule.calculate_salary_by_band(self.rule_index),
+        )
+        self.assertEqual(Decimal("105.00"), schedule.calculate_salary(self.rule_index))
+
+    def test_resolve_day_slots(self):
+        base = RateRule(RateSlot(60, 600, Decimal(10), "base"))
+        premium = RateRule(RateSlot(120, 180, Decimal(30), "premium"), priority=1)
+        self.assertEqual(
+            (
+                RateSlot(60, 120, Decimal(10), "base"),
+                RateSlot(120, 180, Decimal(30), "premium"),
+                RateSlot(180, 600, Decimal(10), "base"),
+            ),
+            resolve_day_slots([base, premium]),
+        )
+
+    def test_single_minute_rules_are_kept(self):
+        base = RateRule(RateSlot(0, 0, Decimal(10), "base"))
+        minute = RateRule(RateSlot(720, 721, Decimal(60), "minute"), priority=1)
+        last_minute = RateRule(RateSlot(1439, 0, Decimal(60), "last minute"), priority=1)
+        self.assertEqual(
+            (
+                RateSlot(0, 720, Decimal(10), "base"),
+                RateSlot(720, 721, Decimal(60), "minute"),
+                RateSlot(721, 1439, Decimal(10), "base"),
+                RateSlot(1439, 1439, Decimal(60), "last minute"),
+            ),
+            resolve_day_slots([base, minute, last_minute]),
+        )
+        rule_index = RateRuleIndex([base, minute, last_minute])
+        self.assertEqual(Decimal("1.20"), rule_index.price(DatedSpan(date(2024, 3, 4), 720, 721)))
+
+    def test_day_plans_only_resolve_the_rules_of_their_segment(self):
+        rnd = random.Random(3)
+        first_day = date(2024, 1, 1)
+        rules = []
+        for index in range(60):
+            valid_from = first_day + timedelta(rnd.randrange(90))
+            valid_until = valid_from + timedelta(rnd.randrange(30))
+            start = rnd.randrange(1439)
+            rules.append(
+                RateRule(
+                    RateSlot(start, rnd.randrange(start, 1440), Decimal(index), str(index)),
+                    rnd.choice([None, valid_from]),
+                    rnd.choice([None, valid_until]),
+                    frozenset(rnd.sample(range(7), rnd.randrange(1, 8))),
+                    rnd.randrange(5),
+                )
+            )
+        rule_index = RateRuleIndex(rules)
+        for offset in range(-5, 130):
+            day = first_day + timedelta(offset)
+            expected = resolve_day_slots([rule for rule in rules if rule.applies_to(day)])
+            self.assertEqual(expected, rule_index.get_day_plan(day).slots, day)
+
+    def test_day_plans_are_shared_by_segment(self):
+        first = self.rule_index.get_day_plan(date(2024, 3, 4))
+        self.assertIs(first, self.rule_index.get_day_plan(date(2024, 3, 11)))
+        self.assertIsNot(first, self.rule_index.get_day_plan(date(2024, 3, 18)))
+        self.assertEqual(Decimal(0), self.rule_index.price(DatedSpan(date(2024, 3, 4), 0, 1)))
+
+    def test_calculate_dated_salaries(self):
+        lines = [
+            "A=2024-03-14T10:00-12:00,2024-03-15T10:00-12:00",
+            "",
+            "B=2024-03-29T00:00-00:00",
+        ]
+        self.assertEqual(
+            [("A", Decimal("63.00")), ("B", Decimal("959.20"))],
+            list(calculate_dated_salaries(lines, self.rule_index)),
+        )
+
+    def test_invalid_lines(self):
+        with self.assertRaises(ScheduleParseError) as context:
+            parse_dated_schedule_line("A=2024-02-30T10:00-12:00", 4)
+        self.assertEqual((4, 3), (context.exception.line, context.exception.column))
+        with self.assertRaises(ScheduleParseError):
+            parse_dated_schedule_line("A=2024-02-03 10:00-12:00")
+        with self.assertRaises(StartGreaterThanEndParseError) as context:
+            parse_dated_schedule_line("A=2024-03-01T10:00-12:00,2024-03-02T12:00-10:00")
+        self.assertEqual(37, context.exception.column)
+
+    def test_invalid_rules(self):
+        with self.assertRaises(RateTableError):
+            RateRuleIndex.from_dict({})
+        slot = {"start": "00:00", "end": "01:00", "hour_amount": 1}
+        for invalid in (
+            {"priority": "high"},
+            {"priority": None},
+            {"priority": 1.5},
+            {"weekdays": ["SA", "SU"]},
+            {"weekdays": "SA,XX"},
+        ):
+            with self.assertRaises(RateTableError, msg=invalid):
+                RateRuleIndex.from_dict({"rules": [dict(slot, **invalid)]})
+        with self.assertRaises(RateTableError):
+            RateRuleIndex.from_dict(
+                {"rules": [{"from": "March", "start": "00:00", "end": "01:00", "hour_amount": 1}]}
+            )
@@ -0,0 +1,96 @@
+import io
+import json
+import os
+import tempfile
+from decimal import Decimal
+from unittest import TestCase, mock
+
+from salary_calculator.cli import main
+from salary_calculator.exceptions import ScheduleParseError
+from salary_calculator.pipeline import calculate_salaries
+from salary_calculator.streams import read_lines, write_records
+
+
+class PipelineTestCase(TestCase):
+    def setUp(self) -> None:
+        self.input_lines = [
+            "RENE=MO10:00-12:00,TU10:00-12:00,TH01:00-03:00,SA14:00-18:00,SU20:00-21:00",
+            "ASTRID=MO10:00-12:00,TH12:00-14:00,SU20:00-21:00",
+        ]
+        self.expected_records = [
+            ("RENE", Decimal("215.00")),
+            ("ASTRID", Decimal("85.00")),
+        ]
+        return super().setUp()
+
+    def get_input_stream(self) -> io.StringIO:
+        return io.StringIO("\n".join(self.input_lines) + "\n\n")
+
+    def test_read_lines_strips_newlines(self):
+        lines = list(read_lines(self.get_input_stream()))
+        self.assertEqual(self.input_lines + [""], lines)
+
+    def test_blank_lines_are_skipped_but_numbered(self):
+        records = calculate_salaries(["", self.input_lines[0], "", "BROKEN"])
+        self.assertEqual(self.expected_records[0], next(records))
+        with self.assertRaises(ScheduleParseError) as context:
+            next(records)
+        self.assertEqual(4, context.exception.line)
+
+    def test_calculate_salaries_is_lazy(self):
+        records = calculate_salaries(iter(self.input_lines + ["BROKEN"]))
+        self.assertEqual(self.expected_records[0], next(records))
+        self.assertEqual(self.expected_records[1], next(records))
+        with self.assertRaises(ValueError):
+            next(records)
+
+    def test_write_text_records(self):
+        output = io.StringIO()
+        written = write_records(iter(self.expected_records), output, "text")
+        self.assertEqual(2, written)
+        self.assertEqual(
+            "The amount to pay RENE is: 215.00 USD\n"
+            "The amount to pay ASTRID is: 85.00 USD\n",
+            output.getvalue(),
+        )
+
+    def test_write_csv_records(self):
+        output = io.StringIO()
+        written = write_records(iter(self.expected_records), output, "csv")
+        self.assertEqual(2, written)
+        self.assertEqual(
+            "username,salary\nRENE,215.00\nASTRID,85.00\n", output.getvalue()
+        )
+
+    def test_write_jsonl_records(self):
+        output = io.StringIO()
+        write_records(iter(self.expected_records), output, "jsonl")
+        rows = [json.loads(row) for row in output.getvalue().splitlines()]
+        self.assertEqual(
+            [{"username": "RENE", "salary": "215.00"}, {"username": "ASTRID", "salary": "85.00"}],
+            rows,
+        )
+
+    def test_cli_reads_and_writes_files(self):
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, "input.txt")
+            output_path = os.path.join(directory, "output.csv")
+            with open(input_path, "w") as file:
+                file.write(self.get_input_stream().getvalue())
+            exit_code = main([input_path, "-o", output_path, "-f", "csv"])
+            with open(output_path) as file:
+                output = file.read()
+        self.assertEqual(0, exit_code)
+        self.assertEqual("username,salary\nRENE,215.00\nASTRID,85.00\n", output)
+
+    def test_cli_reports_invalid_input(self):
+        self.input_lines.append("BROKEN=MO10:00-1200")
+        with tempfile.TemporaryDirectory() as directory:
+            input_path = os.path.join(directory, "input.txt")
+            with open(input_path, "w") as file:
+                file.write(self.get_input_stream().getvalue())
+            errors = io.StringIO()
+            with mock.patch("sys.stdout"), mock.patch("sys.stderr", errors):
+                exit_code = main([input_path, "--dedup"])
+        self.assertEqual(1, exit_code)
+        self.assertEqual("error: line 3, column 16: end time:'1200' is invalid\n", errors.getvalue())
@@ -0,0 +1,167 @@
+import calendar
+import os
+import random
+from datetime import time
+from decimal import Decimal
+from unittest import TestCase
+
+from salary_calculator.cache import LRUCache
+from salary_calculator.classes import (EmployeeSchedule, PaymentTimeSlot,
+                                       WorkingDaySpan)
+from salary_calculator.exceptions import RateTableError
+from salary_calculator.rates import (CompiledDay, RateSlot, RateTable,
+                                     compile_rate_table,
+                                     get_compiled_rate_table, load_rate_table)
+from salary_calculator.serializers import EmployeeScheduleSerializer
+
+
+def minutes_to_time(minutes: int) -> time:
+    return time(minutes // 60 % 24, minutes % 60)
+
+
+class CompiledRateTableTestCase(TestCase):
+    def setUp(self) -> None:
+        self.boundary_minutes = [0, 1, 2, 539, 540, 541, 542, 1079, 1080, 1081, 1082, 1438, 1439, 1440]
+        self.weekdays = [calendar.MONDAY, calendar.SATURDAY, calendar.SUNDAY]
+        return super().setUp()
+
+    def assert_same_salary(self, spans):
+        schedule = EmployeeSchedule(username="PARITY", working_days_spans=spans)
+        self.assertEqual(
+            schedule.calculate_salary_by_intersections(),
+            schedule.calculate_salary(),
+            [str(span) for span in spans],
+        )
+
+    def create_span(self, weekday: int, start: int, end: int) -> WorkingDaySpan:
+        return WorkingDaySpan(
+            weekday=weekday, start=minutes_to_time(start), end=minutes_to_time(end)
+        )
+
+    def test_boundary_spans_match_intersections(self):
+        for weekday in self.weekdays:
+            for start in self.boundary_minutes[:-1]:
+                for end in self.boundary_minutes:
+                    if start <= end:
+                        self.assert_same_salary([self.create_span(weekday, start, end)])
+
+    def test_random_schedules_match_intersections(self):
+        generator = random.Random(20211017)
+        for _ in range(300):
+            spans = []
+            for _ in range(generator.randint(1, 6)):
+                start = generator.randrange(0, 1440)
+                end = generator.randint(start, 1440)
+                spans.append(self.create_span(generator.randrange(7), start, end))
+            self.assert_same_salary(spans)
+
+    def test_minute_spans_match_intersections(self):
+        generator = random.Random(20211018)
+        for _ in range(300):
+            spans = []
+            for _ in range(generator.randint(1, 6)):
+                start = generator.randrange(0, 1440)
+                end = generator.randint(start, 1440) % 1440
+                spans.append(
+                    WorkingDaySpan.from_minutes(
+                        weekday=generator.randrange(7), start=start, end=end
+                    )
+                )
+            self.assert_same_salary(spans)
+
+    def test_spans_having_seconds_match_intersections(self):
+        span = WorkingDaySpan(
+            weekday=calendar.MONDAY, start=time(8, 59, 30), end=time(18, 0, 45)
+        )
+        self.assert_same_salary([span])
+
+    def test_weekdays_sharing_slots_share_compiled_day(self):
+        slots = [
+            PaymentTimeSlot(start=time(0, 1), end=time(12, 0), hour_amount=Decimal(10)),
+            PaymentTimeSlot(start=time(12, 1), end=time(0, 0), hour_amount=Decimal(12)),
+        ]
+        table = compile_rate_table({weekday: list(slots) for weekday in range(7)})
+        self.assertIs(table.days[calendar.MONDAY], table.days[calendar.TUESDAY])
+        self.assertEqual(Decimal("21.76"), table.price(calendar.MONDAY, 660, 780))
+
+    def test_overlapping_slots_are_rejected(self):
+        with self.assertRaises(ValueError):
+            CompiledDay([(0, 600, Decimal(1)), (500, 900, Decimal(2))])
+
+
+class RateTableTestCase(TestCase):
+    def setUp(self) -> None:
+        self.input_lines = [
+            "RENE=MO10:00-12:00,TU10:00-12:00,TH01:00-03:00,SA14:00-18:00,SU20:00-21:00",
+            "C2=MO10:12-20:30,TU07:36-10:55,FR12:30-19:45,SU09:11-20:35",
+            "SC1=MO00:00-09:00,MO23:00-00:00,SU18:40-00:00",
+        ]
+        return super().setUp()
+
+    def get_data_file(self, filename: str) -> str:
+        return os.path.join(os.path.dirname(__file__), os.pardir, "test_data_files", filename)
+
+    def create_schedules(self):
+        return [EmployeeScheduleSerializer(line).serialize() for line in self.input_lines]
+
+    def test_default_table_file_matches_hardcoded_slots(self):
+        rate_table = load_rate_table(self.get_data_file("default_rates.json"))
+        self.assertEqual(EmployeeSchedule.get_default_rate_table(), rate_table)
+        for schedule in self.create_schedules():
+            self.assertEqual(schedule.calculate_salary(), schedule.calculate_salary(rate_table))
+
+    def test_toml_and_csv_files_build_the_same_table(self):
+        toml_table = load_rate_table(self.get_data_file("night_premium_rates.toml"))
+        csv_table = load_rate_table(self.get_data_file("night_premium_rates.csv"))
+        self.assertEqual(toml_table, csv_table)
+        self.assertEqual("night-premium", toml_table.name)
+        self.assertEqual(Decimal("27.5"), toml_table.get_slots(calendar.MONDAY)[0].hour_amount)
+        self.assertEqual(("weekend",), tuple(slot.band for slot in csv_table.get_slots(calendar.SUNDAY)))
+
+    def test_other_grids_match_intersections(self):
+        rate_table = load_rate_table(self.get_data_file("night_premium_rates.csv"))
+        for schedule in self.create_schedules():
+            self.assertEqual(
+                schedule.calculate_salary_by_intersections(rate_table),
+                schedule.calculate_salary(rate_table),
+            )
+        schedule = self.create_schedules()[0]
+        self.assertEqual(Decimal("275.00"), schedule.calculate_salary(rate_table))
+
+    def test_invalid_tables_are_rejected(self):
+        invalid_tables = [
+            {},
+            {"weekdays": {"MO,TU,WE,TH,FR,SA": []}},
+            {"weekdays": {"MO,TU,WE,TH,FR,SA,SU": [{"start": "10:00", "end": "09:00", "hour_amount": 1}]}},
+            {"weekdays": {"MO,TU,WE,TH,FR,SA,SU": [{"start": "10:00", "end": "11:00", "hour_amount": -1}]}},
+            {"weekdays": {"MO,TU,WE,TH,FR,SA,SU": [{"start": "10:00", "end": "11:00", "hour_amount": "x"}]}},
+            {"weekdays": {"MO,TU,WE,TH,FR,SA,SU": [{"start": "10:00", "end": "11:00"}]}},
+            {"weekdays": {"MO,TU,WE,TH,FR,SA,SU": [{"start": "1000", "end": "11:00", "hour_amount": 1}]}},
+            {"weekdays": {"MO,TU,WE,TH,FR,SA,XX": [{"start": "10:00", "end": "11:00", "hour_amount": 1}]}},
+            {"weekdays": {"MO,TU,WE,TH,FR,SA,SU,MO": [{"start": "10:00", "end": "11:00", "hour_amount": 1}]}},
+            {
+                "weekdays": {
+                    "MO,TU,WE,TH,FR,SA,SU": [
+                        {"start": "10:00", "end": "12:00", "hour_amount": 1},
+                        {"start": "11:00", "end": "13:00", "hour_amount": 1},
+                    ]
+                }
+            },
+        ]
+        for data in invalid_tables:
+            with self.assertRaises(RateTableError, msg=data):
+                RateTable.from_dict(data)
+
+    def test_compiled_tables_are_cached_by_content(self):
+        cache = LRUCache(2)
+        first = load_rate_table(self.get_data_file("night_premium_rates.csv"))
+        second = load_rate_table(self.get_data_file("night_premium_rates.toml"))
+        compiled = get_compiled_rate_table(first, cache)
+        self.assertIs(compiled, get_compiled_rate_table(second, cache))
+        get_compiled_rate_table(EmployeeSchedule.get_default_rate_table(), cache)
+        get_compiled_rate_table(
+            RateTable({weekday: [RateSlot(0, 0, Decimal(1), "all")] for weekday in range(7)}),
+            cache,
+        )
+        self.assertEqual(2, len(cache))
+        self.assertNotIn(first.content_hash, cache)
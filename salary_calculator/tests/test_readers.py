@@ -0,0 +1,104 @@
+import os
+import pickle
+import tempfile
+from unittest import TestCase
+
+from salary_calculator.cli import main
+from salary_calculator.exceptions import (OverlappingSpansError,
+                                          ScheduleParseError)
+from salary_calculator.parsing import parse_schedule_line
+from salary_calculator.pipeline import calculate_salaries
+from salary_calculator.readers import (MappedFile, calculate_salaries_mapped,
+                                       find_line_start, iter_byte_ranges,
+                                       price_byte_range, split_byte_ranges)
+
+
+class ReadersTestCase(TestCase):
+    def setUp(self) -> None:
+        self.input_lines = [
+            "RENE=MO10:00-12:00,TU10:00-12:00,TH01:00-03:00,SA14:00-18:00,SU20:00-21:00",
+            "ASTRID=MO10:00-12:00,TH12:00-14:00,SU20:00-21:00",
+            "",
+            "C1=MO08:35-09:45,MO12:50-18:30,SA03:32-09:50,SA17:59-20:00",
+            "SC1=MO00:00-09:00,MO23:00-00:00,SU18:40-00:00",
+        ] * 9
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.write_file("\r\n".join(self.input_lines))
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+        return super().tearDown()
+
+    def write_file(self, content: str, name: str = "schedules.txt") -> str:
+        path = os.path.join(self.directory.name, name)
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            file.write(content)
+        return path
+
+    def test_line_views(self):
+        with MappedFile(self.path) as mapped_file:
+            lines = [line.tobytes().decode() for line in mapped_file.iter_lines()]
+        self.assertEqual(self.input_lines, lines)
+
+    def test_empty_file(self):
+        with MappedFile(self.write_file("", "empty.txt")) as mapped_file:
+            self.assertEqual([], list(mapped_file.iter_lines()))
+            self.assertEqual([], split_byte_ranges(mapped_file.buffer, 4))
+
+    def test_byte_ranges_end_on_line_boundaries(self):
+        buffer = b"AA\nBBBB\nC\n\nDDDDD"
+        self.assertEqual(3, find_line_start(buffer, 1))
+        self.assertEqual(3, find_line_start(buffer, 3))
+        self.assertEqual(len(buffer), find_line_start(buffer, 14))
+        for range_size in range(1, len(buffer) + 2):
+            ranges = list(iter_byte_ranges(buffer, range_size))
+            self.assertEqual(0, ranges[0][0])
+            self.assertEqual(len(buffer), ranges[-1][1])
+            for (_, stop), (start, _) in zip(ranges, ranges[1:]):
+                self.assertEqual(stop, start)
+                self.assertEqual(b"\n", buffer[stop - 1 : stop])
+        self.assertLessEqual(len(split_byte_ranges(buffer, 3)), 3)
+        with self.assertRaises(ValueError):
+            list(iter_byte_ranges(buffer, 0))
+
+    def test_parse_memoryview(self):
+        with MappedFile(self.path) as mapped_file:
+            line = next(mapped_file.iter_lines())
+            self.assertEqual(parse_schedule_line(self.input_lines[0]), parse_schedule_line(line))
+            del line
+
+    def test_mapped_parallel_pricing_matches_pipeline(self):
+        expected = list(calculate_salaries(self.input_lines))
+        records = list(calculate_salaries_mapped(self.path, workers=2, range_size=100))
+        self.assertEqual(expected, records)
+
+    def test_mapped_errors_report_absolute_line_numbers(self):
+        path = self.write_file("\n".join(self.input_lines + ["BROKEN"]), "broken.txt")
+        with self.assertRaises(ScheduleParseError) as context:
+            list(calculate_salaries_mapped(path, workers=2, range_size=64))
+        self.assertEqual(len(self.input_lines) + 1, context.exception.line)
+
+    def test_range_errors_keep_their_type(self):
+        conflicts = [("MO", "10:00-12:00", "11:00-13:00")]
+
+        def raise_overlap(lines, first_line_number, rate_table):
+            raise OverlappingSpansError("spans overlap", 2, conflicts)
+
+        with MappedFile(self.path) as mapped_file:
+            byte_range = split_byte_ranges(mapped_file.buffer, 3)[1]
+            previous_lines = mapped_file.buffer[: byte_range[0]].count(b"\n")
+        with self.assertRaises(OverlappingSpansError) as context:
+            price_byte_range(self.path, byte_range, chunk_pricer=raise_overlap)
+        error = pickle.loads(pickle.dumps(context.exception))
+        self.assertEqual((previous_lines + 2, conflicts), (error.line, error.conflicts))
+        self.assertEqual(f"line {previous_lines + 2}: spans overlap", str(error))
+
+    def test_cli_mmap_input(self):
+        for workers in ("1", "2"):
+            output_path = os.path.join(self.directory.name, f"output{workers}.csv")
+            self.assertEqual(
+                0, main([self.path, "--mmap", "-j", workers, "-o", output_path, "-f", "csv"])
+            )
+            with open(output_path) as file:
+                self.assertEqual("C1,339.00", file.read().splitlines()[3])
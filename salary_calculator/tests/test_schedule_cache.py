@@ -0,0 +1,107 @@
+import os
+import tempfile
+from unittest import TestCase, mock, skipIf
+
+from salary_calculator.classes import WorkingDaySpan
+from salary_calculator.cli import main
+from salary_calculator.exceptions import ScheduleParseError
+from salary_calculator.pipeline import calculate_salaries, serialize_lines
+from salary_calculator.schedule_cache import ScheduleCache, get_cache_path
+from salary_calculator.vectorized import np, parse_columns
+
+
+class ScheduleCacheTestCase(TestCase):
+    def setUp(self) -> None:
+        self.input_lines = [
+            "RENE=MO10:00-12:00,TU10:00-12:00,TH01:00-03:00,SA14:00-18:00,SU20:00-21:00",
+            "ASTRID=MO10:00-12:00,TH12:00-14:00,SU20:00-21:00",
+            "",
+            "C1=MO08:35-09:45,MO12:50-18:30,SA03:32-09:50,SA17:59-20:00",
+            "SC1=MO00:00-09:00,MO23:00-00:00,SU18:40-00:00",
+            "RENÉ=WE09:00-00:00",
+            "RENE=FR10:00-12:00",
+        ]
+        self.directory = tempfile.TemporaryDirectory()
+        self.source_path = os.path.join(self.directory.name, "schedules.txt")
+        self.write_source(self.input_lines)
+        return super().setUp()
+
+    def tearDown(self) -> None:
+        self.directory.cleanup()
+        return super().tearDown()
+
+    def write_source(self, lines, mtime_ns=None) -> None:
+        with open(self.source_path, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+        if mtime_ns is not None:
+            os.utime(self.source_path, ns=(mtime_ns, mtime_ns))
+
+    def test_cached_schedules_match_parsed_ones(self):
+        ScheduleCache.build(self.source_path)
+        cache = ScheduleCache.load(self.source_path)
+        self.assertIsNotNone(cache)
+        expected = list(serialize_lines(self.input_lines))
+        self.assertEqual(len(expected), len(cache))
+        self.assertEqual(expected, list(cache.iter_schedules()))
+        self.assertEqual(expected[3], cache.get_schedule(3))
+        self.assertEqual("RENÉ", cache.get_schedule(4).username)
+
+    def test_schedules_are_built_as_they_are_iterated(self):
+        cache = ScheduleCache.open(self.source_path)
+        with mock.patch.object(
+            WorkingDaySpan, "from_minutes", wraps=WorkingDaySpan.from_minutes
+        ) as from_minutes:
+            schedules = cache.iter_schedules()
+            first = next(schedules)
+            self.assertEqual(len(first.working_days_spans), from_minutes.call_count)
+            self.assertEqual(len(cache) - 1, len(list(schedules)))
+
+    def test_find_employee(self):
+        cache = ScheduleCache.open(self.source_path)
+        self.assertEqual([0, 5], cache.find("RENE"))
+        self.assertEqual([], cache.find("NOBODY"))
+
+    def test_stale_cache_is_rebuilt(self):
+        cache = ScheduleCache.open(self.source_path)
+        self.write_source(self.input_lines[:2], mtime_ns=cache.source_mtime_ns + 10**9)
+        self.assertIsNone(ScheduleCache.load(self.source_path))
+        self.assertEqual(2, len(ScheduleCache.open(self.source_path)))
+
+    def test_touched_source_keeps_its_cache(self):
+        cache = ScheduleCache.open(self.source_path)
+        os.utime(self.source_path, ns=(cache.source_mtime_ns + 10**9,) * 2)
+        self.assertIsNotNone(ScheduleCache.load(self.source_path))
+
+    def test_corrupt_cache_is_ignored(self):
+        with open(get_cache_path(self.source_path), "wb") as file:
+            file.write(b"garbage")
+        self.assertIsNone(ScheduleCache.load(self.source_path))
+        self.assertEqual(6, len(ScheduleCache.open(self.source_path)))
+
+    def test_invalid_source_raises(self):
+        self.write_source(self.input_lines + ["BROKEN"])
+        with self.assertRaises(ScheduleParseError):
+            ScheduleCache.build(self.source_path)
+        self.assertFalse(os.path.exists(get_cache_path(self.source_path)))
+
+    @skipIf(np is None, "numpy is not installed")
+    def test_columns_match_parsed_ones(self):
+        columns = ScheduleCache.open(self.source_path).to_columns()
+        expected = parse_columns(self.input_lines)
+        self.assertEqual(expected.usernames, columns.usernames)
+        for name in ("employee", "weekday", "start", "end"):
+            self.assertEqual(getattr(expected, name).tolist(), getattr(columns, name).tolist())
+
+    def test_cli_schedule_cache(self):
+        output_path = os.path.join(self.directory.name, "output.csv")
+        for _ in range(2):
+            self.assertEqual(
+                0, main([self.source_path, "--schedule-cache", "-o", output_path, "-f", "csv"])
+            )
+        with open(output_path, encoding="utf-8") as file:
+            rows = file.read().splitlines()[1:]
+        expected = [
+            f"{username},{salary}" for username, salary in calculate_salaries(self.input_lines)
+        ]
+        self.assertEqual(expected, rows)
+        self.assertTrue(os.path.exists(get_cache_path(self.source_path)))
@@ -0,0 +1,70 @@
+from unittest import TestCase
+
+from salary_calculator.exceptions import (ScheduleParseError,
+                                          StartGreaterThanEndError)
+from salary_calculator.parsing import WEEKDAY_NUMBERS, parse_schedule_line
+from salary_calculator.serializers import (EmployeeScheduleSerializer,
+                                           FastEmployeeScheduleSerializer)
+from salary_calculator.utils import (get_calendar_day_by_abbrev,
+                                     get_weekday_abbrevs)
+
+
+class FastSerializerTestCase(TestCase):
+    def setUp(self) -> None:
+        self.input_lines = [
+            "RENE=MO10:00-12:00,TU10:00-12:00,TH01:00-03:00,SA14:00-18:00,SU20:00-21:00",
+            "MX2=WE05:55-08:30,WE08:40-9:50,WE10:00-12:00,WE14:00-18:45,SA09:10-17:30",
+            "SC1=MO00:00-09:00,MO23:00-00:00,SU18:40-00:00",
+            "SHORT=FR9:5-10:30,SA0:0-0:0",
+            "=TU10:00-12:00",
+        ]
+        self.error_dataset = [
+            ("NO_EQUALS", ScheduleParseError, 1),
+            ("A=XX10:00-11:00", ScheduleParseError, 3),
+            ("A=MO10:00-11:00,", ScheduleParseError, 17),
+            ("A=MO10:00-11:00,TU1000-12:00", ScheduleParseError, 19),
+            ("A=MO10:00-11:00,TU10:00-12:00-13:00", ScheduleParseError, 19),
+            ("A=MO10:00-11:00,TU10:00-24:00", ScheduleParseError, 25),
+            ("A=MO10:00-11:00,TU10:60-12:00", ScheduleParseError, 19),
+            ("A=MO10:00-11:00,TU 10:00-12:00", ScheduleParseError, 19),
+            ("A=MO12:00-11:00", StartGreaterThanEndError, 5),
+        ]
+        return super().setUp()
+
+    def test_same_schedules_as_strptime_serializer(self):
+        for line in self.input_lines:
+            expected = EmployeeScheduleSerializer(line).serialize()
+            schedule = FastEmployeeScheduleSerializer(line).serialize()
+            self.assertEqual(expected, schedule)
+            self.assertEqual(str(expected), str(schedule))
+
+    def test_bytes_lines(self):
+        for line in self.input_lines:
+            self.assertEqual(parse_schedule_line(line), parse_schedule_line(line.encode()))
+        username, _ = parse_schedule_line("RENÉ=MO10:00-12:00".encode())
+        self.assertEqual("RENÉ", username)
+
+    def test_minute_spans(self):
+        username, spans = parse_schedule_line("SC1=MO00:00-09:00,SU18:40-00:00")
+        self.assertEqual("SC1", username)
+        self.assertEqual([(0, 0, 540), (6, 1120, 0)], spans)
+
+    def test_weekday_numbers_follow_calendar(self):
+        self.assertEqual(
+            {abbrev: get_calendar_day_by_abbrev(abbrev) for abbrev in get_weekday_abbrevs()},
+            WEEKDAY_NUMBERS,
+        )
+
+    def test_errors_point_to_line_and_column(self):
+        for line, error_type, column in self.error_dataset:
+            with self.assertRaises(error_type) as context:
+                FastEmployeeScheduleSerializer(line, 7).serialize()
+            self.assertIsInstance(context.exception, ScheduleParseError)
+            self.assertEqual((7, column), (context.exception.line, context.exception.column), line)
+
+    def test_errors_are_value_errors_like_strptime_ones(self):
+        for line, _, _ in self.error_dataset[:-1]:
+            with self.assertRaises(ValueError):
+                EmployeeScheduleSerializer(line).serialize()
+            with self.assertRaises(ValueError):
+                FastEmployeeScheduleSerializer(line).serialize()
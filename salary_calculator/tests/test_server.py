@@ -0,0 +1,134 @@
+import asyncio
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import IsolatedAsyncioTestCase, mock, skipUnless
+
+from salary_calculator.client import SalaryClient
+from salary_calculator.pipeline import calculate_salaries
+from salary_calculator.server import SalaryServer, ServerStats, price_lines
+
+
+class ServerTestCase(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        self.input_lines = [
+            "RENE=MO10:00-12:00,TU10:00-12:00,TH01:00-03:00,SA14:00-18:00,SU20:00-21:00",
+            "ASTRID=MO10:00-12:00,TH12:00-14:00,SU20:00-21:00",
+            "C1=MO08:35-09:45,MO12:50-18:30,SA03:32-09:50,SA17:59-20:00",
+            "SC1=MO00:00-09:00,MO23:00-00:00,SU18:40-00:00",
+        ]
+        self.executor = ThreadPoolExecutor(max_workers=2)
+        self.server = SalaryServer(batch_size=3, batch_latency=0.01, executor=self.executor)
+        listener = await self.server.start(port=0)
+        self.port = listener.sockets[0].getsockname()[1]
+
+    async def asyncTearDown(self) -> None:
+        await self.server.close()
+        self.executor.shutdown()
+
+    def get_expected(self, lines):
+        return [(True, f"{username} {salary}") for username, salary in calculate_salaries(lines)]
+
+    async def test_responses_keep_request_order(self):
+        client = await SalaryClient.connect(port=self.port)
+        lines = self.input_lines * 5
+        self.assertEqual(self.get_expected(lines), await client.calculate(lines))
+        await client.close()
+        self.assertEqual(len(lines), self.server.stats.requests)
+        self.assertLess(self.server.stats.batches, len(lines))
+
+    async def test_invalid_lines_do_not_break_the_batch(self):
+        client = await SalaryClient.connect(port=self.port)
+        responses = await client.calculate(
+            [self.input_lines[0], "BROKEN", "BAD=MO12:00-10:00", self.input_lines[1]]
+        )
+        await client.close()
+        self.assertEqual([True, False, False, True], [succeeded for succeeded, _ in responses])
+        self.assertEqual(self.get_expected(self.input_lines[1:2]), responses[3:])
+        self.assertEqual(2, self.server.stats.errors)
+
+    async def test_concurrent_clients(self):
+        clients = [await SalaryClient.connect(port=self.port) for _ in range(4)]
+        results = await asyncio.gather(
+            *(client.calculate(self.input_lines[index:]) for index, client in enumerate(clients))
+        )
+        for index, responses in enumerate(results):
+            self.assertEqual(self.get_expected(self.input_lines[index:]), responses)
+        stats = await clients[0].get_stats()
+        for client in clients:
+            await client.close()
+        self.assertEqual(10, stats["requests"])
+        self.assertEqual({"p50", "p90", "p99"}, set(stats["latency_ms"]))
+
+    async def test_backpressure_with_small_queue(self):
+        await self.server.close()
+        self.server = SalaryServer(batch_size=2, max_pending=4, executor=self.executor)
+        listener = await self.server.start(port=0)
+        lines = self.input_lines * 100
+        read_lines = 0
+        readline = asyncio.StreamReader.readline
+        drained = asyncio.Event()
+
+        async def counting_readline(reader):
+            nonlocal read_lines
+            read_lines += 1
+            return await readline(reader)
+
+        async def blocked_drain(writer):
+            await drained.wait()
+
+        # Responses are neither sent nor read until drained is set, as if the client were slow.
+        port = listener.sockets[0].getsockname()[1]
+        with mock.patch.object(
+            asyncio.StreamReader, "readline", counting_readline
+        ), mock.patch.object(asyncio.StreamWriter, "drain", blocked_drain):
+            reader, writer = await asyncio.open_connection(port=port)
+            writer.write("".join(f"{line}\n" for line in lines).encode("utf-8"))
+            paused_at = -1
+            while paused_at != read_lines:
+                paused_at = read_lines
+                await asyncio.sleep(0.05)
+            # Reading stopped once max_pending responses waited for the responder.
+            self.assertLess(paused_at, 10)
+            drained.set()
+            responses = [(await reader.readline()).decode("utf-8") for _ in lines]
+        writer.close()
+        self.assertEqual([f"OK {message}\n" for _, message in self.get_expected(lines)], responses)
+        self.assertEqual(len(lines), self.server.stats.requests)
+
+    @skipUnless(hasattr(asyncio, "start_unix_server"), "Unix sockets are not available")
+    async def test_unix_socket(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "salary.sock")
+            server = SalaryServer(executor=self.executor)
+            await server.start(path=path)
+            client = await SalaryClient.connect(path=path)
+            self.assertEqual(
+                self.get_expected(self.input_lines), await client.calculate(self.input_lines)
+            )
+            await client.close()
+            await server.close()
+
+    async def test_process_pool_workers(self):
+        server = SalaryServer(workers=2)
+        listener = await server.start(port=0)
+        client = await SalaryClient.connect(port=listener.sockets[0].getsockname()[1])
+        self.assertEqual(
+            self.get_expected(self.input_lines), await client.calculate(self.input_lines)
+        )
+        await client.close()
+        await server.close()
+
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            SalaryServer(batch_size=0)
+
+    def test_price_lines(self):
+        self.assertEqual(self.get_expected(self.input_lines), price_lines(self.input_lines))
+
+    def test_latency_percentiles(self):
+        stats = ServerStats()
+        self.assertEqual(0.0, stats.get_percentile(99))
+        stats.latencies.extend(index / 1000 for index in range(1, 101))
+        self.assertAlmostEqual(0.050, stats.get_percentile(50), places=2)
+        self.assertAlmostEqual(0.099, stats.get_percentile(99), places=2)
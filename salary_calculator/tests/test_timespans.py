@@ -1,9 +1,10 @@
-from datetime import datetime
+from datetime import datetime, time, timedelta
 from typing import List, Tuple
 from unittest import TestCase
 
-from salary_calculator.classes import IntersectionTypes, TimeSpan
+from salary_calculator.classes import IntersectionTypes, MinuteSpan, TimeSpan
 from salary_calculator.exceptions import StartGreaterThanEndError
+from salary_calculator.utils import substract_time_values
 
 
 def create_timespan(value: str) -> TimeSpan:
@@ -120,3 +121,68 @@ class TimespanTestCase(TestCase):
             first_timespan, second_timespan = pair_entry
             intersection_result, _ = first_timespan.get_intersection(second_timespan)
             self.assertEqual(intersection_result, target_intersection_type)
+
+
+def create_minute_span(value: str) -> MinuteSpan:
+    timespan = create_timespan(value)
+    return MinuteSpan.from_times(timespan.start, timespan.raw_end)
+
+
+class MinuteSpanTestCase(TestCase):
+    def setUp(self) -> None:
+        self.boundary_minutes = [0, 1, 2, 539, 540, 541, 1079, 1080, 1081, 1438, 1439]
+        return super().setUp()
+
+    def create_pairs(self):
+        spans = [
+            "%02d:%02d-%02d:%02d" % (start // 60, start % 60, end // 60, end % 60)
+            for start in self.boundary_minutes
+            for end in self.boundary_minutes
+            if start <= end or end == 0
+        ]
+        return [(first, second) for first in spans for second in spans]
+
+    def test_intersections_match_timespans(self):
+        for first, second in self.create_pairs():
+            expected_case, expected_mins = create_timespan(first).get_intersection(
+                create_timespan(second)
+            )
+            intersection_case, intersection_mins = create_minute_span(
+                first
+            ).get_intersection(create_minute_span(second))
+            self.assertEqual(expected_case, intersection_case, (first, second))
+            self.assertEqual(expected_mins, intersection_mins, (first, second))
+
+    def test_comparisons_match_timespans(self):
+        for first, second in self.create_pairs()[::7]:
+            timespans = create_timespan(first), create_timespan(second)
+            minute_spans = create_minute_span(first), create_minute_span(second)
+            for operator in ("__eq__", "__lt__", "__le__", "__gt__", "__ge__"):
+                expected = getattr(timespans[0], operator)(timespans[1])
+                self.assertEqual(expected, getattr(minute_spans[0], operator)(minute_spans[1]))
+                self.assertEqual(expected, getattr(minute_spans[0], operator)(timespans[1]))
+                self.assertEqual(expected, getattr(timespans[0], operator)(minute_spans[1]))
+
+    def test_time_attributes_and_format(self):
+        span = create_minute_span("18:00-00:00")
+        timespan = create_timespan("18:00-00:00")
+        self.assertEqual(
+            (timespan.start, timespan.end, timespan.raw_end),
+            (span.start, span.end, span.raw_end),
+        )
+        self.assertEqual(str(timespan), str(span))
+        self.assertEqual(timespan.get_simple_format(), span.get_simple_format())
+        self.assertFalse(hasattr(span, "__dict__"))
+
+    def test_error_spans_having_start_greater_than_end(self):
+        with self.assertRaises(StartGreaterThanEndError):
+            MinuteSpan(600, 540)
+        with self.assertRaises(ValueError):
+            MinuteSpan.from_times(time(10, 0, 30), time(11, 0))
+
+    def test_substract_time_values(self):
+        self.assertEqual(
+            timedelta(hours=5, minutes=58, seconds=59),
+            substract_time_values(time(23, 59, 59), time(18, 1)),
+        )
+        self.assertEqual(timedelta(minutes=-90), substract_time_values(time(9, 0), time(10, 30)))
@@ -0,0 +1,78 @@
+import calendar
+import random
+from datetime import time
+from decimal import Decimal
+from unittest import TestCase, skipIf
+
+from salary_calculator.classes import PaymentTimeSlot
+from salary_calculator.pipeline import calculate_salaries
+from salary_calculator.rates import compile_rate_table
+from salary_calculator.vectorized import (VectorizedRateTable,
+                                          calculate_salaries_vectorized,
+                                          get_default_table, np, parse_columns)
+
+
+def create_line(generator: random.Random, index: int) -> str:
+    abbrevs = ["MO", "TU", "WE", "TH", "FR", "SA", "SU"]
+    tokens = []
+    for _ in range(generator.randint(1, 6)):
+        start = generator.randrange(0, 1440)
+        end = generator.randint(start, 1440) % 1440
+        tokens.append(
+            "%s%02d:%02d-%02d:%02d"
+            % (generator.choice(abbrevs), start // 60, start % 60, end // 60, end % 60)
+        )
+    return f"E{index}=" + ",".join(tokens)
+
+
+@skipIf(np is None, "numpy is not installed")
+class VectorizedTestCase(TestCase):
+    def setUp(self) -> None:
+        generator = random.Random(4)
+        self.input_lines = [create_line(generator, index) for index in range(400)]
+        return super().setUp()
+
+    def test_parse_columns(self):
+        columns = parse_columns(["A=MO10:00-12:00,SU18:00-00:00", "B=TU00:00-09:00"])
+        self.assertEqual(["A", "B"], columns.usernames)
+        self.assertEqual([0, 0, 1], columns.employee.tolist())
+        self.assertEqual([calendar.MONDAY, calendar.SUNDAY, calendar.TUESDAY], columns.weekday.tolist())
+        self.assertEqual([600, 1080, 0], columns.start.tolist())
+        self.assertEqual([720, 1439, 540], columns.end.tolist())
+
+    def test_vectorized_salaries_match_objects(self):
+        expected = list(calculate_salaries(self.input_lines))
+        records = list(calculate_salaries_vectorized(self.input_lines, chunk_size=64))
+        self.assertEqual(expected, records)
+
+    def test_fractional_hour_amounts(self):
+        slots = [
+            PaymentTimeSlot(start=time(0, 1), end=time(12, 0), hour_amount=Decimal("10.125")),
+            PaymentTimeSlot(start=time(12, 1), end=time(0, 0), hour_amount=Decimal("12.5")),
+        ]
+        compiled = compile_rate_table({weekday: slots for weekday in range(7)})
+        table = VectorizedRateTable(compiled)
+        columns = parse_columns(self.input_lines)
+        cents = table.price_columns(columns)
+        for index, username in enumerate(columns.usernames):
+            mask = columns.employee == index
+            expected = sum(
+                (
+                    compiled.price(int(weekday), int(start), int(end))
+                    for weekday, start, end in zip(
+                        columns.weekday[mask], columns.start[mask], columns.end[mask]
+                    )
+                ),
+                Decimal(0),
+            ).quantize(Decimal("0.01"))
+            self.assertEqual(expected, Decimal(int(cents[index])).scaleb(-2), username)
+
+    def test_unsorted_employee_indices(self):
+        columns = parse_columns(self.input_lines[:50])
+        order = np.random.default_rng(0).permutation(len(columns.employee))
+        expected = get_default_table().price_columns(columns)
+        columns.employee = columns.employee[order]
+        columns.weekday = columns.weekday[order]
+        columns.start = columns.start[order]
+        columns.end = columns.end[order]
+        self.assertEqual(expected.tolist(), get_default_table().price_columns(columns).tolist())
@@ -1,6 +1,9 @@
 import calendar
-from datetime import date, datetime, time, timedelta
-from typing import Tuple
+import hashlib
+from datetime import time, timedelta
+from typing import Iterable, Tuple
+
+from salary_calculator.instrumentation import instrumentation
 
 __weekdays_mappings = {
     "SU": calendar.SUNDAY,
@@ -21,6 +24,10 @@ def get_calendar_day_by_abbrev(abbrev: str) -> int:
     return calendar_day
 
 
+def get_weekday_abbrevs() -> Tuple[str, ...]:
+    return tuple(__weekdays_mappings.keys())
+
+
 def get_abbrev_by_calendar_day(calendar_day: int) -> str:
     return list(__weekdays_mappings.keys())[
         list(__weekdays_mappings.values()).index(calendar_day)
@@ -36,10 +43,37 @@ def normalize(value: time) -> Tuple[bool, time]:
     """
     requires_normalization = time(0, 0) <= value < time(0, 1)
     returned_value = value if not requires_normalization else time(23, 59, 59)
+    if instrumentation.enabled:
+        instrumentation.count("timespan.normalize_calls")
+        instrumentation.count("timespan.normalized_midnights", requires_normalization)
     return requires_normalization, returned_value
 
 
 def substract_time_values(value: time, other_value: time) -> timedelta:
-    first_value = datetime.combine(date.today(), value)
-    second_value = datetime.combine(date.today(), other_value)
-    return first_value - second_value
+    # Same result as subtracting both values combined with the same date, without building datetimes.
+    return timedelta(
+        hours=value.hour - other_value.hour,
+        minutes=value.minute - other_value.minute,
+        seconds=value.second - other_value.second,
+        microseconds=value.microsecond - other_value.microsecond,
+    )
+
+
+def time_to_minutes(value: time) -> int:
+    return value.hour * 60 + value.minute
+
+
+__minute_times = [time(minutes // 60, minutes % 60) for minutes in range(24 * 60)]
+
+
+def minutes_to_time(minutes: int) -> time:
+    """Return the shared time value of a minute of the day, without allocating a new one."""
+    return __minute_times[minutes]
+
+
+def hash_rate_slots(rows: Iterable[Tuple[int, int, int, object, str]]) -> str:
+    """Return the content hash of (weekday, start, end, hour amount, band) payment slot rows."""
+    digest = hashlib.sha256()
+    for weekday, start, end, hour_amount, band in rows:
+        digest.update(f"{weekday}|{start}|{end}|{hour_amount}|{band}\n".encode())
+    return digest.hexdigest()
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is an optional dependency
+    np = None
+
+from salary_calculator.cache import LRUCache
+from salary_calculator.cents import cents_to_salary, get_amount_decimals
+from salary_calculator.classes import EmployeeSchedule
+from salary_calculator.instrumentation import instrumentation
+from salary_calculator.parallel import chunk_lines
+from salary_calculator.parsing import parse_schedule_line
+from salary_calculator.pipeline import SalaryRecord
+from salary_calculator.rates import (DEFAULT_CACHE_SIZE, MINUTES_PER_DAY,
+                                     QUANTIZED_HOURS, CompiledRateTable,
+                                     RateTable, get_compiled_rate_table)
+
+if TYPE_CHECKING:
+    from salary_calculator.parsing import RawLine
+
+WEEKDAYS = 7
+LAST_MINUTE = MINUTES_PER_DAY - 1
+DEFAULT_BATCH_SIZE = 50000
+
+
+def require_numpy() -> None:
+    if np is None:
+        raise ImportError(
+            "numpy is required for vectorized pricing, install it with `pip install numpy`"
+        )
+
+
+@dataclass
+class ScheduleColumns:
+    """Working day spans of a batch of employees stored as parallel integer arrays."""
+
+    usernames: List[Optional[str]]
+    employee: "np.ndarray"
+    weekday: "np.ndarray"
+    start: "np.ndarray"
+    end: "np.ndarray"
+
+    def __len__(self) -> int:
+        return len(self.usernames)
+
+
+def columns_from_schedules(schedules: Iterable[EmployeeSchedule]) -> ScheduleColumns:
+    require_numpy()
+    usernames, employee, weekday, start, end = [], [], [], [], []
+    for index, schedule in enumerate(schedules):
+        usernames.append(schedule.username)
+        for working_day_span in schedule.working_days_spans:
+            span_start, span_end = working_day_span.span.start, working_day_span.span.end
+            if span_start.second or span_start.microsecond:
+                raise ValueError(
+                    f"span start({span_start}) should be a whole minute to be vectorized"
+                )
+            employee.append(index)
+            weekday.append(working_day_span.weekday)
+            start.append(span_start.hour * 60 + span_start.minute)
+            end.append(span_end.hour * 60 + span_end.minute)
+    return ScheduleColumns(
+        usernames=usernames,
+        employee=np.array(employee, dtype=np.int64),
+        weekday=np.array(weekday, dtype=np.int8),
+        start=np.array(start, dtype=np.int16),
+        end=np.array(end, dtype=np.int16),
+    )
+
+
+def parse_columns(lines: Iterable[RawLine], first_line_number: int = 1) -> ScheduleColumns:
+    """Parse non blank schedule lines straight into columns, without building span objects."""
+    require_numpy()
+    usernames, employee, weekday, start, end = [], [], [], [], []
+    for line_number, line in enumerate(lines, first_line_number):
+        if not line:
+            continue
+        username, minute_spans = parse_schedule_line(line, line_number)
+        index = len(usernames)
+        usernames.append(username)
+        for span_weekday, span_start, span_end in minute_spans:
+            employee.append(index)
+            weekday.append(span_weekday)
+            start.append(span_start)
+            end.append(span_end or LAST_MINUTE)
+    return ScheduleColumns(
+        usernames=usernames,
+        employee=np.array(employee, dtype=np.int64),
+        weekday=np.array(weekday, dtype=np.int8),
+        start=np.array(start, dtype=np.int16),
+        end=np.array(end, dtype=np.int16),
+    )
+
+
+class VectorizedRateTable:
+    """
+    NumPy version of a CompiledRateTable.
+
+    Amounts are kept as integers in units of 10 ** -(2 + decimals) USD, where the two
+    extra places come from the quantized hours and `decimals` from the hour amounts,
+    so every operation is exact and rounding only happens when salaries are reduced.
+    """
+
+    def __init__(self, compiled: CompiledRateTable) -> None:
+        require_numpy()
+        days = [compiled.days[weekday] for weekday in range(WEEKDAYS)]
+        self.decimals = max(
+            (get_amount_decimals(amount) for day in days for amount in day.amounts),
+            default=0,
+        )
+        amount_scale = 10 ** self.decimals
+        unit_scale = 100 * amount_scale
+        slots = max(len(day.starts) for day in days)
+        self.hour_cents = np.array(
+            [int(hours * 100) for hours in QUANTIZED_HOURS], dtype=np.int64
+        )
+
+        shape = (WEEKDAYS, MINUTES_PER_DAY)
+        self.next_slot = np.zeros(shape, dtype=np.int64)
+        self.prev_slot = np.zeros(shape, dtype=np.int64)
+        self.head = np.zeros(shape, dtype=np.int64)
+        self.tail = np.zeros(shape, dtype=np.int64)
+        self.starts = np.zeros((WEEKDAYS, max(slots, 1)), dtype=np.int64)
+        self.ends = np.zeros((WEEKDAYS, max(slots, 1)), dtype=np.int64)
+        self.amounts = np.zeros((WEEKDAYS, max(slots, 1)), dtype=np.int64)
+        self.full_cumulative = np.zeros((WEEKDAYS, slots + 2), dtype=np.int64)
+
+        for weekday, day in enumerate(days):
+            count = len(day.amounts)
+            self.starts[weekday, :count] = day.starts
+            self.ends[weekday, :count] = day.ends
+            self.amounts[weekday, :count] = [
+                int(amount * amount_scale) for amount in day.amounts
+            ]
+            self.next_slot[weekday] = day.next_slot
+            self.prev_slot[weekday] = day.prev_slot
+            self.head[weekday] = [int(value * unit_scale) for value in day.head]
+            self.tail[weekday] = [int(value * unit_scale) for value in day.tail]
+            cumulative = [int(value * unit_scale) for value in day.full_cumulative]
+            self.full_cumulative[weekday, : count + 1] = cumulative
+            self.full_cumulative[weekday, count + 1 :] = cumulative[-1]
+
+    def price_spans(self, weekday, start, end) -> "np.ndarray":
+        """Return the pay of every span, in table units, with a fixed set of array operations."""
+        weekday = np.asarray(weekday, dtype=np.int64)
+        start = np.asarray(start, dtype=np.int64)
+        end = np.asarray(end, dtype=np.int64)
+        first_slot = self.next_slot[weekday, start]
+        last_slot = self.prev_slot[weekday, end]
+
+        slot = np.clip(first_slot, 0, self.starts.shape[1] - 1)
+        single_mins = np.minimum(end, self.ends[weekday, slot]) - np.maximum(
+            start, self.starts[weekday, slot]
+        )
+        single_pay = self.amounts[weekday, slot] * self.hour_cents[
+            np.clip(single_mins, 0, MINUTES_PER_DAY - 1)
+        ]
+        several_pay = (
+            self.head[weekday, start]
+            + self.full_cumulative[weekday, np.clip(last_slot, 0, None)]
+            - self.full_cumulative[weekday, first_slot + 1]
+            + self.tail[weekday, end]
+        )
+        pay = np.where(first_slot == last_slot, single_pay, several_pay)
+        return np.where(first_slot > last_slot, 0, pay)
+
+    def units_to_cents(self, units: "np.ndarray") -> "np.ndarray":
+        """Round table units to cents half to even, as Decimal.quantize does by default."""
+        if not self.decimals:
+            return units
+        divisor = 10 ** self.decimals
+        quotient, remainder = np.divmod(units, divisor)
+        round_up = (2 * remainder > divisor) | (
+            (2 * remainder == divisor) & (quotient % 2 == 1)
+        )
+        return quotient + round_up
+
+    def price_columns(self, columns: ScheduleColumns) -> "np.ndarray":
+        """Return the salary of every employee of the batch in cents."""
+        pay = self.price_spans(columns.weekday, columns.start, columns.end)
+        employee = columns.employee
+        if len(employee) and np.any(employee[1:] < employee[:-1]):
+            order = np.argsort(employee, kind="stable")
+            employee, pay = employee[order], pay[order]
+        counts = np.bincount(employee, minlength=len(columns))
+        segment_ends = np.cumsum(counts)
+        cumulative = np.concatenate(([0], np.cumsum(pay)))
+        totals = cumulative[segment_ends] - cumulative[segment_ends - counts]
+        return self.units_to_cents(totals)
+
+
+vectorized_rate_tables: LRUCache[VectorizedRateTable] = LRUCache(DEFAULT_CACHE_SIZE)
+
+
+def get_vectorized_rate_table(rate_table: Optional[RateTable] = None) -> VectorizedRateTable:
+    """Return the vectorized version of a table (the default one if None), built once per content."""
+    rate_table = rate_table or EmployeeSchedule.get_default_rate_table()
+    return vectorized_rate_tables.get_or_create(
+        rate_table.content_hash,
+        lambda: VectorizedRateTable(get_compiled_rate_table(rate_table)),
+    )
+
+
+def get_default_table() -> VectorizedRateTable:
+    return get_vectorized_rate_table()
+
+
+def price_chunk(
+    lines: List[str], first_line_number: int = 1, rate_table: Optional[RateTable] = None
+) -> List[SalaryRecord]:
+    with instrumentation.stage("parse"):
+        columns = parse_columns(lines, first_line_number)
+    return price_schedule_columns(columns, rate_table)
+
+
+def price_schedule_columns(
+    columns: ScheduleColumns, rate_table: Optional[RateTable] = None
+) -> List[SalaryRecord]:
+    with instrumentation.stage("price"):
+        cents = get_vectorized_rate_table(rate_table).price_columns(columns)
+    return [
+        (username, cents_to_salary(int(amount)))
+        for username, amount in zip(columns.usernames, cents)
+    ]
+
+
+def calculate_salaries_vectorized(
+    lines: Iterable[str],
+    chunk_size: int = DEFAULT_BATCH_SIZE,
+    rate_table: Optional[RateTable] = None,
+) -> Iterator[SalaryRecord]:
+    for index, chunk in enumerate(chunk_lines(lines, chunk_size)):
+        yield from price_chunk(chunk, 1 + index * chunk_size, rate_table)